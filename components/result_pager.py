@@ -0,0 +1,164 @@
+"""Paginated, windowed rendering for long result lists
+
+Pages sort the matching row positions with numpy and only materialize the
+visible window, so a broad filter costs a page of Streamlit elements instead
+of one element tree per matching row. The page position is a cursor kept in
+session state, and the markup for each card is built once per row and reused
+across reruns and sessions.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+T = TypeVar('T')
+
+DEFAULT_PAGE_SIZE = 20
+
+
+class MarkupCache:
+    """Bounded LRU cache of rendered card markup keyed by row id"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, row_id: Hashable, build: Callable[[], T]) -> T:
+        """
+        Get the markup for a row, building it on first use.
+
+        Args:
+            row_id: Stable identifier of the row within the dataset
+            build: Function producing the markup for the row
+
+        Returns:
+            Cached markup for the row
+        """
+        with self._lock:
+            if row_id in self._entries:
+                self._entries.move_to_end(row_id)
+                return self._entries[row_id]
+
+        markup = build()
+        with self._lock:
+            self._entries[row_id] = markup
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return markup
+
+
+@st.cache_resource
+def get_markup_cache(namespace: str) -> MarkupCache:
+    """
+    Get the shared markup cache for one kind of card.
+
+    Args:
+        namespace: Card kind plus dataset version, so new data gets a fresh cache
+
+    Returns:
+        MarkupCache shared by every session in this process
+    """
+    return MarkupCache()
+
+
+def sort_rows(rows: np.ndarray, values: pd.Series, ascending: bool = True) -> np.ndarray:
+    """
+    Order row positions by a column, keeping rows with missing values last.
+
+    Args:
+        rows: Row positions to order
+        values: Full column the positions index into
+        ascending: Sort direction
+
+    Returns:
+        Reordered row positions
+    """
+    keys = values.to_numpy()[rows]
+    if keys.dtype.kind in 'fiub':
+        keys = keys.astype(float)
+        missing = np.isnan(keys)
+        order = np.lexsort((keys if ascending else -keys, missing))
+    else:
+        keys = pd.Series(keys).fillna('').astype(str).str.lower().to_numpy()
+        missing = keys == ''
+        order = np.argsort(keys, kind='stable')
+        if not ascending:
+            order = order[::-1]
+        order = np.concatenate([order[~missing[order]], order[missing[order]]])
+    return rows[order]
+
+
+def clamp_offset(offset: int, page_size: int, total: int) -> int:
+    """Snap an offset into [0, start of the last page]"""
+    last_page = page_size * ((total - 1) // page_size) if total else 0
+    return min(max(0, offset), last_page)
+
+
+def _move_cursor(state_key: str, step: int, page_size: int, total: int) -> None:
+    """Button callback: move the cursor before the rerun renders the page"""
+    cursor = st.session_state.get(state_key)
+    if cursor is not None:
+        cursor['offset'] = clamp_offset(cursor['offset'] + step, page_size, total)
+
+
+def _page_cursor(key: str, rows: np.ndarray) -> dict:
+    """Session cursor for a result list, reset whenever the result set changes"""
+    signature = hash((len(rows), rows.tobytes()))
+    state_key = f"{key}_cursor"
+    cursor = st.session_state.get(state_key)
+    if cursor is None or cursor['signature'] != signature:
+        cursor = {'signature': signature, 'offset': 0}
+        st.session_state[state_key] = cursor
+    return cursor
+
+
+def render_paginated_results(
+    key: str,
+    rows: np.ndarray,
+    render_window: Callable[[np.ndarray], None],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    item_label: str = "results"
+) -> Optional[np.ndarray]:
+    """
+    Render one page of a result list with previous/next navigation.
+
+    Args:
+        key: Unique key for this list's widgets and cursor
+        rows: Sorted row positions of every matching result
+        render_window: Callback that renders the visible row positions
+        page_size: Number of results per page
+        item_label: Noun used in the "Showing x–y of n" caption
+
+    Returns:
+        Row positions that were rendered, or None if there were no results
+    """
+    total = len(rows)
+    if total == 0:
+        return None
+
+    cursor = _page_cursor(key, rows)
+    # Clicks are applied in on_click callbacks, so the cursor is already moved
+    # and the disabled flags below match the page being rendered
+    cursor['offset'] = clamp_offset(cursor['offset'], page_size, total)
+    state_key = f"{key}_cursor"
+    nav_prev, nav_info, nav_next = st.columns([1, 3, 1])
+    with nav_prev:
+        st.button("◀ Prev", key=f"{key}_prev", disabled=cursor['offset'] == 0,
+                  on_click=_move_cursor, args=(state_key, -page_size, page_size, total),
+                  use_container_width=True)
+    with nav_next:
+        st.button("Next ▶", key=f"{key}_next", disabled=cursor['offset'] + page_size >= total,
+                  on_click=_move_cursor, args=(state_key, page_size, page_size, total),
+                  use_container_width=True)
+
+    start = cursor['offset']
+    window = rows[start:start + page_size]
+    with nav_info:
+        st.caption(f"Showing {start + 1:,}–{start + len(window):,} of {total:,} {item_label}")
+
+    render_window(window)
+    return window
@@ -2,17 +2,17 @@
 import streamlit as st
 from typing import List, Dict, Optional
 import pandas as pd
-from difflib import get_close_matches
 from utils.validation import validate_input_with_error, validate_financial_input, validate_percentage
-from utils.cache_utils import process_location_data
+from utils.cache_utils import process_location_data, get_search_index, labels_key
 from models.milestone_factory import MilestoneFactory, Milestone
 
-def render_location_selection(locations: List[str]) -> Optional[str]:
+def render_location_selection(locations: List[str], dataset_key: Optional[str] = None) -> Optional[str]:
     """
     Render the location selection component.
     
     Args:
         locations: List of available locations
+        dataset_key: Version key of the locations' source for the shared search index
         
     Returns:
         Selected location if one is chosen, None otherwise
@@ -25,10 +25,7 @@ def render_location_selection(locations: List[str]) -> Optional[str]:
         
     location_input = st.text_input("Enter Location")
     if location_input:
-        matches = get_close_matches(location_input.lower(),
-                                   [loc.lower() for loc in locations],
-                                   n=3, cutoff=0.1)
-        matching_locations = [loc for loc in locations if loc.lower() in matches]
+        matching_locations = get_search_index(dataset_key or labels_key(locations), locations).search(location_input, limit=3)
         if matching_locations:
             cols = st.columns(3)
             for idx, loc in enumerate(matching_locations):
@@ -37,12 +34,13 @@ def render_location_selection(locations: List[str]) -> Optional[str]:
                         return loc
     return None
 
-def render_occupation_selection(occupations: List[str]) -> Optional[str]:
+def render_occupation_selection(occupations: List[str], dataset_key: Optional[str] = None) -> Optional[str]:
     """
     Render the occupation selection component.
     
     Args:
         occupations: List of available occupations
+        dataset_key: Version key of the occupations' source for the shared search index
         
     Returns:
         Selected occupation if one is chosen, None otherwise
@@ -55,10 +53,7 @@ def render_occupation_selection(occupations: List[str]) -> Optional[str]:
         
     occupation_input = st.text_input("Enter Occupation")
     if occupation_input:
-        matches = get_close_matches(occupation_input.lower(),
-                                   [occ.lower() for occ in occupations],
-                                   n=3, cutoff=0.1)
-        matching_occupations = [occ for occ in occupations if occ.lower() in matches]
+        matching_occupations = get_search_index(dataset_key or labels_key(occupations), occupations).search(occupation_input, limit=3)
         if matching_occupations:
             cols = st.columns(3)
             for idx, occ in enumerate(matching_occupations):
@@ -1,10 +1,12 @@
 """Main application entry point"""
 import streamlit as st
 import pandas as pd
-from difflib import get_close_matches
 from utils.data_processor import DataProcessor
-from utils.cache_utils import process_location_data, calculate_yearly_projection
+from utils.cache_utils import process_location_data, calculate_yearly_projection, dataset_version, get_search_index
 from services.calculator import FinancialCalculator
+from services.baseline_projections import get_baseline_projection, location_options, occupation_options
+from utils.dataset_registry import COLI_DATA_PATH, OCCUPATION_DATA_PATH, get_shared_dataset
+from services.scenario_store import current_owner, get_scenario_store
 from visualizations.plotter import FinancialPlotter
 from models.financial_models import MilestoneFactory, SpouseIncome as ModelSpouseIncome, Home, MortgageLoan, FixedExpense, VariableExpense, OneTimeExpense, MortgagePayment, LoanPayment
 from models.user_favorites import UserFavorites  # Added import for UserFavorites
@@ -83,7 +85,6 @@ def initialize_session_state():
         st.session_state.sidebar_occupation_input = ""
         st.session_state.selected_spouse_occ = ""
         st.session_state.show_marriage_options = False
-        st.session_state.saved_projections = []
         st.session_state.selected_colleges_for_projection = []
         st.session_state.current_page = "home"
         st.session_state.selected_year_idx = -1
@@ -102,14 +103,17 @@ def main():
         current_page = params.get("page", "selection")
 
         # Load data files
-        coli_df = DataProcessor.load_coli_data("COLI by Location.csv")
-        occupation_df = DataProcessor.load_occupation_data("Occupational Data.csv")
+        # Shared read-only tables, loaded once per process
+        coli_df = get_shared_dataset('coli')
+        occupation_df = get_shared_dataset('occupations')
 
         # Get available options and remove any NaN values
-        locations = sorted([loc for loc in coli_df['Cost of Living'].astype(str).unique().tolist()
-                           if loc.lower() != 'nan'])
-        occupations = sorted([occ for occ in occupation_df['Occupation'].astype(str).unique().tolist()
-                             if occ.lower() != 'nan'])
+        locations = location_options(coli_df)
+        occupations = occupation_options(occupation_df)
+
+        # Shared search indexes for the location/occupation pickers
+        location_index = get_search_index(f"{dataset_version(COLI_DATA_PATH)}:locations", locations)
+        occupation_index = get_search_index(f"{dataset_version(OCCUPATION_DATA_PATH)}:occupations", occupations)
 
         if current_page == "selection":
             # Create two columns for location and occupation selection
@@ -122,10 +126,7 @@ def main():
                 else:
                     location_input = st.text_input("Enter Location")
                     if location_input:
-                        matches = get_close_matches(location_input.lower(),
-                                                   [loc.lower() for loc in locations],
-                                                   n=3, cutoff=0.1)
-                        matching_locations = [loc for loc in locations if loc.lower() in matches]
+                        matching_locations = location_index.search(location_input, limit=3)
                         if matching_locations:
                             cols = st.columns(3)
                             for idx, loc in enumerate(matching_locations):
@@ -141,10 +142,7 @@ def main():
                 else:
                     occupation_input = st.text_input("Enter Occupation")
                     if occupation_input:
-                        matches = get_close_matches(occupation_input.lower(),
-                                                   [occ.lower() for occ in occupations],
-                                                   n=3, cutoff=0.1)
-                        matching_occupations = [occ for occ in occupations if occ.lower() in matches]
+                        matching_occupations = occupation_index.search(occupation_input, limit=3)
                         if matching_occupations:
                             cols = st.columns(3)
                             for idx, occ in enumerate(matching_occupations):
@@ -173,10 +171,7 @@ def main():
                     key="new_location_input"
                 )
                 if new_location:
-                    matches = get_close_matches(new_location.lower(),
-                                               [loc.lower() for loc in locations],
-                                               n=3, cutoff=0.1)
-                    matching_locations = [loc for loc in locations if loc.lower() in matches]
+                    matching_locations = location_index.search(new_location, limit=3)
                     if matching_locations:
                         st.sidebar.markdown("#### Select from matches:")
                         for loc in matching_locations:
@@ -192,10 +187,7 @@ def main():
                     key="new_occupation_input"
                 )
                 if new_occupation:
-                    matches = get_close_matches(new_occupation.lower(),
-                                               [occ.lower() for occ in occupations],
-                                               n=3, cutoff=0.1)
-                    matching_occupations = [occ for occ in occupations if occ.lower() in matches]
+                    matching_occupations = occupation_index.search(new_occupation, limit=3)
                     if matching_occupations:
                         st.sidebar.markdown("#### Select from matches:")
                         for occ in matching_occupations:
@@ -229,23 +221,36 @@ def main():
             # Only calculate if we need to
             if st.session_state.needs_recalculation:
                 try:
-                    # Process data
-                    location_data = DataProcessor.process_location_data(
-                        coli_df, occupation_df,
-                        st.session_state.selected_location,
-                        st.session_state.selected_occupation,
-                        investment_return_rate
-                    )
+                    # Without milestones the projection is a slice of the precomputed baseline
+                    projections = None
+                    if not st.session_state.milestones:
+                        projections = get_baseline_projection(
+                            st.session_state.selected_location,
+                            st.session_state.selected_occupation,
+                            investment_return_rate,
+                            projection_years
+                        )
 
-                    # Create financial objects with milestones
-                    assets, liabilities, income, expenses = DataProcessor.create_financial_objects(
-                        location_data,
-                        st.session_state.milestones
-                    )
+                    if projections is None:
+                        # Process data
+                        location_data = DataProcessor.process_location_data(
+                            coli_df, occupation_df,
+                            st.session_state.selected_location,
+                            st.session_state.selected_occupation,
+                            investment_return_rate
+                        )
+
+                        # Create financial objects with milestones
+                        assets, liabilities, income, expenses = DataProcessor.create_financial_objects(
+                            location_data,
+                            st.session_state.milestones
+                        )
+
+                        # Calculate projections
+                        calculator = FinancialCalculator(assets, liabilities, income, expenses)
+                        projections = calculator.calculate_yearly_projection(projection_years)
 
-                    # Calculate projections
-                    calculator = FinancialCalculator(assets, liabilities, income, expenses)
-                    st.session_state.current_projections = calculator.calculate_yearly_projection(projection_years)
+                    st.session_state.current_projections = projections
                     st.session_state.needs_recalculation = False
 
                 except ValueError as e:
@@ -302,10 +307,7 @@ def main():
                 )
 
                 if spouse_occupation_input:
-                    matches = get_close_matches(spouse_occupation_input.lower(),
-                                               [occ.lower() for occ in occupations],
-                                               n=3, cutoff=0.1)
-                    matching_occupations = [occ for occ in occupations if occ.lower() in matches]
+                    matching_occupations = occupation_index.search(spouse_occupation_input, limit=3)
                     if matching_occupations:
                         st.markdown("#### Select Spouse's Occupation:")
                         cols = st.columns(len(matching_occupations))
@@ -831,7 +833,7 @@ def main():
                     if st.session_state.previous_projections:
                         st.markdown(
                             format_change(current_projections['net_worth'][0],
-                                        st.session_state.previous_projections['net_worth'][0]
+                                        st.session_state.previous_projections['initial_net_worth']
                             ),
                             unsafe_allow_html=True
                         )
@@ -843,7 +845,7 @@ def main():
                         st.markdown(
                             format_change(
                                 current_projections['net_worth'][-1],
-                                st.session_state.previous_projections['net_worth'][-1]
+                                st.session_state.previous_projections['final_net_worth']
                             ),
                             unsafe_allow_html=True
                         )
@@ -856,9 +858,7 @@ def main():
                         f"${current_avg_cash_flow:,}"
                     )
                     if st.session_state.previous_projections:
-                        prev_avg_cash_flow = int(
-                            round(sum(st.session_state.previous_projections['cash_flow']) / len(
-                                st.session_state.previous_projections['cash_flow'])))
+                        prev_avg_cash_flow = st.session_state.previous_projections['avg_cash_flow']
                         st.markdown(
                             format_change(current_avg_cash_flow, prev_avg_cash_flow),
                             unsafe_allow_html=True
@@ -945,7 +945,7 @@ def main():
                                     'liability_values': current_projections['liability_values']
                                 }
                             }
-                            st.session_state.saved_projections.append(projection)
+                            get_scenario_store().save(current_owner(), projection)
                             st.success("Projection saved to your profile!")
                         else:
                             st.warning("Please enter a name for this scenario before saving.")
@@ -987,8 +987,12 @@ def main():
                         current_projections['liability_breakdown']
                     )
 
-                # Store current projections as previous before any new milestone is added
-                st.session_state.previous_projections = current_projections
+                # Keep the headline figures of the current projections to compare the next ones with
+                st.session_state.previous_projections = {
+                    'initial_net_worth': current_projections['net_worth'][0],
+                    'final_net_worth': current_projections['net_worth'][-1],
+                    'avg_cash_flow': current_avg_cash_flow,
+                }
 
     except Exception as e:
         st.error(f"An unexpected error occurred: {str(e)}")
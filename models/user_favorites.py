@@ -1,6 +1,12 @@
-"""User favorites management module"""
+"""User favorites management module
+
+Session state holds only the keys of favorite careers (occupation keys) and
+schools (college ids); the rows themselves are looked up in the datasets
+shared by every session.
+"""
 import streamlit as st
-from typing import Dict, List, Optional
+from typing import Dict, Hashable, List, Optional
+from utils.dataset_registry import get_row_index, get_shared_dataset
 
 class UserFavorites:
     @staticmethod
@@ -11,59 +17,82 @@ class UserFavorites:
         if 'favorite_schools' not in st.session_state:
             st.session_state.favorite_schools = []
 
+    @staticmethod
+    def career_key(career_data: Dict) -> str:
+        """Occupation key of an OEWS career row or a BLS search result"""
+        if 'OCC_KEY' in career_data:
+            return str(career_data['OCC_KEY'])
+        if 'code' in career_data:
+            return str(career_data['code'])
+        return str(career_data['OCC_TITLE'])
+
+    @staticmethod
+    def school_key(school_data: Dict) -> int:
+        """College id of a college row"""
+        return int(school_data['id'])
+
     @staticmethod
     def add_favorite_career(career_data: Dict):
         """Add a career to favorites"""
-        # Convert Pandas Series to dict if needed
-        if hasattr(career_data, 'to_dict'):
-            career_dict = career_data.to_dict()
-        else:
-            career_dict = career_data
-            
+        key = UserFavorites.career_key(career_data)
         # Only add if not already in favorites
-        if not UserFavorites.is_favorite_career(career_data):
-            st.session_state.favorite_careers.append(career_dict)
+        if key not in st.session_state.favorite_careers:
+            st.session_state.favorite_careers.append(key)
 
     @staticmethod
     def remove_favorite_career(career_data: Dict):
         """Remove a career from favorites"""
-        career_title = career_data['OCC_TITLE']
-        # Find and remove the career with matching title
-        st.session_state.favorite_careers = [
-            fav for fav in st.session_state.favorite_careers 
-            if fav['OCC_TITLE'] != career_title
-        ]
+        key = UserFavorites.career_key(career_data)
+        st.session_state.favorite_careers = [fav for fav in st.session_state.favorite_careers if fav != key]
 
     @staticmethod
     def add_favorite_school(school_data: Dict):
         """Add a school to favorites"""
-        if school_data not in st.session_state.favorite_schools:
-            st.session_state.favorite_schools.append(school_data)
+        key = UserFavorites.school_key(school_data)
+        if key not in st.session_state.favorite_schools:
+            st.session_state.favorite_schools.append(key)
 
     @staticmethod
     def remove_favorite_school(school_data: Dict):
         """Remove a school from favorites"""
-        if school_data in st.session_state.favorite_schools:
-            st.session_state.favorite_schools.remove(school_data)
+        key = UserFavorites.school_key(school_data)
+        if key in st.session_state.favorite_schools:
+            st.session_state.favorite_schools.remove(key)
 
     @staticmethod
     def get_favorite_careers() -> List[Dict]:
         """Get all favorite careers"""
-        return st.session_state.favorite_careers
+        return [UserFavorites._career(key) for key in st.session_state.favorite_careers]
 
     @staticmethod
     def get_favorite_schools() -> List[Dict]:
         """Get all favorite schools"""
-        return st.session_state.favorite_schools
+        schools = (UserFavorites._school(key) for key in st.session_state.favorite_schools)
+        return [school for school in schools if school is not None]
 
     @staticmethod
     def is_favorite_career(career_data: Dict) -> bool:
         """Check if a career is in favorites"""
-        # Compare by occupation title since we're dealing with Pandas Series objects
-        career_title = career_data['OCC_TITLE']
-        return any(fav['OCC_TITLE'] == career_title for fav in st.session_state.favorite_careers)
+        return UserFavorites.career_key(career_data) in st.session_state.favorite_careers
 
     @staticmethod
     def is_favorite_school(school_data: Dict) -> bool:
         """Check if a school is in favorites"""
-        return school_data in st.session_state.favorite_schools
+        return UserFavorites.school_key(school_data) in st.session_state.favorite_schools
+
+    @staticmethod
+    def _career(key: Hashable) -> Dict:
+        """Career details for a favorite, shaped for both the OEWS and BLS career views"""
+        row = get_row_index('careers', 'OCC_KEY').get(key)
+        if row is None:
+            return {'OCC_KEY': key, 'OCC_TITLE': key, 'code': key, 'title': key}
+        career = get_shared_dataset('careers').iloc[row].to_dict()
+        career['title'] = career['OCC_TITLE']
+        # The salary service indexes careers by OCC_KEY, which is the title for mangled SOC codes
+        career['code'] = career['OCC_KEY']
+        return career
+
+    @staticmethod
+    def _school(key: Hashable) -> Optional[Dict]:
+        row = get_row_index('colleges', 'id').get(key)
+        return get_shared_dataset('colleges').iloc[row].to_dict() if row is not None else None
@@ -2,10 +2,12 @@
 import streamlit as st
 import pandas as pd
 from services.bls_api import BLSApi
+from services.oews_salary import OEWSSalaryService
+from utils.cache_utils import get_salary_service
 from models.user_favorites import UserFavorites
 from typing import Dict, List
 
-def show_career_details(career: Dict, bls_api: BLSApi, prefix: str = ""):
+def show_career_details(career: Dict, bls_api: OEWSSalaryService, prefix: str = ""):
     """Display detailed information for a career"""
     st.markdown(f"### {career['title']} 💼")
 
@@ -60,11 +62,14 @@ def show_career_discovery():
     # Initialize favorites
     UserFavorites.init_session_state()
 
+    # Salaries come from the bundled OEWS table; the live API (when a key is
+    # configured) only fills in what the table does not have
     try:
-        bls_api = BLSApi()
+        fallback = BLSApi()
     except Exception as e:
-        st.error(f"Error initializing BLS API: {str(e)}")
-        return
+        print(f"BLS API unavailable, using OEWS data only: {str(e)}")
+        fallback = None
+    bls_api = get_salary_service(fallback)
 
     # Create two columns for layout
     main_col, favorites_col = st.columns([2, 1])
@@ -80,6 +85,10 @@ def show_career_discovery():
         if career_search:
             matching_careers = bls_api.search_occupations(career_search)
             if matching_careers:
+                # One batched request for every career shown below
+                bls_api.prefetch_career_details(
+                    [career['code'] for career in matching_careers + UserFavorites.get_favorite_careers()]
+                )
                 st.markdown("### Matching Careers")
                 for career in matching_careers:
                     with st.expander(f"🔍 {career['title']}", expanded=False):
@@ -92,8 +101,9 @@ def show_career_discovery():
         favorite_careers = UserFavorites.get_favorite_careers()
 
         if favorite_careers:
+            bls_api.prefetch_career_details([career['code'] for career in favorite_careers])
             for career in favorite_careers:
-                with st.expander(f"⭐ {career['title']}", expanded=False):
+                with st.expander(f"⭐ {career.get('title', career.get('OCC_TITLE'))}", expanded=False):
                     show_career_details(career, bls_api, prefix="fav_")
         else:
             st.info("No favorite careers yet. Add some by clicking the star!")
@@ -2,41 +2,20 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from typing import Tuple
+from components.result_pager import get_markup_cache, render_paginated_results, sort_rows
 from models.user_favorites import UserFavorites
+from services.oews_salary import NATIONAL_AREA
+from utils.cache_utils import dataset_version, get_wage_cube
+from utils.datasets import OEWS_DATA_PATH
+from utils.dataset_registry import get_shared_dataset
+from visualizations.plotter import FinancialPlotter
 
 def load_career_data():
-    """Load and preprocess BLS OEWS data"""
+    """Get the BLS OEWS career table shared by every session"""
     try:
-        df = pd.read_csv('attached_assets/BLS OEWS.csv')
-        
-        # Select relevant columns
-        columns_of_interest = [
-            'OCC_TITLE',  # Career title
-            'Alias 1', 'Alias 2', 'Alias 3', 'Alias 4', 'Alias 5',  # Alternative titles
-            'TOT_EMP',    # Total employment
-            'A_MEAN',     # Annual mean wage
-            'A_PCT10', 'A_PCT25', 'A_MEDIAN', 'A_PCT75', 'A_PCT90'  # Wage percentiles
-        ]
-        df = df[columns_of_interest]
-        
-        # Clean up employment data (remove commas and convert to numeric)
-        df['TOT_EMP'] = df['TOT_EMP'].str.replace(',', '')
-        df['TOT_EMP'] = pd.to_numeric(df['TOT_EMP'], errors='coerce')
-        
-        # Convert salary columns to numeric, handling special characters
-        salary_columns = ['A_MEAN', 'A_PCT10', 'A_PCT25', 'A_MEDIAN', 'A_PCT75', 'A_PCT90']
-        for col in salary_columns:
-            # First convert any string numbers to proper format
-            df[col] = df[col].astype(str).str.replace(',', '')
-            # Then convert to numeric, replacing special characters with NaN
-            df[col] = pd.to_numeric(df[col].replace(['#', '*', ''], np.nan), errors='coerce')
-        
-        # Clean up string columns
-        string_columns = ['OCC_TITLE', 'Alias 1', 'Alias 2', 'Alias 3', 'Alias 4', 'Alias 5']
-        for col in string_columns:
-            df[col] = df[col].fillna('').astype(str).str.strip()
-        
-        return df
+        # Numeric columns are already cleaned and typed by the dataset build step
+        return get_shared_dataset('careers')
     except Exception as e:
         st.error(f"Error loading career data: {str(e)}")
         return None
@@ -53,6 +32,54 @@ def format_number(num):
         return "Not available"
     return f"{num:,.0f}"
 
+def career_card_markup(career: pd.Series, filter_type: str) -> Tuple[str, str]:
+    """Build the expander title and details markdown for a career card"""
+    title = career['OCC_TITLE']
+
+    # Format the title to include key information
+    if filter_type == "Top 50 by Employment":
+        display_title = f"{title} ({format_number(career['TOT_EMP'])} employed)"
+    else:
+        display_title = f"{title} (Median salary: {format_salary(career['A_MEDIAN'])})"
+
+    lines = [
+        "**Career Details**",
+        f"Median Annual Salary: {format_salary(career['A_MEDIAN'])}",
+        f"Mean Annual Salary: {format_salary(career['A_MEAN'])}",
+        f"Total Employment: {format_number(career['TOT_EMP'])}",
+        "",
+        # Display salary percentiles
+        "**Salary Percentiles**",
+        f"10th Percentile: {format_salary(career['A_PCT10'])}",
+        f"25th Percentile: {format_salary(career['A_PCT25'])}",
+        f"75th Percentile: {format_salary(career['A_PCT75'])}",
+        f"90th Percentile: {format_salary(career['A_PCT90'])}"
+    ]
+
+    # Display aliases if available
+    aliases = [
+        alias for alias in [
+            career['Alias 1'], career['Alias 2'],
+            career['Alias 3'], career['Alias 4'],
+            career['Alias 5']
+        ] if alias and alias.strip()
+    ]
+    if aliases:
+        lines += ["", "**Also known as:**", ", ".join(aliases)]
+
+    return display_title, "  \n".join(lines)
+
+def render_wage_distribution(df: pd.DataFrame, rows: np.ndarray, heading: str):
+    """Heatmap of the wage percentiles of the listed careers, sliced from the wage cube"""
+    cube = get_wage_cube()
+    codes = df['OCC_KEY'].iloc[rows].tolist()
+    grid = cube.stats_frame(NATIONAL_AREA, codes, stats=['p10', 'p25', 'median', 'p75', 'p90'])
+    FinancialPlotter.plot_salary_heatmap(
+        grid, list(grid.columns), list(grid.index),
+        title=f"National Wage Distribution: {heading}",
+        x_title="Statistic"
+    )
+
 def load_career_exploration_page():
     st.title("Career Exploration 💼")
 
@@ -95,67 +122,45 @@ def load_career_exploration_page():
             horizontal=True
         )
 
-        # Filter and sort data based on selection
+        # Sort on the server; only the visible page of careers is rendered
+        sort_column = 'TOT_EMP' if filter_type == "Top 50 by Employment" else 'A_MEDIAN'
+        ranked = np.flatnonzero(df[sort_column].notna().to_numpy())
+        top_rows = sort_rows(ranked, df[sort_column], ascending=False)[:50]
         if filter_type == "Top 50 by Employment":
-            # Sort by total employment, handle NaN values
-            filtered_df = df.dropna(subset=['TOT_EMP'])
-            filtered_df = filtered_df.nlargest(50, 'TOT_EMP')
             st.subheader("Top 50 Careers by Total Employment")
         else:
-            # Sort by median salary, handle NaN values
-            filtered_df = df.dropna(subset=['A_MEDIAN'])
-            filtered_df = filtered_df.sort_values('A_MEDIAN', ascending=False).head(50)
             st.subheader("Top 50 Careers by Median Salary")
 
-        # Show results in an expandable format
-        for _, career in filtered_df.iterrows():
-            title = career['OCC_TITLE']
-            
-            # Format the title to include key information
-            if filter_type == "Top 50 by Employment":
-                display_title = f"{title} ({format_number(career['TOT_EMP'])} employed)"
-            else:
-                display_title = f"{title} (Median salary: {format_salary(career['A_MEDIAN'])})"
-            
-            with st.expander(display_title):
-                col1, col2 = st.columns([3, 1])
+        markup_cache = get_markup_cache(f"career_card:{filter_type}:{dataset_version(OEWS_DATA_PATH)}")
 
-                with col1:
-                    st.write("**Career Details**")
-                    st.write(f"Median Annual Salary: {format_salary(career['A_MEDIAN'])}")
-                    st.write(f"Mean Annual Salary: {format_salary(career['A_MEAN'])}")
-                    st.write(f"Total Employment: {format_number(career['TOT_EMP'])}")
-                    
-                    # Display salary percentiles
-                    st.write("\n**Salary Percentiles**")
-                    st.write(f"10th Percentile: {format_salary(career['A_PCT10'])}")
-                    st.write(f"25th Percentile: {format_salary(career['A_PCT25'])}")
-                    st.write(f"75th Percentile: {format_salary(career['A_PCT75'])}")
-                    st.write(f"90th Percentile: {format_salary(career['A_PCT90'])}")
-
-                    # Display aliases if available
-                    aliases = [
-                        alias for alias in [
-                            career['Alias 1'], career['Alias 2'],
-                            career['Alias 3'], career['Alias 4'],
-                            career['Alias 5']
-                        ] if alias and alias.strip()
-                    ]
-                    if aliases:
-                        st.write("\n**Also known as:**")
-                        st.write(", ".join(aliases))
+        def render_career_window(window: np.ndarray):
+            for row_id, (_, career) in zip(window, df.iloc[window].iterrows()):
+                title = career['OCC_TITLE']
+                display_title, details = markup_cache.get(int(row_id), lambda: career_card_markup(career, filter_type))
 
-                with col2:
-                    # Check if career is already a favorite
-                    is_favorite = UserFavorites.is_favorite_career(career)
-                    if is_favorite:
-                        if st.button("⭐", key=f"unfav_{title}", help="Remove from favorites", type="secondary"):
-                            UserFavorites.remove_favorite_career(career)
-                            st.rerun()
-                    else:
-                        if st.button("☆", key=f"fav_{title}", help="Add to favorites"):
-                            UserFavorites.add_favorite_career(career)
-                            st.rerun()
+                with st.expander(display_title):
+                    col1, col2 = st.columns([3, 1])
+
+                    with col1:
+                        st.markdown(details)
+
+                    with col2:
+                        # Check if career is already a favorite
+                        is_favorite = UserFavorites.is_favorite_career(career)
+                        if is_favorite:
+                            if st.button("⭐", key=f"unfav_{title}", help="Remove from favorites", type="secondary"):
+                                UserFavorites.remove_favorite_career(career)
+                                st.rerun()
+                        else:
+                            if st.button("☆", key=f"fav_{title}", help="Add to favorites"):
+                                UserFavorites.add_favorite_career(career)
+                                st.rerun()
+
+        render_paginated_results(f"career_results_{sort_column}", top_rows, render_career_window,
+                                 page_size=10, item_label="careers")
+
+        with st.expander("📊 Compare wage distributions"):
+            render_wage_distribution(df, top_rows, filter_type)
 
 if __name__ == "__main__":
     load_career_exploration_page() 
\ No newline at end of file
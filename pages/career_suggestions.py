@@ -1,5 +1,6 @@
 import streamlit as st
 import json
+from typing import Dict, Optional
 from services.career_suggestion import CareerSuggestionService
 from visualizations.plotter import FinancialPlotter
 
@@ -129,6 +130,72 @@ def load_career_game():
     progress = st.session_state.game_stage / len(stages)
     st.progress(progress)
 
+def render_skill_recommendations(skill_data: Dict) -> None:
+    """Show the skills, soft skills and certifications recommended for a career path"""
+    if "error" in skill_data:
+        st.warning(skill_data["error"])
+        return
+
+    if "technical_skills" in skill_data:
+        st.write("**Technical Skills to Develop:**")
+        for skill in skill_data["technical_skills"]:
+            st.write(f"- {skill}")
+
+    if "soft_skills" in skill_data:
+        st.write("**Soft Skills to Enhance:**")
+        for skill in skill_data["soft_skills"]:
+            st.write(f"- {skill}")
+
+    if "certifications" in skill_data:
+        st.write("**Recommended Certifications:**")
+        for cert in skill_data["certifications"]:
+            st.write(f"- {cert}")
+
+
+def render_career_preview(paths: Dict[str, Dict]) -> str:
+    """Markdown for the career paths received so far while suggestions stream in"""
+    lines = []
+    for key, path in paths.items():
+        heading = "🎯" if key == 'primary_path' else "🔄"
+        lines.append(f"#### {heading} {path.get('title', '...')}")
+        if path.get('description'):
+            lines.append(path['description'])
+        for milestone in path['timeline']:
+            lines.append(f"- **{milestone.get('year', '')}**: {milestone.get('milestone', '')}")
+    return "\n\n".join(lines)
+
+
+def stream_career_data(career_service: CareerSuggestionService, **request) -> Optional[Dict]:
+    """
+    Stream career suggestions, showing each path and milestone as it arrives.
+
+    Args:
+        career_service: Service used to generate the suggestions
+        **request: Arguments for ``stream_career_suggestions``
+
+    Returns:
+        The complete suggestions, or None if generation failed
+    """
+    preview = st.empty()
+    paths: Dict[str, Dict] = {}
+    try:
+        for path, value in career_service.stream_career_suggestions(**request):
+            if path == ():
+                preview.empty()
+                return value
+            key = path[0] if path[0] == 'primary_path' else f"alternative_{path[1]}"
+            entry = paths.setdefault(key, {'timeline': []})
+            if path[-2] == 'timeline':
+                entry['timeline'].append(value)
+            else:
+                entry[path[-1]] = value
+            preview.markdown(render_career_preview(paths))
+    except Exception as e:
+        preview.empty()
+        st.error(f"Failed to generate career suggestions: {str(e)}")
+    return None
+
+
 def load_career_suggestions_page():
     """Main career suggestions page"""
     st.title("AI Career Path Suggestions 🎯")
@@ -291,7 +358,8 @@ def load_career_suggestions_page():
 
         with st.spinner("Generating career suggestions..."):
             try:
-                suggestions = career_service.generate_career_suggestions(
+                career_data = stream_career_data(
+                    career_service,
                     interests=interests,
                     skills=skills,
                     education_level=education_level,
@@ -299,12 +367,7 @@ def load_career_suggestions_page():
                     preferred_industry=preferred_industry,
                     salary_expectation=salary_expectation
                 )
-
-                # Parse and display suggestions
-                career_data = json.loads(suggestions)
-
-                if "error" in career_data:
-                    st.error(career_data["error"])
+                if career_data is None:
                     return
 
                 # Display visualizations and suggestions
@@ -363,26 +426,19 @@ def load_career_suggestions_page():
                             st.session_state.saved_career_suggestions.append(saved_career)
                             st.success(f"Saved {alt_path['title']} to your profile!")
 
-                # Get skill recommendations
+                # Get skill recommendations for every path at once
                 st.subheader("📚 Recommended Skills Development")
-                primary_path_title = career_data['primary_path']['title']
-                skill_recommendations = career_service.get_skill_recommendations(primary_path_title)
-                skill_data = json.loads(skill_recommendations)
-
-                if "technical_skills" in skill_data:
-                    st.write("**Technical Skills to Develop:**")
-                    for skill in skill_data["technical_skills"]:
-                        st.write(f"- {skill}")
-
-                if "soft_skills" in skill_data:
-                    st.write("**Soft Skills to Enhance:**")
-                    for skill in skill_data["soft_skills"]:
-                        st.write(f"- {skill}")
-
-                if "certifications" in skill_data:
-                    st.write("**Recommended Certifications:**")
-                    for cert in skill_data["certifications"]:
-                        st.write(f"- {cert}")
+                path_titles = [career_data['primary_path']['title']]
+                path_titles += [alt_path['title'] for alt_path in career_data.get('alternative_paths', [])]
+                placeholders = {}
+                for path_title in dict.fromkeys(path_titles):
+                    with st.expander(f"📋 {path_title}", expanded=not placeholders):
+                        placeholders[path_title] = st.empty()
+                        placeholders[path_title].caption("Loading skill recommendations...")
+
+                for path_title, skill_recommendations in career_service.iter_skill_recommendations(path_titles):
+                    with placeholders[path_title].container():
+                        render_skill_recommendations(json.loads(skill_recommendations))
 
                 # Add profile navigation
                 st.markdown("---")
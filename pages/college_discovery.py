@@ -2,59 +2,32 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from typing import Optional, Tuple
+from components.result_pager import get_markup_cache, render_paginated_results, sort_rows
 from models.user_favorites import UserFavorites
-from difflib import get_close_matches
-from fuzzywuzzy import fuzz
+from utils.cache_utils import dataset_version, get_college_name_index, get_college_filter_index
+from utils.datasets import COLLEGE_DATA_PATH
+from utils.dataset_registry import get_shared_dataset
 
 def load_college_data():
-    """Load and preprocess college scorecard data"""
+    """Get the college scorecard table shared by every session"""
     try:
-        df = pd.read_csv('attached_assets/Updated_Most-Recent-Cohorts-Institution.csv')
-        # Select relevant columns including the new rankings
-        columns_of_interest = [
-            'name', 'city', 'state', 
-            'admission_rate.overall',
-            'sat_scores.average.overall',
-            'act_scores.midpoint.cumulative',
-            'avg_net_price.public',
-            'avg_net_price.private',
-            'ownership',
-            'US News Top 150',  # Updated column name
-            'best liberal arts colleges'  # New column added
-        ]
-        return df[columns_of_interest]
+        return get_shared_dataset('colleges')
     except Exception as e:
         st.error(f"Error loading college data: {str(e)}")
         return None
 
 def get_best_matches(search_query: str, df: pd.DataFrame, num_matches: int = 3) -> pd.DataFrame:
-    """Find the best matching colleges using fuzzy string matching"""
+    """Find the best matching colleges using the prebuilt college name index"""
     if not search_query:
         return pd.DataFrame()
-    
-    # Calculate similarity scores for each college name
-    scores = [(name, fuzz.ratio(search_query.lower(), name.lower()))
-             for name in df['name']]
-    
-    # Sort by score in descending order and get top matches
-    best_matches = sorted(scores, key=lambda x: x[1], reverse=True)[:num_matches]
-    best_match_names = [match[0] for match in best_matches]
-    
-    # Create a new DataFrame with the matching rows
-    matched_colleges = df[df['name'].isin(best_match_names)].copy()
-    
-    # Create a mapping for sorting
-    name_to_order = {name: idx for idx, name in enumerate(best_match_names)}
-    
-    # Add sort order and sort
-    matched_colleges.loc[:, 'sort_order'] = matched_colleges['name'].map(name_to_order)
-    matched_colleges = matched_colleges.sort_values('sort_order')
-    matched_colleges = matched_colleges.drop('sort_order', axis=1)
-    
-    return matched_colleges
 
-def display_college_card(college: pd.Series, show_favorite_button: bool = True, source: str = "filter"):
-    """Display a college card with consistent styling"""
+    # The index is built once per dataset version and maps queries to row positions
+    index = get_college_name_index(f"{dataset_version(COLLEGE_DATA_PATH)}:{len(df)}", df['name'])
+    return df.iloc[index.search_ids(search_query, limit=num_matches)]
+
+def college_card_markup(college: pd.Series) -> Tuple[str, str, str]:
+    """Build the title, details and cost markdown shown on a college card"""
     # Create a title that includes ranking if available
     if pd.notna(college['US News Top 150']):
         title = f"🏫 #{int(college['US News Top 150'])} - {college['name']}"
@@ -66,42 +39,52 @@ def display_college_card(college: pd.Series, show_favorite_button: bool = True,
     # Add location to title
     title += f" ({college['city']}, {college['state']})"
 
+    details = ["**Institution Details**"]
+    if pd.notna(college['admission_rate.overall']):
+        details.append(f"• Admission Rate: {college['admission_rate.overall']*100:.1f}%")
+    if pd.notna(college['sat_scores.average.overall']):
+        details.append(f"• Average SAT: {int(college['sat_scores.average.overall'])}")
+    if pd.notna(college['US News Top 150']):
+        details.append(f"• US News: #{int(college['US News Top 150'])}")
+    if pd.notna(college['best liberal arts colleges']):
+        details.append(f"• Liberal Arts: #{int(college['best liberal arts colleges'])}")
+
+    cost = ["**Cost Information**"]
+    if college['ownership'] == 1:  # Public institution
+        if pd.notna(college['avg_net_price.public']):
+            cost.append(f"• In-State: ${int(college['avg_net_price.public']):,}")
+        if pd.notna(college['avg_net_price.private']):
+            cost.append(f"• Out-of-State: ${int(college['avg_net_price.private']):,}")
+    else:  # Private institution
+        if pd.notna(college['avg_net_price.private']):
+            cost.append(f"• Tuition: ${int(college['avg_net_price.private']):,}")
+
+    return title, "  \n".join(details), "  \n".join(cost)
+
+def display_college_card(college: pd.Series, show_favorite_button: bool = True, source: str = "filter",
+                         markup: Optional[Tuple[str, str, str]] = None):
+    """Display a college card with consistent styling"""
+    title, details, cost = markup or college_card_markup(college)
+
     with st.expander(title):
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            st.write("**Institution Details**")
-            if pd.notna(college['admission_rate.overall']):
-                st.write(f"• Admission Rate: {college['admission_rate.overall']*100:.1f}%")
-            if pd.notna(college['sat_scores.average.overall']):
-                st.write(f"• Average SAT: {int(college['sat_scores.average.overall'])}")
-            if pd.notna(college['US News Top 150']):
-                st.write(f"• US News: #{int(college['US News Top 150'])}")
-            if pd.notna(college['best liberal arts colleges']):
-                st.write(f"• Liberal Arts: #{int(college['best liberal arts colleges'])}")
+            st.markdown(details)
         
         with col2:
-            st.write("**Cost Information**")
-            if college['ownership'] == 1:  # Public institution
-                if pd.notna(college['avg_net_price.public']):
-                    st.write(f"• In-State: ${int(college['avg_net_price.public']):,}")
-                if pd.notna(college['avg_net_price.private']):
-                    st.write(f"• Out-of-State: ${int(college['avg_net_price.private']):,}")
-            else:  # Private institution
-                if pd.notna(college['avg_net_price.private']):
-                    st.write(f"• Tuition: ${int(college['avg_net_price.private']):,}")
+            st.markdown(cost)
             
             if show_favorite_button:
-                college_dict = college.to_dict()
                 # Create a unique key using name, city, state, and source
                 unique_key = f"{college['name']}_{college['city']}_{college['state']}_{source}"
-                if UserFavorites.is_favorite_school(college_dict):
+                if UserFavorites.is_favorite_school(college):
                     if st.button("❌ Remove", key=f"remove_{unique_key}", use_container_width=True):
-                        UserFavorites.remove_favorite_school(college_dict)
+                        UserFavorites.remove_favorite_school(college)
                         st.rerun()
                 else:
                     if st.button("⭐ Add", key=f"add_{unique_key}", use_container_width=True):
-                        UserFavorites.add_favorite_school(college_dict)
+                        UserFavorites.add_favorite_school(college)
                         st.rerun()
 
 def load_college_discovery_page():
@@ -254,91 +237,45 @@ def load_college_discovery_page():
             default=list(institution_types.values())
         )
 
-        # Apply filters
-        filtered_df = df.copy()
-
-        # Always apply Top 150 filter first if checkbox is selected
-        if show_top_150:
-            filtered_df = filtered_df[filtered_df['US News Top 150'].notna()].sort_values('US News Top 150')
-
-        # Apply Liberal Arts filter if selected
-        if show_liberal_arts:
-            filtered_df = filtered_df[filtered_df['best liberal arts colleges'].notna()].sort_values('best liberal arts colleges')
-
-        # Apply state filter if states are selected
-        if selected_states:
-            filtered_df = filtered_df[filtered_df['state'].isin(selected_states)].copy()
-
-        # Apply tuition filters
-        # For public schools (ownership == 1), check in-state tuition
-        public_mask = (
-            (filtered_df['ownership'] == 1) & 
-            (
-                pd.isna(filtered_df['avg_net_price.public']) |
-                (
-                    (filtered_df['avg_net_price.public'] >= in_state_tuition_range[0]) &
-                    (filtered_df['avg_net_price.public'] <= in_state_tuition_range[1])
-                )
-            )
+        # Apply filters through the precomputed bitmap index
+        type_to_code = {v: k for k, v in institution_types.items()}
+        filter_index = get_college_filter_index(f"{dataset_version(COLLEGE_DATA_PATH)}:{len(df)}", df)
+        matching_rows = filter_index.filter(
+            states=selected_states,
+            in_state_tuition_range=in_state_tuition_range,
+            out_state_tuition_range=out_state_tuition_range,
+            admission_rate_range=admission_rate_range,
+            sat_range=sat_range,
+            ownership_codes=[type_to_code[type_name] for type_name in selected_types],
+            top_150_only=show_top_150,
+            liberal_arts_only=show_liberal_arts
         )
 
-        # For private schools and out-of-state public tuition
-        private_mask = (
-            (filtered_df['ownership'].isin([2, 3])) & 
-            (
-                pd.isna(filtered_df['avg_net_price.private']) |
-                (
-                    (filtered_df['avg_net_price.private'] >= out_state_tuition_range[0]) &
-                    (filtered_df['avg_net_price.private'] <= out_state_tuition_range[1])
-                )
-            )
-        )
+        # Sort on the server and render only the visible page of results
+        sort_options = {
+            "Ranking": None,
+            "Name": (lambda: df['name'], True),
+            # Public schools are priced in-state, matching the cost shown on their card
+            "Lowest Net Price": (lambda: df['avg_net_price.public'].where(df['ownership'] == 1,
+                                                                         df['avg_net_price.private']), True),
+            "Lowest Admission Rate": (lambda: df['admission_rate.overall'], True),
+            "Highest Average SAT": (lambda: df['sat_scores.average.overall'], False)
+        }
+        sort_choice = st.selectbox("Sort Results By", list(sort_options.keys()))
+        if sort_options[sort_choice] is not None:
+            sort_values, ascending = sort_options[sort_choice]
+            matching_rows = sort_rows(matching_rows, sort_values(), ascending)
 
-        # Combine masks
-        filtered_df = filtered_df[public_mask | private_mask]
+        st.subheader(f"Found {len(matching_rows)} matching institutions")
+        markup_cache = get_markup_cache(f"college_card:{dataset_version(COLLEGE_DATA_PATH)}:{len(df)}")
 
-        # Set null admission rates to 100% and then filter
-        filtered_df['admission_rate.overall'] = filtered_df['admission_rate.overall'].fillna(1.0)
-        filtered_df = filtered_df[
-            (filtered_df['admission_rate.overall'] * 100 >= admission_rate_range[0]) &
-            (filtered_df['admission_rate.overall'] * 100 <= admission_rate_range[1])
-        ]
+        def render_college_window(window: np.ndarray):
+            for row_id, (_, college) in zip(window, df.iloc[window].iterrows()):
+                markup = markup_cache.get(int(row_id), lambda: college_card_markup(college))
+                display_college_card(college, source="filter", markup=markup)
 
-        # Handle SAT score filter with missing data
-        sat_mask = pd.isna(filtered_df['sat_scores.average.overall']) | (
-            (filtered_df['sat_scores.average.overall'] >= sat_range[0]) &
-            (filtered_df['sat_scores.average.overall'] <= sat_range[1])
-        )
-        filtered_df = filtered_df[sat_mask]
-
-        # Filter by institution type
-        if selected_types:
-            # Create a mapping from type name back to code
-            type_to_code = {v: k for k, v in institution_types.items()}
-            selected_codes = [type_to_code[type_name] for type_name in selected_types]
-            filtered_df = filtered_df[filtered_df['ownership'].isin(selected_codes)]
-
-        # Display results in a scrollable container
-        st.subheader(f"Found {len(filtered_df)} matching institutions")
-        with st.container():
-            max_height = 600  # Maximum height in pixels
-            st.markdown(f"""
-                <style>
-                    .college-results {{
-                        max-height: {max_height}px;
-                        overflow-y: auto;
-                        padding: 1rem;
-                        border-radius: 0.5rem;
-                        background-color: #f8f9fa;
-                    }}
-                </style>
-            """, unsafe_allow_html=True)
-            
-            with st.container():
-                st.markdown('<div class="college-results">', unsafe_allow_html=True)
-                for _, college in filtered_df.iterrows():
-                    display_college_card(college, source="filter")
-                st.markdown('</div>', unsafe_allow_html=True)
+        render_paginated_results("college_results", matching_rows, render_college_window,
+                                 item_label="institutions")
 
 if __name__ == "__main__":
     load_college_discovery_page()
\ No newline at end of file
@@ -5,7 +5,7 @@ from typing import Dict, List, Optional
 import plotly.graph_objects as go
 from models.milestone_factory import Milestone, MilestoneFactory
 from components.timeline_component import timeline_component
-from fuzzywuzzy import fuzz
+from pages.college_discovery import load_college_data, get_best_matches
 import graphviz
 
 # Page configuration
@@ -275,19 +275,9 @@ def show_known_path():
                 )
                 
                 if search_query:
-                    # Load college data
-                    df = pd.read_csv('attached_assets/Updated_Most-Recent-Cohorts-Institution.csv')
-                    
-                    # Calculate similarity scores for each college name
-                    scores = [(name, fuzz.ratio(search_query.lower(), name.lower()))
-                             for name in df['name']]
-                    
-                    # Sort by score in descending order and get top matches
-                    best_matches = sorted(scores, key=lambda x: x[1], reverse=True)[:5]
-                    best_match_names = [match[0] for match in best_matches]
-                    
-                    # Create a new DataFrame with the matching rows
-                    matched_colleges = df[df['name'].isin(best_match_names)].copy()
+                    # Load college data and look up the top matches in the name index
+                    df = load_college_data()
+                    matched_colleges = get_best_matches(search_query, df, num_matches=5) if df is not None else pd.DataFrame()
                     
                     if not matched_colleges.empty:
                         st.write("#### Top Matches:")
@@ -319,7 +309,7 @@ def show_known_path():
                                             st.write(f"• Tuition: ${int(college['avg_net_price.private']):,}")
                                 
                                 if st.button("Select this college", key=f"select_{college_id}"):
-                                    st.session_state.selected_college = college.to_dict()
+                                    st.session_state.selected_college = int(college['id'])
                                     st.session_state.selected_college_name = college['name']
                                     st.rerun()
                     else:
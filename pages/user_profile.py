@@ -3,7 +3,134 @@ import streamlit as st
 import pandas as pd
 from models.user_favorites import UserFavorites
 from utils.zip_income import get_income_estimate
-from services.financial_assessment import generate_financial_assessment
+from utils.income_rollups import local_income_context
+from components.result_pager import render_paginated_results
+from services.financial_assessment import assess_scenario, generate_assessments, get_cached_assessment
+from services.scenario_comparison import METRIC_LABELS, ScenarioComparison
+from services.scenario_store import YEARLY_SERIES, current_owner, get_scenario_store
+from utils.session_memory import session_memory_report, shared_memory_report
+from visualizations.plotter import FinancialPlotter
+
+SORT_OPTIONS = {
+    "Newest first": 'newest',
+    "Oldest first": 'oldest',
+    "Highest net worth": 'net_worth_desc',
+    "Lowest net worth": 'net_worth_asc',
+}
+
+def save_assessment(store, proj: dict, previous) -> None:
+    """Persist an assessment that ``assess_scenario`` stored on the scenario dict"""
+    if proj.get('assessment') and proj['assessment'] != previous:
+        store.update_assessment(proj['id'], proj['assessment'])
+
+def render_saved_projection(store, proj: dict):
+    """Expander for one saved projection; its yearly data is only loaded when needed"""
+    with st.expander(f"Projection: {proj['name']} ({proj['date']})", expanded=False):
+        st.write(f"Location: {proj['location']}")
+        st.write(f"Occupation: {proj['occupation']}")
+        st.write(f"Investment Return Rate: {proj['investment_rate']}%")
+        st.write(f"Final Net Worth: ${proj['final_net_worth']:,}")
+
+        # Rank the projected starting income against the user's area
+        if st.session_state.user_zip_code and proj['years']:
+            series = store.series(proj['id'])
+            starting_income = int(series[YEARLY_SERIES.index('total_income'), 0])
+            context = local_income_context(starting_income, st.session_state.user_zip_code)
+            if context:
+                st.write(f"Starting income is above about {context['percentile']:.0f}% of tax returns "
+                         f"in your area ({context['level'].replace('zip3', 'ZIP prefix')} {context['region']})")
+
+        # Display milestones if present
+        if 'milestones' in proj and proj['milestones']:
+            st.subheader("Life Milestones:")
+            for milestone in proj['milestones']:
+                st.markdown(f"**{milestone['name']} (Year {milestone['year']})**")
+
+                # Display milestone-specific details
+                if milestone['type'] == 'Marriage':
+                    st.write(f"Wedding Cost: ${milestone['wedding_cost']:,}")
+                    st.write(f"Spouse Occupation: {milestone['spouse_occupation']}")
+                    st.write(f"Lifestyle Adjustment: {milestone['lifestyle_adjustment']}%")
+                    st.write(f"Spouse Initial Savings: ${milestone['spouse_savings']:,}")
+                    st.write(f"Spouse Initial Debt: ${milestone['spouse_debt']:,}")
+
+                elif milestone['type'] == 'HomePurchase':
+                    st.write(f"Home Price: ${milestone['home_price']:,}")
+                    st.write(f"Down Payment: {milestone['down_payment']}%")
+                    st.write(f"Monthly Utilities: ${milestone['monthly_utilities']:,}")
+                    st.write(f"Monthly HOA: ${milestone['monthly_hoa']:,}")
+                    st.write(f"Annual Renovation Budget: ${milestone['annual_renovation']:,}")
+
+                elif milestone['type'] == 'CarPurchase':
+                    st.write(f"Car Price: ${milestone['car_price']:,}")
+                    st.write(f"Down Payment: {milestone['down_payment']}%")
+                    st.write(f"Vehicle Type: {milestone['vehicle_type']}")
+                    st.write(f"Monthly Fuel Cost: ${milestone['monthly_fuel']:,}")
+                    st.write(f"Monthly Parking: ${milestone['monthly_parking']:,}")
+
+                elif milestone['type'] == 'Child':
+                    st.write(f"Monthly Education Savings: ${milestone['education_savings']/12:,.2f}")
+                    st.write(f"Annual Healthcare Cost: ${milestone['healthcare_cost']:,}")
+                    st.write(f"Annual Insurance Cost: ${milestone['insurance_cost']:,}")
+                    st.write(f"Annual Tax Benefit: ${milestone['tax_benefit']:,}")
+
+                elif milestone['type'] == 'GraduateSchool':
+                    st.write(f"Total Cost: ${milestone['total_cost']:,}")
+                    st.write(f"Program Length: {milestone['program_years']} years")
+                    st.write(f"Part-time Income: ${milestone['part_time_income']:,}/year")
+                    st.write(f"Scholarship Amount: ${milestone['scholarship_amount']:,}")
+                    st.write(f"Expected Salary Increase: {milestone['salary_increase']}%")
+
+                st.markdown("---")
+
+        # Add AI Assessment section
+        st.subheader("💡 AI Financial Assessment")
+        assessment = get_cached_assessment(proj)
+        if assessment is None and st.button("Generate Assessment", key=f"gen_assessment_{proj['id']}"):
+            with st.spinner("Generating financial assessment..."):
+                previous = proj.get('assessment')
+                assessment = assess_scenario(proj)
+                save_assessment(store, proj, previous)
+        if assessment is not None:
+            st.markdown(f"**Analysis:**\n{assessment}")
+
+        if st.button("Remove", key=f"remove_proj_{proj['id']}"):
+            store.delete(proj['id'])
+            st.rerun()
+
+def render_scenario_comparison(store, scenario_ids):
+    """Overlay chart and ranking of the scenarios picked from the filtered list"""
+    labels = store.labels(scenario_ids)
+    selected = st.multiselect(
+        "Scenarios to compare",
+        [int(scenario_id) for scenario_id in scenario_ids],
+        format_func=lambda scenario_id: labels.get(scenario_id, str(scenario_id)),
+        key="compare_scenario_ids"
+    )
+    if len(selected) < 2:
+        st.info("Pick at least two scenarios to compare them.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox("Compare by", list(METRIC_LABELS), format_func=METRIC_LABELS.get,
+                              key="compare_metric")
+    with col2:
+        baseline = st.selectbox("Baseline", range(len(selected)),
+                                format_func=lambda position: labels.get(selected[position]),
+                                key="compare_baseline")
+    comparison = ScenarioComparison.from_store(store, selected)
+    FinancialPlotter.plot_scenario_comparison(comparison, metric, min(baseline, len(selected) - 1))
+
+def render_memory_report():
+    """What this session keeps in memory, next to the datasets every session shares"""
+    report = session_memory_report(st.session_state.to_dict())
+    st.metric("This session", f"{report['Bytes'].sum() / 1024:,.1f} KB")
+    st.dataframe(report, use_container_width=True, hide_index=True)
+    shared = shared_memory_report()
+    if not shared.empty:
+        st.caption(f"Shared by all sessions in this process: {shared['Bytes'].sum() / 1024 ** 2:,.1f} MB")
+        st.dataframe(shared, use_container_width=True, hide_index=True)
 
 def load_user_profile_page():
     st.title("Your Profile 👤")
@@ -34,6 +161,14 @@ def load_user_profile_page():
                 if income_data:
                     st.write("**Estimated Household Income in Your Area:**")
                     st.write(f"Mean: ${income_data['mean_income']:,}")
+                    context = local_income_context(income_data['mean_income'], zip_code)
+                    if context:
+                        area = context['summary']
+                        area_name = f"ZIP {context['region']}xx" if context['level'] == 'zip3' else context['region']
+                        st.caption(
+                            f"{area_name} area: mean ${area['mean_income']:,.0f}, "
+                            f"typical ZIP range ${area['p25']:,.0f}–${area['p75']:,.0f}"
+                        )
                 else:
                     st.warning("Income data not available for this ZIP code.")
             else:
@@ -112,8 +247,9 @@ def load_user_profile_page():
                     with st.expander(f"💼 {career.get('title', career.get('OCC_TITLE', 'Unknown Career'))}", expanded=False):
                         if 'A_MEAN' in career:
                             st.write(f"Mean Annual Salary: ${career['A_MEAN']:,.2f}")
-                        if 'TOT_EMP' in career:
-                            st.write(f"Total Employment: {career['TOT_EMP']:,}")
+                        if 'TOT_EMP' in career and pd.notna(career['TOT_EMP']):
+                            # TOT_EMP is float in the cached OEWS table
+                            st.write(f"Total Employment: {career['TOT_EMP']:,.0f}")
                         if 'A_MEDIAN' in career:
                             st.write(f"Median Annual Salary: ${career['A_MEDIAN']:,.2f}")
                         if 'A_PCT10' in career and 'A_PCT90' in career:
@@ -192,71 +328,51 @@ def load_user_profile_page():
     # Saved Projections Tab
     with tabs[4]:
         st.header("Your Saved Financial Projections")
-        if 'saved_projections' in st.session_state and st.session_state.saved_projections:
-            for idx, proj in enumerate(st.session_state.saved_projections):
-                with st.expander(f"Projection: {proj['name']} ({proj['date']})", expanded=False):
-                    st.write(f"Location: {proj['location']}")
-                    st.write(f"Occupation: {proj['occupation']}")
-                    st.write(f"Investment Return Rate: {proj['investment_rate']}%")
-                    st.write(f"Final Net Worth: ${proj['final_net_worth']:,}")
-
-                    # Display milestones if present
-                    if 'milestones' in proj and proj['milestones']:
-                        st.subheader("Life Milestones:")
-                        for milestone in proj['milestones']:
-                            st.markdown(f"**{milestone['name']} (Year {milestone['year']})**")
-
-                            # Display milestone-specific details
-                            if milestone['type'] == 'Marriage':
-                                st.write(f"Wedding Cost: ${milestone['wedding_cost']:,}")
-                                st.write(f"Spouse Occupation: {milestone['spouse_occupation']}")
-                                st.write(f"Lifestyle Adjustment: {milestone['lifestyle_adjustment']}%")
-                                st.write(f"Spouse Initial Savings: ${milestone['spouse_savings']:,}")
-                                st.write(f"Spouse Initial Debt: ${milestone['spouse_debt']:,}")
-
-                            elif milestone['type'] == 'HomePurchase':
-                                st.write(f"Home Price: ${milestone['home_price']:,}")
-                                st.write(f"Down Payment: {milestone['down_payment']}%")
-                                st.write(f"Monthly Utilities: ${milestone['monthly_utilities']:,}")
-                                st.write(f"Monthly HOA: ${milestone['monthly_hoa']:,}")
-                                st.write(f"Annual Renovation Budget: ${milestone['annual_renovation']:,}")
-
-                            elif milestone['type'] == 'CarPurchase':
-                                st.write(f"Car Price: ${milestone['car_price']:,}")
-                                st.write(f"Down Payment: {milestone['down_payment']}%")
-                                st.write(f"Vehicle Type: {milestone['vehicle_type']}")
-                                st.write(f"Monthly Fuel Cost: ${milestone['monthly_fuel']:,}")
-                                st.write(f"Monthly Parking: ${milestone['monthly_parking']:,}")
-
-                            elif milestone['type'] == 'Child':
-                                st.write(f"Monthly Education Savings: ${milestone['education_savings']/12:,.2f}")
-                                st.write(f"Annual Healthcare Cost: ${milestone['healthcare_cost']:,}")
-                                st.write(f"Annual Insurance Cost: ${milestone['insurance_cost']:,}")
-                                st.write(f"Annual Tax Benefit: ${milestone['tax_benefit']:,}")
-
-                            elif milestone['type'] == 'GraduateSchool':
-                                st.write(f"Total Cost: ${milestone['total_cost']:,}")
-                                st.write(f"Program Length: {milestone['program_years']} years")
-                                st.write(f"Part-time Income: ${milestone['part_time_income']:,}/year")
-                                st.write(f"Scholarship Amount: ${milestone['scholarship_amount']:,}")
-                                st.write(f"Expected Salary Increase: {milestone['salary_increase']}%")
-
-                            st.markdown("---")
-
-                    # Add AI Assessment section
-                    st.subheader("💡 AI Financial Assessment")
-                    if st.button("Generate Assessment", key=f"gen_assessment_{idx}"):
-                        with st.spinner("Generating financial assessment..."):
-                            assessment = generate_financial_assessment(proj)
-                            st.markdown(f"**Analysis:**\n{assessment}")
-
-                    if st.button("Remove", key=f"remove_proj_{idx}"):
-                        st.session_state.saved_projections.pop(idx)
-                        st.rerun()
+        store = get_scenario_store()
+        owner = current_owner()
+        if store.count(owner):
+            if st.button("💡 Generate All Assessments"):
+                with st.spinner("Generating financial assessments..."):
+                    scenarios = store.summaries(store.ids(owner))
+                    previous = [proj.get('assessment') for proj in scenarios]
+                    generate_assessments(scenarios)
+                    for proj, assessment in zip(scenarios, previous):
+                        save_assessment(store, proj, assessment)
+
+            # Filter and sort on the store's indexes; only the visible page is loaded
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                occupation = st.selectbox("Occupation", ["All"] + store.distinct(owner, 'occupation'),
+                                          key="saved_projection_occupation")
+            with col2:
+                location = st.selectbox("Location", ["All"] + store.distinct(owner, 'location'),
+                                        key="saved_projection_location")
+            with col3:
+                order = st.selectbox("Sort by", list(SORT_OPTIONS), key="saved_projection_order")
+            scenario_ids = store.ids(
+                owner,
+                occupation=None if occupation == "All" else occupation,
+                location=None if location == "All" else location,
+                order=SORT_OPTIONS[order]
+            )
+
+            with st.expander("📊 Compare Scenarios"):
+                render_scenario_comparison(store, scenario_ids)
+
+            def render_projection_window(window):
+                for proj in store.summaries(window):
+                    render_saved_projection(store, proj)
+
+            if render_paginated_results("saved_projections", scenario_ids, render_projection_window,
+                                        page_size=10, item_label="projections") is None:
+                st.info("No saved projections match these filters.")
         else:
             st.info("No saved financial projections yet. Create some in the Financial Planning section!")
             if st.button("Go to Financial Planning"):
                 st.switch_page("main.py")
 
+    with st.expander("🧠 Session Memory"):
+        render_memory_report()
+
 if __name__ == "__main__":
     load_user_profile_page()
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""Precomputed baseline projections
+
+A projection without milestones depends only on the location, occupation,
+investment rate and horizon, and year ``t`` of a projection does not depend
+on how many years follow it. So one run per (location, occupation) pair at
+the default rate and the longest horizon covers every first projection a
+visitor can ask for: shorter horizons are prefixes of it.
+
+``build_baselines`` runs that job for every pair and writes a binary table:
+``values.npy`` holds a (pairs x series x years) int64 array with every yearly
+list of the projection dict, ``index.npy`` maps (location, occupation)
+positions to rows, and ``meta.json`` records the labels, the series paths and
+the dict layout around them. Builds are keyed by the SHA-256 of both source
+CSVs. The app memory-maps the table and slices a pair's row instead of
+running the calculator; projections with milestones are still computed.
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.calculator import FinancialCalculator
+from utils.data_processor import DataProcessor
+from utils.dataset_cache import META_NAME, source_digest
+from utils.dataset_registry import COLI_DATA_PATH, OCCUPATION_DATA_PATH
+
+BASELINE_DIR = os.environ.get("BASELINE_DIR", os.path.join(".cache", "baselines"))
+BASELINE_RATE = 0.07  # default of the investment return slider
+BASELINE_YEARS = 30  # maximum of the projection years slider
+FORMAT_VERSION = 1
+
+# Path of a yearly series inside the projection dict, e.g. ('expense_categories', 'Rent')
+SeriesPath = Tuple[str, ...]
+
+
+def location_options(coli_df: pd.DataFrame) -> List[str]:
+    """Selectable locations of the COLI table, sorted"""
+    return sorted(set(coli_df['Cost of Living'].dropna().astype(str)) - {'nan', 'NaN'})
+
+
+def occupation_options(occupation_df: pd.DataFrame) -> List[str]:
+    """Selectable occupations of the occupation table, sorted"""
+    return sorted(set(occupation_df['Occupation'].dropna().astype(str)) - {'nan', 'NaN'})
+
+
+def baseline_projection(coli_df: pd.DataFrame, occupation_df: pd.DataFrame, location: str,
+                        occupation: str, rate: float = BASELINE_RATE, years: int = BASELINE_YEARS) -> Dict:
+    """Run the calculator for a pair with no milestones, as the main page does"""
+    location_data = DataProcessor.process_location_data(coli_df, occupation_df, location, occupation, rate)
+    assets, liabilities, income, expenses = DataProcessor.create_financial_objects(location_data, [])
+    return FinancialCalculator(assets, liabilities, income, expenses).calculate_yearly_projection(years)
+
+
+def split_projection(projection: Dict, years: int) -> Tuple[Dict, List[SeriesPath], List[List[int]]]:
+    """
+    Separate a projection's yearly series from the dict layout around them.
+
+    Args:
+        projection: Result of ``calculate_yearly_projection``
+        years: Horizon of the projection; lists of this length are series
+
+    Returns:
+        Layout (the dict with every series set to None), series paths and series values
+    """
+    paths: List[SeriesPath] = []
+    values: List[List[int]] = []
+
+    def strip(node: Any, path: SeriesPath) -> Any:
+        if isinstance(node, dict):
+            return {key: strip(value, path + (key,)) for key, value in node.items()}
+        if isinstance(node, list) and len(node) == years:
+            paths.append(path)
+            values.append(node)
+            return None
+        return node
+
+    return strip(projection, ()), paths, values
+
+
+def build_path(coli_path: str = COLI_DATA_PATH, occupation_path: str = OCCUPATION_DATA_PATH,
+               directory: str = BASELINE_DIR) -> str:
+    """Table directory for the current contents of both source files"""
+    digest = source_digest(coli_path)[:8] + source_digest(occupation_path)[:8]
+    return os.path.join(directory, f"baselines-{digest}-v{FORMAT_VERSION}")
+
+
+def build_baselines(coli_df: pd.DataFrame, occupation_df: pd.DataFrame, directory: str,
+                    rate: float = BASELINE_RATE, years: int = BASELINE_YEARS,
+                    meta: Optional[Dict] = None) -> Dict[str, int]:
+    """
+    Compute the baseline projection of every (location, occupation) pair and write the table.
+
+    Pairs the calculator rejects (e.g. missing cost of living figures) are
+    left out of the index; the app computes those as before. The directory is
+    assembled under a temporary name and renamed into place, so a half-written
+    table is never visible to readers.
+
+    Args:
+        coli_df: Cost of living table
+        occupation_df: Occupation table
+        directory: Target directory
+        rate: Investment return rate of the baselines
+        years: Horizon of the baselines
+        meta: Extra metadata to record (e.g. the source digests)
+
+    Returns:
+        Counts of 'pairs' written and 'skipped'
+    """
+    locations = location_options(coli_df)
+    occupations = occupation_options(occupation_df)
+    index = np.full((len(locations), len(occupations)), -1, dtype=np.int32)
+    layout: Optional[Dict] = None
+    paths: List[SeriesPath] = []
+    rows: List[List[List[int]]] = []
+    skipped = 0
+
+    for i, location in enumerate(locations):
+        for j, occupation in enumerate(occupations):
+            try:
+                projection = baseline_projection(coli_df, occupation_df, location, occupation, rate, years)
+            except ValueError:
+                skipped += 1
+                continue
+            pair_layout, pair_paths, values = split_projection(projection, years)
+            if layout is None:
+                layout, paths = pair_layout, pair_paths
+            elif pair_layout != layout or pair_paths != paths:
+                raise ValueError(f"Projection layout of {location} / {occupation} differs from the other pairs")
+            index[i, j] = len(rows)
+            rows.append(values)
+
+    values = np.array(rows, dtype=np.int64).reshape(len(rows), len(paths), years)
+
+    parent = os.path.dirname(directory) or "."
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".build-")
+    try:
+        np.save(os.path.join(tmp_dir, "values.npy"), values, allow_pickle=False)
+        np.save(os.path.join(tmp_dir, "index.npy"), index, allow_pickle=False)
+        payload = dict(meta or {})
+        payload.update({
+            "format": FORMAT_VERSION,
+            "rate": rate,
+            "years": years,
+            "locations": locations,
+            "occupations": occupations,
+            "series": [list(path) for path in paths],
+            "layout": layout,
+        })
+        with open(os.path.join(tmp_dir, META_NAME), "w") as f:
+            json.dump(payload, f)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another process finished the same build first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return {'pairs': len(rows), 'skipped': skipped}
+
+
+class BaselineTable:
+    """Memory-mapped baseline projections, served by slicing"""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, META_NAME)) as f:
+            meta = json.load(f)
+        self.rate: float = meta["rate"]
+        self.years: int = meta["years"]
+        self.series: List[SeriesPath] = [tuple(path) for path in meta["series"]]
+        self.layout: Dict = meta["layout"]
+        self.location_index = {name: i for i, name in enumerate(meta["locations"])}
+        self.occupation_index = {name: j for j, name in enumerate(meta["occupations"])}
+        self.index = np.load(os.path.join(directory, "index.npy"), allow_pickle=False)
+        self.values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r", allow_pickle=False)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def row(self, location: str, occupation: str) -> Optional[int]:
+        """Row of a pair, or None if it has no baseline"""
+        i = self.location_index.get(location)
+        j = self.occupation_index.get(occupation)
+        if i is None or j is None or self.index[i, j] < 0:
+            return None
+        return int(self.index[i, j])
+
+    def covers(self, rate: float, years: int) -> bool:
+        """Whether projections at this rate and horizon can be served from the table"""
+        return math.isclose(rate, self.rate) and 1 <= years <= self.years
+
+    def projection(self, location: str, occupation: str, years: int) -> Optional[Dict]:
+        """
+        Baseline projection of a pair over its first ``years`` years.
+
+        Returns:
+            A new dict shaped like ``calculate_yearly_projection``'s result, or
+            None if the pair has no baseline
+        """
+        row = self.row(location, occupation)
+        if row is None:
+            return None
+        values = self.values[row, :, :years].tolist()
+        projection = copy.deepcopy(self.layout)
+        for path, series in zip(self.series, values):
+            node = projection
+            for key in path[:-1]:
+                node = node[key]
+            node[path[-1]] = series
+        return projection
+
+
+@st.cache_resource(max_entries=2)
+def _open_table(directory: str) -> BaselineTable:
+    return BaselineTable(directory)
+
+
+def get_baseline_table(directory: str = BASELINE_DIR) -> Optional[BaselineTable]:
+    """Process-wide table for the current source files, or None if the job has not built it"""
+    path = build_path(directory=directory)
+    if not os.path.exists(os.path.join(path, META_NAME)):
+        return None
+    return _open_table(path)
+
+
+def get_baseline_projection(location: str, occupation: str, rate: float, years: int) -> Optional[Dict]:
+    """
+    Precomputed projection for a pair without milestones.
+
+    Returns:
+        The projection, or None if it has to be computed (no table, another
+        rate, a longer horizon or an unknown pair)
+    """
+    table = get_baseline_table()
+    if table is None or not table.covers(rate, years):
+        return None
+    return table.projection(location, occupation, years)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute baseline projections for every location and occupation")
+    parser.add_argument("--output", default=BASELINE_DIR, help="Directory holding the baseline tables")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if a table for these sources exists")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    directory = build_path(directory=args.output)
+    if os.path.exists(os.path.join(directory, META_NAME)):
+        if not args.force:
+            print(f"{directory} is up to date")
+            return
+        shutil.rmtree(directory)
+
+    coli_df = DataProcessor.load_coli_data(COLI_DATA_PATH)
+    occupation_df = DataProcessor.load_occupation_data(OCCUPATION_DATA_PATH)
+    counts = build_baselines(coli_df, occupation_df, directory, meta={
+        "sources": [
+            {"path": os.path.abspath(path), "sha256": source_digest(path)}
+            for path in (COLI_DATA_PATH, OCCUPATION_DATA_PATH)
+        ],
+    })
+    print(f"Wrote {counts['pairs']} baselines ({counts['skipped']} pairs skipped) to {directory} "
+          f"({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,295 @@
+import asyncio
 import os
+import threading
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, List, Optional, Tuple
 import streamlit as st
 from datetime import datetime
+from services.http_cache import HttpCache, get_shared_cache
+
+# The BLS v2 API accepts up to 50 series IDs per request
+MAX_SERIES_PER_REQUEST = 50
+CACHE_ENDPOINT = 'bls_timeseries'
+# Batched requests the async loader keeps in flight at once
+MAX_CONCURRENT_REQUESTS = 4
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    """Process-wide pooled session so BLS requests reuse open connections"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _shared_session = session
+        return _shared_session
+
 
 class BLSApi:
     BASE_URL = "https://api.bls.gov/publicAPI/v2"
 
-    def __init__(self):
-        self.api_key = os.environ.get("BLS_API_KEY")
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 session: Optional[requests.Session] = None, cache: Optional[HttpCache] = None):
+        """
+        Args:
+            api_key: BLS registration key (defaults to the BLS_API_KEY environment variable)
+            base_url: API root, overridable for testing against a local server
+            session: HTTP session to use (defaults to the shared pooled session)
+            cache: Disk response cache (defaults to the host-wide shared cache)
+        """
+        self.api_key = api_key or os.environ.get("BLS_API_KEY")
         if not self.api_key:
             raise ValueError("BLS_API_KEY environment variable is not set")
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.session = session or get_shared_session()
+        self.cache = cache or get_shared_cache()
+
+        # Series waiting for the next batched request, grouped by year range
+        self._pending: Dict[Tuple[Optional[str], Optional[str]], List[str]] = {}
+        self._results: Dict[Tuple[str, Optional[str], Optional[str]], Dict] = {}
+        self._stale: Dict[Tuple[Optional[str], Optional[str]], List[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_params(series_id: str, start_year: Optional[str], end_year: Optional[str]) -> Dict:
+        return {"seriesid": series_id, "startyear": start_year, "endyear": end_year}
+
+    def queue_series(self, series_ids: Iterable[str], start_year: Optional[int] = None,
+                     end_year: Optional[int] = None) -> None:
+        """
+        Queue series to be fetched in the next batched request.
+
+        Series found in the disk cache are not queued; stale ones are
+        served as they are and refreshed in the background on ``flush``.
+
+        Args:
+            series_ids: BLS series IDs
+            start_year: Start year of the data range (optional)
+            end_year: End year of the data range (optional)
+        """
+        years = (str(start_year) if start_year else None, str(end_year) if end_year else None)
+        for series_id in series_ids:
+            with self._lock:
+                if (series_id,) + years in self._results:
+                    continue
+            entry = self.cache.lookup(CACHE_ENDPOINT, self._cache_params(series_id, *years))
+            with self._lock:
+                if entry is not None:
+                    self._results[(series_id,) + years] = entry.value
+                    if entry.stale:
+                        self._stale.setdefault(years, []).append(series_id)
+                    continue
+                pending = self._pending.setdefault(years, [])
+                if series_id not in pending:
+                    pending.append(series_id)
+
+    def _take_queued(self):
+        """Hand over the pending batches and stale series queued so far"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            stale, self._stale = self._stale, {}
+        batches = [
+            (series_ids[i:i + MAX_SERIES_PER_REQUEST], start_year, end_year)
+            for (start_year, end_year), series_ids in pending.items()
+            for i in range(0, len(series_ids), MAX_SERIES_PER_REQUEST)
+        ]
+        return batches, stale
+
+    def _revalidate(self, stale: Dict[Tuple[Optional[str], Optional[str]], List[str]]) -> None:
+        """Refresh stale cached series in the background"""
+        for (start_year, end_year), series_ids in stale.items():
+            self.cache.revalidate(
+                CACHE_ENDPOINT,
+                [self._cache_params(series_id, start_year, end_year) for series_id in series_ids],
+                lambda claimed, start=start_year, end=end_year: list(self._fetch_batches(
+                    [params["seriesid"] for params in claimed], start, end, report_errors=False))
+            )
+
+    def flush(self) -> None:
+        """Fetch every queued series, at most 50 per POST, and store the per-series responses"""
+        batches, stale = self._take_queued()
+        for series_ids, start_year, end_year in batches:
+            for response in self._fetch_batches(series_ids, start_year, end_year):
+                with self._lock:
+                    self._results.update(response)
+        self._revalidate(stale)
+
+    async def flush_async(self, concurrency: int = MAX_CONCURRENT_REQUESTS) -> None:
+        """
+        Fetch every queued series with the batches running concurrently.
+
+        Args:
+            concurrency: Maximum number of requests in flight at once
+        """
+        batches, stale = self._take_queued()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(series_ids: List[str], start_year: Optional[str], end_year: Optional[str]):
+            async with semaphore:
+                # Worker threads have no Streamlit context, so errors are reported below
+                return await asyncio.to_thread(
+                    lambda: list(self._fetch_batches(series_ids, start_year, end_year, report_errors=False))
+                )
+
+        responses = await asyncio.gather(*(run(*batch) for batch in batches))
+        failed = 0
+        for batch_responses in responses:
+            for response in batch_responses:
+                failed += sum(1 for value in response.values() if not value)
+                with self._lock:
+                    self._results.update(response)
+        if failed:
+            st.error(f"Error fetching BLS data for {failed} series")
+        self._revalidate(stale)
+
+    def _fetch_batches(self, series_ids: List[str], start_year: Optional[str], end_year: Optional[str],
+                       report_errors: bool = True):
+        """Request series in batches of 50, caching successful responses on disk"""
+        for i in range(0, len(series_ids), MAX_SERIES_PER_REQUEST):
+            batch = series_ids[i:i + MAX_SERIES_PER_REQUEST]
+            responses = self._post_batch(batch, start_year, end_year, report_errors)
+            for series_id, response in responses.items():
+                params = self._cache_params(series_id, start_year, end_year)
+                if response.get("status") == "REQUEST_SUCCEEDED":
+                    self.cache.store(CACHE_ENDPOINT, params, response)
+                elif not response:
+                    # Request failed: fall back to an expired copy if there is one
+                    fallback = self.cache.lookup_any(CACHE_ENDPOINT, params)
+                    if fallback is not None:
+                        responses[series_id] = fallback.value
+            yield {(series_id, start_year, end_year): response for series_id, response in responses.items()}
+
+    def _post_batch(self, series_ids: List[str], start_year: Optional[str],
+                    end_year: Optional[str], report_errors: bool = True) -> Dict[str, Dict]:
+        """POST one multi-series request and split the reply into single-series responses"""
+        headers = {'Content-type': 'application/json'}
+        data = {
+            "seriesid": series_ids,
+            "registrationkey": self.api_key
+        }
+        if start_year:
+            data["startyear"] = start_year
+        if end_year:
+            data["endyear"] = end_year
+
+        try:
+            response = self.session.post(f"{self.base_url}/timeseries/data/",
+                                         json=data, headers=headers)
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if report_errors:
+                st.error(f"Error fetching BLS data: {str(e)}")
+            else:
+                print(f"Error fetching BLS data: {str(e)}")
+            return {series_id: {} for series_id in series_ids}
+
+        series_by_id = {
+            series.get("seriesID"): series
+            for series in payload.get("Results", {}).get("series", [])
+        }
+        envelope = {key: value for key, value in payload.items() if key != "Results"}
+        return {
+            series_id: dict(envelope, Results={
+                "series": [series_by_id[series_id]] if series_id in series_by_id else []
+            })
+            for series_id in series_ids
+        }
+
+    def fetch_series(self, series_ids: Iterable[str], start_year: Optional[int] = None,
+                     end_year: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Fetch several series with as few requests as possible.
+
+        Args:
+            series_ids: BLS series IDs
+            start_year: Start year of the data range (optional)
+            end_year: End year of the data range (optional)
+
+        Returns:
+            Series ID -> response shaped like a single-series API reply
+            ({} for series whose request failed)
+        """
+        series_ids = list(series_ids)
+        self.queue_series(series_ids, start_year, end_year)
+        self.flush()
+        years = (str(start_year) if start_year else None, str(end_year) if end_year else None)
+        with self._lock:
+            return {series_id: self._results.get((series_id,) + years, {}) for series_id in series_ids}
+
+    async def fetch_series_async(self, series_ids: Iterable[str], start_year: Optional[int] = None,
+                                 end_year: Optional[int] = None,
+                                 concurrency: int = MAX_CONCURRENT_REQUESTS) -> Dict[str, Dict]:
+        """Async variant of ``fetch_series``; batches are requested concurrently"""
+        series_ids = list(series_ids)
+        await asyncio.to_thread(self.queue_series, series_ids, start_year, end_year)
+        await self.flush_async(concurrency)
+        years = (str(start_year) if start_year else None, str(end_year) if end_year else None)
+        with self._lock:
+            return {series_id: self._results.get((series_id,) + years, {}) for series_id in series_ids}
+
+    def _series_response(self, series_id: str, start_year: Optional[int] = None,
+                         end_year: Optional[int] = None) -> Dict:
+        """Response for one series, flushing it together with anything else queued"""
+        return self.fetch_series([series_id], start_year, end_year)[series_id]
+
+    @staticmethod
+    def occupation_series_id(occupation_code: str) -> str:
+        return f"OEUN{occupation_code}00000000"
+
+    @staticmethod
+    def salary_series_id(occupation_code: str, area_code: str) -> str:
+        return f"OEUM{area_code}{occupation_code}"
+
+    @staticmethod
+    def projection_series_id(occupation_code: str) -> str:
+        return f"EP{occupation_code}"
+
+    def prefetch_career_details(self, occupation_codes: Iterable[str], area_code: str = "0000000") -> None:
+        """
+        Fetch salary and projection series for several careers in concurrent batched requests.
+
+        Later calls to ``get_salary_by_location`` and ``get_employment_projection``
+        for these careers are then answered without another round trip.
+
+        Args:
+            occupation_codes: SOC codes of the careers about to be displayed
+            area_code: BLS area code for the salary series
+        """
+        asyncio.run(self.load_career_details_async(occupation_codes, area_code))
+
+    async def load_career_details_async(self, occupation_codes: Iterable[str], area_code: str = "0000000",
+                                        concurrency: int = MAX_CONCURRENT_REQUESTS) -> Dict[str, Dict]:
+        """
+        Fetch the salary and projection series of several careers concurrently.
+
+        Args:
+            occupation_codes: SOC codes of the careers
+            area_code: BLS area code for the salary series
+            concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            SOC code -> {'salary': response, 'projection': response}
+        """
+        occupation_codes = list(occupation_codes)
+        series_ids = []
+        for code in occupation_codes:
+            series_ids.append(self.salary_series_id(code, area_code))
+            series_ids.append(self.projection_series_id(code))
+        results = await self.fetch_series_async(series_ids, concurrency=concurrency)
+        return {
+            code: {
+                'salary': results[self.salary_series_id(code, area_code)],
+                'projection': results[self.projection_series_id(code)]
+            }
+            for code in occupation_codes
+        }
 
     @st.cache_data(ttl=3600)  # Cache results for 1 hour
     def get_occupation_data(
@@ -21,7 +300,7 @@ class BLSApi:
     ) -> Dict:
         """
         Fetch occupation data from BLS API
-        
+
         Args:
             occupation_code: SOC code for the occupation
             start_year: Start year for data (defaults to current year - 1)
@@ -34,22 +313,7 @@ class BLSApi:
         if not start_year:
             start_year = end_year - 1
 
-        headers = {'Content-type': 'application/json'}
-        data = {
-            "seriesid": [f"OEUN{occupation_code}00000000"],
-            "startyear": str(start_year),
-            "endyear": str(end_year),
-            "registrationkey": _self.api_key
-        }
-
-        try:
-            response = requests.post(f"{_self.BASE_URL}/timeseries/data/", 
-                                  json=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Error fetching BLS data: {str(e)}")
-            return {}
+        return _self._series_response(_self.occupation_series_id(occupation_code), start_year, end_year)
 
     @st.cache_data(ttl=3600)
     def get_salary_by_location(
@@ -59,25 +323,12 @@ class BLSApi:
     ) -> Dict:
         """
         Get salary data for an occupation in a specific area
-        
+
         Args:
             occupation_code: SOC code for the occupation
             area_code: BLS area code
         """
-        headers = {'Content-type': 'application/json'}
-        data = {
-            "seriesid": [f"OEUM{area_code}{occupation_code}"],
-            "registrationkey": _self.api_key
-        }
-
-        try:
-            response = requests.post(f"{_self.BASE_URL}/timeseries/data/", 
-                                  json=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Error fetching salary data: {str(e)}")
-            return {}
+        return _self._series_response(_self.salary_series_id(occupation_code, area_code))
 
     @st.cache_data(ttl=86400)  # Cache for 24 hours
     def search_occupations(
@@ -87,7 +338,7 @@ class BLSApi:
     ) -> List[Dict]:
         """
         Search for occupations by keyword
-        
+
         Args:
             query: Search term
             limit: Maximum number of results to return
@@ -117,27 +368,32 @@ class BLSApi:
 
         return results
 
+    async def get_occupation_data_async(self, occupation_code: str, start_year: Optional[int] = None,
+                                        end_year: Optional[int] = None) -> Dict:
+        """Async variant of ``get_occupation_data``"""
+        end_year = end_year or datetime.now().year
+        start_year = start_year or end_year - 1
+        results = await self.fetch_series_async([self.occupation_series_id(occupation_code)], start_year, end_year)
+        return results[self.occupation_series_id(occupation_code)]
+
+    async def get_salary_by_location_async(self, occupation_code: str, area_code: str) -> Dict:
+        """Async variant of ``get_salary_by_location``"""
+        series_id = self.salary_series_id(occupation_code, area_code)
+        return (await self.fetch_series_async([series_id]))[series_id]
+
+    async def get_employment_projection_async(self, occupation_code: str) -> Dict:
+        """Async variant of ``get_employment_projection``"""
+        series_id = self.projection_series_id(occupation_code)
+        return (await self.fetch_series_async([series_id]))[series_id]
+
     def get_employment_projection(
         self,
         occupation_code: str
     ) -> Dict:
         """
         Get employment projections for an occupation
-        
+
         Args:
             occupation_code: SOC code for the occupation
         """
-        headers = {'Content-type': 'application/json'}
-        data = {
-            "seriesid": [f"EP{occupation_code}"],
-            "registrationkey": self.api_key
-        }
-
-        try:
-            response = requests.post(f"{self.BASE_URL}/timeseries/data/", 
-                                  json=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Error fetching employment projections: {str(e)}")
-            return {}
+        return self._series_response(self.projection_series_id(occupation_code))
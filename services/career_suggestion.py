@@ -1,42 +1,25 @@
 import os
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from openai import OpenAI
 import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 import streamlit as st
 from config import initialize_openai, load_openai_key
+from services.http_cache import HttpCache, get_shared_cache
+from utils.json_stream import IncrementalJSONParser, Path, select_paths
 
-class CareerSuggestionService:
-    def __init__(self):
-        if not initialize_openai():
-            raise ValueError("OpenAI API key not configured")
-        self.api_key = load_openai_key()
-        self.client = OpenAI(api_key=self.api_key)
+MODEL = "gpt-4"  # Using GPT-4 for better career analysis
+# Bump when the prompts change so answers to older prompts are not served from the cache
+PROMPT_VERSION = 1
+SUGGESTIONS_ENDPOINT = 'openai_career_suggestions'
+SKILLS_ENDPOINT = 'openai_skill_recommendations'
+# Parallel skill recommendation requests and the seconds each may take
+MAX_CONCURRENT_REQUESTS = 4
+SKILL_REQUEST_TIMEOUT = 60
 
-    def generate_career_suggestions(
-        self,
-        interests: List[str],
-        skills: List[str],
-        education_level: str,
-        preferred_work_style: str,
-        preferred_industry: Optional[str] = None,
-        salary_expectation: Optional[str] = None
-    ) -> str:
-        """
-        Generate career suggestions based on user inputs using OpenAI's API.
-        Returns a JSON string.
-        """
-        prompt = self._create_prompt(
-            interests, skills, education_level,
-            preferred_work_style, preferred_industry,
-            salary_expectation
-        )
-
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",  # Using GPT-4 for better career analysis
-                messages=[
-                    {"role": "system", "content": """You are a career counselor helping to create detailed career paths. 
+SUGGESTIONS_SYSTEM_PROMPT = """You are a career counselor helping to create detailed career paths. 
                     You must respond with a valid JSON object containing the following structure:
                     {
                         "primary_path": {
@@ -59,14 +42,154 @@ class CareerSuggestionService:
                             }
                         ]
                     }
-                    Ensure all salary values are numbers, not strings."""},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
+                    Ensure all salary values are numbers, not strings."""
+
+# Parts of a suggestions reply reported while it streams (and the whole reply last)
+SUGGESTION_EVENTS = select_paths(
+    ('primary_path', 'title'),
+    ('primary_path', 'description'),
+    ('primary_path', 'timeline', '*'),
+    ('alternative_paths', '*', 'title'),
+    ('alternative_paths', '*', 'description'),
+    ('alternative_paths', '*', 'timeline', '*'),
+    (),
+)
+
+
+def normalize_terms(values: List[str]) -> List[str]:
+    """Strip, de-duplicate (ignoring case) and sort multiselect values so their order does not matter"""
+    terms = {}
+    for value in values or []:
+        value = ' '.join(str(value).split())
+        if value:
+            terms.setdefault(value.lower(), value)
+    return [terms[key] for key in sorted(terms)]
+
+
+def normalize_text(value: Optional[str]) -> Optional[str]:
+    """Collapse whitespace in a free-text or selectbox value; empty values become None"""
+    value = ' '.join(str(value).split()) if value is not None else ''
+    return value or None
+
+
+def suggestions_document(text: str) -> str:
+    """
+    The JSON document of a complete suggestions reply, as it is cached.
+
+    Raises:
+        ValueError: If the reply is not a complete JSON document
+    """
+    for path, value in IncrementalJSONParser(select_paths(())).feed(text):
+        if path == ():
+            return json.dumps(value)
+    raise ValueError("The career suggestions reply was not a complete JSON object")
+
+
+class CareerSuggestionService:
+    def __init__(self, client=None, cache: Optional[HttpCache] = None, model: str = MODEL):
+        """
+        Args:
+            client: OpenAI-compatible client (created from the configured key by default)
+            cache: Response cache (the shared disk cache by default)
+            model: Chat model used for completions
+        """
+        if client is None:
+            if not initialize_openai():
+                raise ValueError("OpenAI API key not configured")
+            self.api_key = load_openai_key()
+            client = OpenAI(api_key=self.api_key)
+        self.client = client
+        self.cache = cache or get_shared_cache()
+        self.model = model
+
+    def _complete(self, endpoint: str, inputs: Dict, messages: List[Dict],
+                  timeout: Optional[float] = None) -> str:
+        """
+        Run a chat completion through the response cache.
+
+        Identical inputs are answered from the cache, and concurrent identical
+        requests share a single upstream call. Only replies that parse as JSON
+        are cached.
+
+        Args:
+            endpoint: Cache endpoint name (selects the TTL)
+            inputs: Normalized inputs identifying the request
+            messages: Chat messages sent on a cache miss
+            timeout: Seconds the upstream call may take (the client default if None)
+        """
+        options = {'timeout': timeout} if timeout is not None else {}
+
+        def load():
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.7,
+                **options
             )
+            content = response.choices[0].message.content
+            json.loads(content)
+            return content
+
+        params = dict(inputs, model=self.model, prompt_version=PROMPT_VERSION)
+        return self.cache.fetch(endpoint, params, load)
+
+    def _suggestion_request(
+        self,
+        interests: List[str],
+        skills: List[str],
+        education_level: str,
+        preferred_work_style: str,
+        preferred_industry: Optional[str],
+        salary_expectation: Optional[str]
+    ) -> Tuple[Dict, List[Dict]]:
+        """
+        Normalize the inputs of a suggestions request and build its messages.
+
+        Returns:
+            The normalized inputs (the cache key) and the chat messages
+        """
+        inputs = {
+            'interests': normalize_terms(interests),
+            'skills': normalize_terms(skills),
+            'education_level': normalize_text(education_level),
+            'preferred_work_style': normalize_text(preferred_work_style),
+            'preferred_industry': normalize_text(preferred_industry),
+            'salary_expectation': normalize_text(salary_expectation),
+            # The prompt asks for a timeline starting this year
+            'year': datetime.now().year,
+        }
+        prompt = self._create_prompt(
+            inputs['interests'], inputs['skills'], inputs['education_level'],
+            inputs['preferred_work_style'], inputs['preferred_industry'],
+            inputs['salary_expectation']
+        )
+        messages = [
+            {"role": "system", "content": SUGGESTIONS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        return inputs, messages
 
-            # Return the response content as a string - it's already JSON formatted
-            return response.choices[0].message.content
+    def generate_career_suggestions(
+        self,
+        interests: List[str],
+        skills: List[str],
+        education_level: str,
+        preferred_work_style: str,
+        preferred_industry: Optional[str] = None,
+        salary_expectation: Optional[str] = None
+    ) -> str:
+        """
+        Generate career suggestions based on user inputs using OpenAI's API.
+        Returns a JSON string.
+        """
+        inputs, messages = self._suggestion_request(
+            interests, skills, education_level,
+            preferred_work_style, preferred_industry,
+            salary_expectation
+        )
+
+        try:
+            return self._complete(SUGGESTIONS_ENDPOINT, inputs, messages)
 
         except Exception as e:
             # Return error as a JSON string
@@ -74,6 +197,52 @@ class CareerSuggestionService:
                 "error": f"Failed to generate career suggestions: {str(e)}"
             })
 
+    def stream_career_suggestions(
+        self,
+        interests: List[str],
+        skills: List[str],
+        education_level: str,
+        preferred_work_style: str,
+        preferred_industry: Optional[str] = None,
+        salary_expectation: Optional[str] = None
+    ) -> Iterator[Tuple[Path, Any]]:
+        """
+        Stream career suggestions, yielding parts of the reply as they complete.
+
+        Path titles and descriptions and each timeline milestone are yielded
+        as soon as they have streamed in; the last event is the whole reply
+        with path ``()``. Cached replies are replayed without calling the API,
+        and complete streamed replies are added to the cache. Identical
+        requests made while a reply is streaming wait for it and replay it.
+
+        Yields:
+            (path, value) pairs, e.g. (('primary_path', 'timeline', 0), {...})
+
+        Raises:
+            ValueError: If the reply is not a complete JSON document
+        """
+        inputs, messages = self._suggestion_request(
+            interests, skills, education_level,
+            preferred_work_style, preferred_industry,
+            salary_expectation
+        )
+        params = dict(inputs, model=self.model, prompt_version=PROMPT_VERSION)
+        parser = IncrementalJSONParser(SUGGESTION_EVENTS)
+
+        def load():
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.7,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        for text in self.cache.fetch_stream(SUGGESTIONS_ENDPOINT, params, load, suggestions_document):
+            yield from parser.feed(text)
+
     def _create_prompt(
         self,
         interests: List[str],
@@ -124,15 +293,17 @@ class CareerSuggestionService:
 
         return prompt
 
-    def get_skill_recommendations(self, career_path: str) -> str:
+    def get_skill_recommendations(self, career_path: str, timeout: Optional[float] = None) -> str:
         """
         Get specific skill recommendations for a given career path.
         Returns a JSON string.
         """
+        career_path = normalize_text(career_path) or ''
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
+            return self._complete(
+                SKILLS_ENDPOINT,
+                {'career_path': career_path.lower()},
+                [
                     {"role": "system", "content": """You are a career development expert. 
                     Provide specific, actionable skill recommendations in JSON format like this:
                     {
@@ -157,11 +328,64 @@ class CareerSuggestionService:
                     }"""},
                     {"role": "user", "content": f"What are the most important skills to develop for a career in {career_path}? Include technical skills, soft skills, certifications, and a recommended learning timeline."}
                 ],
-                temperature=0.7
+                timeout=timeout
             )
-
-            return response.choices[0].message.content
         except Exception as e:
             return json.dumps({
                 "error": f"Error getting skill recommendations: {str(e)}"
-            })
\ No newline at end of file
+            })
+
+    def iter_skill_recommendations(
+        self,
+        career_paths: List[str],
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+        timeout: float = SKILL_REQUEST_TIMEOUT
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Get skill recommendations for several career paths in parallel.
+
+        Requests run on a bounded thread pool and results are yielded in the
+        order they complete, so callers can show each one as soon as it is
+        ready. Paths still unanswered once every request has had its turn
+        at the per-call timeout, counted from the start of the call, are
+        yielded with an error; time the caller spends between results does
+        not count against requests that have already finished.
+
+        Args:
+            career_paths: Career path titles (duplicates are requested once)
+            max_workers: Maximum number of requests in flight
+            timeout: Seconds each request may take
+
+        Yields:
+            (career path, JSON string) pairs as for ``get_skill_recommendations``
+        """
+        career_paths = list(dict.fromkeys(career_paths))
+        if not career_paths:
+            return
+        max_workers = max(1, min(max_workers, len(career_paths)))
+        # Every request gets a slot for its own timeout, queued requests included
+        deadline = timeout * -(-len(career_paths) // max_workers)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            executor.submit(self.get_skill_recommendations, career_path, timeout): career_path
+            for career_path in career_paths
+        }
+        # Wall-clock end of the wait; requests keep running while the consumer handles a result
+        end = time.monotonic() + deadline
+        try:
+            pending = set(futures)
+            while pending:
+                # Requests that have finished are handed out even once the deadline has passed
+                done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    yield futures.pop(future), future.result()
+            for career_path in futures.values():
+                yield career_path, json.dumps({
+                    "error": f"Skill recommendations for {career_path} timed out"
+                })
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -2,14 +2,30 @@ import os
 import requests
 from typing import List, Dict, Optional
 import streamlit as st
+from services.http_cache import HttpCache, get_shared_cache
+from services.scorecard_sync import ScorecardStore, get_shared_store
+
+CACHE_ENDPOINT = 'scorecard_schools'
 
 class CollegeScorecardAPI:
     BASE_URL = "https://api.data.gov/ed/collegescorecard/v1/schools"
 
-    def __init__(self):
+    def __init__(self, cache: Optional[HttpCache] = None, store: Optional[ScorecardStore] = None):
         self.api_key = os.environ.get("ED_GOV_API_KEY")
         if not self.api_key:
             raise ValueError("ED_GOV_API_KEY environment variable is not set")
+        self.cache = cache or get_shared_cache()
+        # Local copy written by services.scorecard_sync; None until a sync has run
+        self.store = store or get_shared_store()
+
+    def _get(self, params: Dict) -> Dict:
+        """GET the schools endpoint through the shared disk cache"""
+        def load():
+            response = requests.get(self.BASE_URL, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        return self.cache.fetch(CACHE_ENDPOINT, params, load)
 
     @st.cache_data(ttl=3600)  # Cache results for 1 hour
     def search_colleges(
@@ -26,6 +42,9 @@ class CollegeScorecardAPI:
             school_type: Type of institution (e.g., '1,2' for 4-year, '3' for 2-year)
             limit: Maximum number of results to return
         """
+        if _self.store is not None:
+            return _self.store.search(query, school_type, limit)
+
         params = {
             'api_key': _self.api_key,
             'per_page': limit,
@@ -50,9 +69,7 @@ class CollegeScorecardAPI:
             params['school.name'] = query
 
         try:
-            response = requests.get(_self.BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = _self._get(params)
 
             return [
                 {
@@ -75,6 +92,11 @@ class CollegeScorecardAPI:
         """
         Get available fields of study for a specific school
         """
+        if self.store is not None:
+            school = self.store.get(school_id)
+            if school is not None:
+                return [program['title'] for program in school['programs'] if program.get('title')]
+
         params = {
             'api_key': self.api_key,
             'id': school_id,
@@ -82,9 +104,7 @@ class CollegeScorecardAPI:
         }
 
         try:
-            response = requests.get(self.BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(params)
 
             programs = data.get('results', [{}])[0].get('latest.programs.cip_4_digit', [])
             return [program['title'] for program in programs]
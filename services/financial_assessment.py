@@ -1,66 +1,169 @@
 """Service for generating financial planning assessments using OpenAI."""
+import hashlib
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from openai import OpenAI
 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# Parallel assessment requests when assessing every saved projection at once
+MAX_CONCURRENT_REQUESTS = 4
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """OpenAI client, created on first use so importing the module needs no API key"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        return _client
+
+
+def set_client(client) -> None:
+    """Replace the OpenAI client (e.g. with a local stub); None restores the default"""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def scenario_hash(scenario: dict) -> str:
+    """Hash of the parts of a scenario that the assessment is written from"""
+    content = {
+        key: scenario.get(key)
+        for key in ('name', 'occupation', 'location', 'final_net_worth', 'investment_rate', 'milestones')
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_cached_assessment(scenario: dict) -> Optional[str]:
+    """Assessment stored with the scenario, if it was written for the scenario's current content"""
+    cached = scenario.get('assessment')
+    if cached and cached.get('hash') == scenario_hash(scenario):
+        return cached['text']
+    return None
+
+
+def _request_assessment(scenario: dict) -> str:
+    """Ask the model for an assessment; raises if the request fails"""
+    # Format milestone information
+    milestone_summary = ""
+    if 'milestones' in scenario:
+        for milestone in scenario['milestones']:
+            milestone_summary += f"\n- {milestone['name']} in Year {milestone['year']}"
+            if milestone['type'] == 'Marriage':
+                milestone_summary += f"\n  * Wedding cost: ${milestone['wedding_cost']:,}"
+                milestone_summary += f"\n  * Spouse occupation: {milestone['spouse_occupation']}"
+            elif milestone['type'] == 'HomePurchase':
+                milestone_summary += f"\n  * Home price: ${milestone['home_price']:,}"
+                milestone_summary += f"\n  * Down payment: {milestone['down_payment']}%"
+            elif milestone['type'] == 'CarPurchase':
+                milestone_summary += f"\n  * Car price: ${milestone['car_price']:,}"
+                milestone_summary += f"\n  * Vehicle type: {milestone['vehicle_type']}"
+            elif milestone['type'] == 'Child':
+                milestone_summary += f"\n  * Monthly education savings: ${milestone['education_savings']/12:,.2f}"
+            elif milestone['type'] == 'GraduateSchool':
+                milestone_summary += f"\n  * Total cost: ${milestone['total_cost']:,}"
+                milestone_summary += f"\n  * Expected salary increase: {milestone['salary_increase']}%"
+
+    # Create the prompt
+    prompt = f"""You're a friendly financial mentor talking to a high school student about their future financial plan. 
+    Keep your response fun, encouraging, and relatable to teens! Use emojis and casual language, but maintain 
+    professionalism when discussing money. Think of yourself as a cool older sibling giving advice.
+
+    Here's their plan "{scenario['name']}":
+    - They want to work as a {scenario['occupation']} in {scenario['location']}
+    - They're aiming for a final net worth of ${scenario['final_net_worth']:,}
+    - Investment return rate: {scenario['investment_rate']}%
+
+    Their life milestones:{milestone_summary}
+
+    Please give them:
+    1. A quick, exciting overview of their journey (1-2 sentences)
+    2. One thing that's super smart about their plan (use a 🌟 emoji)
+    3. One cool tip to make their plan even better (use a 💡 emoji)
+    4. A fun, encouraging closing statement about their future
+
+    Keep it short and snappy - around 100 words total. Make it feel like a text message from a mentor!
+    Focus on making the financial journey sound exciting while keeping it realistic.
+    """
+
+    # Call OpenAI API
+    response = get_client().chat.completions.create(
+        model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024
+        messages=[
+            {"role": "system", "content": "You are an encouraging mentor helping high school students plan their financial future. Keep responses upbeat and engaging!"},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=300
+    )
+
+    return response.choices[0].message.content
+
 
 def generate_financial_assessment(scenario: dict) -> str:
     """Generate a narrative assessment of a financial scenario using OpenAI."""
     try:
-        # Format milestone information
-        milestone_summary = ""
-        if 'milestones' in scenario:
-            for milestone in scenario['milestones']:
-                milestone_summary += f"\n- {milestone['name']} in Year {milestone['year']}"
-                if milestone['type'] == 'Marriage':
-                    milestone_summary += f"\n  * Wedding cost: ${milestone['wedding_cost']:,}"
-                    milestone_summary += f"\n  * Spouse occupation: {milestone['spouse_occupation']}"
-                elif milestone['type'] == 'HomePurchase':
-                    milestone_summary += f"\n  * Home price: ${milestone['home_price']:,}"
-                    milestone_summary += f"\n  * Down payment: {milestone['down_payment']}%"
-                elif milestone['type'] == 'CarPurchase':
-                    milestone_summary += f"\n  * Car price: ${milestone['car_price']:,}"
-                    milestone_summary += f"\n  * Vehicle type: {milestone['vehicle_type']}"
-                elif milestone['type'] == 'Child':
-                    milestone_summary += f"\n  * Monthly education savings: ${milestone['education_savings']/12:,.2f}"
-                elif milestone['type'] == 'GraduateSchool':
-                    milestone_summary += f"\n  * Total cost: ${milestone['total_cost']:,}"
-                    milestone_summary += f"\n  * Expected salary increase: {milestone['salary_increase']}%"
-
-        # Create the prompt
-        prompt = f"""You're a friendly financial mentor talking to a high school student about their future financial plan. 
-        Keep your response fun, encouraging, and relatable to teens! Use emojis and casual language, but maintain 
-        professionalism when discussing money. Think of yourself as a cool older sibling giving advice.
-
-        Here's their plan "{scenario['name']}":
-        - They want to work as a {scenario['occupation']} in {scenario['location']}
-        - They're aiming for a final net worth of ${scenario['final_net_worth']:,}
-        - Investment return rate: {scenario['investment_rate']}%
-
-        Their life milestones:{milestone_summary}
-
-        Please give them:
-        1. A quick, exciting overview of their journey (1-2 sentences)
-        2. One thing that's super smart about their plan (use a 🌟 emoji)
-        3. One cool tip to make their plan even better (use a 💡 emoji)
-        4. A fun, encouraging closing statement about their future
-
-        Keep it short and snappy - around 100 words total. Make it feel like a text message from a mentor!
-        Focus on making the financial journey sound exciting while keeping it realistic.
-        """
-
-        # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024
-            messages=[
-                {"role": "system", "content": "You are an encouraging mentor helping high school students plan their financial future. Keep responses upbeat and engaging!"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=300
-        )
-
-        return response.choices[0].message.content
+        return _request_assessment(scenario)
+    except Exception as e:
+        return f"Unable to generate assessment at this time: {str(e)}"
+
+
+def assess_scenario(scenario: dict) -> str:
+    """
+    Get a scenario's assessment, reusing the one stored with it when its content is unchanged.
 
+    Successful assessments are stored on the scenario under ``'assessment'``
+    with the content hash they were written for.
+    """
+    cached = get_cached_assessment(scenario)
+    if cached is not None:
+        return cached
+    try:
+        text = _request_assessment(scenario)
     except Exception as e:
-        return f"Unable to generate assessment at this time: {str(e)}"
\ No newline at end of file
+        return f"Unable to generate assessment at this time: {str(e)}"
+    scenario['assessment'] = {'hash': scenario_hash(scenario), 'text': text}
+    return text
+
+
+def generate_assessments(scenarios: List[dict], max_workers: int = MAX_CONCURRENT_REQUESTS) -> Dict[int, str]:
+    """
+    Assess several scenarios concurrently.
+
+    Scenarios with an up-to-date stored assessment are not sent again;
+    identical scenarios are requested once.
+
+    Args:
+        scenarios: Saved projections
+        max_workers: Maximum number of requests in flight
+
+    Returns:
+        Scenario position -> assessment text
+    """
+    results = {idx: get_cached_assessment(scenario) for idx, scenario in enumerate(scenarios)}
+    pending: Dict[str, List[int]] = {}
+    for idx, text in results.items():
+        if text is None:
+            pending.setdefault(scenario_hash(scenarios[idx]), []).append(idx)
+    if not pending:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            content_hash: executor.submit(assess_scenario, scenarios[positions[0]])
+            for content_hash, positions in pending.items()
+        }
+    for content_hash, future in futures.items():
+        text = future.result()
+        first, *others = pending[content_hash]
+        results[first] = text
+        for idx in others:
+            if 'assessment' in scenarios[first]:
+                scenarios[idx]['assessment'] = dict(scenarios[first]['assessment'])
+            results[idx] = text
+    return results
@@ -0,0 +1,407 @@
+"""Disk-backed HTTP response cache shared by every process on a host
+
+Responses are stored in a SQLite database in WAL mode, keyed by a hash of the
+endpoint name and the normalized request parameters (credentials removed).
+Each endpoint has its own TTL. After the TTL an entry is served stale for a
+further window while a single background refresh runs; the refresh is claimed
+through a lease column, so only one process on the host re-fetches a key.
+Concurrent misses for the same key within a process share one loader call,
+including streamed responses (``fetch_stream``).
+The database is trimmed to a maximum size by evicting the least recently used
+entries.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", os.path.join(".cache", "http_cache.sqlite"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds an entry is fresh, then how much longer it may be served stale
+ENDPOINT_TTLS = {
+    'bls_timeseries': 24 * 3600,
+    'scorecard_schools': 24 * 3600,
+    'openai_career_suggestions': 30 * 24 * 3600,
+    'openai_skill_recommendations': 30 * 24 * 3600,
+}
+DEFAULT_TTL = 3600
+STALE_WINDOW = 7 * 24 * 3600
+
+# Request parameters that never take part in the cache key
+CREDENTIAL_PARAMS = {'api_key', 'registrationkey'}
+
+# How long a background refresh may hold its lease before others may retry
+REFRESH_LEASE = 60
+# Reads only bump the LRU timestamp when it is older than this
+ACCESS_RESOLUTION = 60
+# Check the database size every this many writes
+EVICTION_INTERVAL = 50
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fetched_at: float
+    stale: bool
+
+
+def normalize_params(params: Dict) -> Dict:
+    """Drop credentials and empty values so equivalent requests share a key"""
+    return {
+        key: value for key, value in params.items()
+        if key not in CREDENTIAL_PARAMS and value is not None and value != ''
+    }
+
+
+def cache_key(endpoint: str, params: Dict) -> str:
+    """Stable key for an endpoint and its request parameters"""
+    payload = json.dumps([endpoint, normalize_params(params)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class HttpCache:
+    """SQLite response cache with per-endpoint TTLs and stale-while-revalidate"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: Optional[Dict[str, int]] = None, stale_window: int = STALE_WINDOW):
+        """
+        Args:
+            path: SQLite database file, shared by all processes using the cache
+            max_bytes: Size above which least recently used entries are evicted
+            ttls: Endpoint -> seconds an entry stays fresh (defaults to ENDPOINT_TTLS)
+            stale_window: Seconds past the TTL an entry may still be served
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.stale_window = stale_window
+        self._local = threading.local()
+        self._writes = 0
+        self._refreshing = set()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    stale_until REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    refresh_lease REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection; SQLite connections cannot be shared across threads"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ttl(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def lookup(self, endpoint: str, params: Dict) -> Optional[CacheEntry]:
+        """
+        Read a cached response.
+
+        Returns:
+            The entry if it is fresh or within its stale window, else None
+        """
+        key = cache_key(endpoint, params)
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT body, fetched_at, expires_at, stale_until, accessed_at FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None or row[3] < now:
+            return None
+
+        body, fetched_at, expires_at, _, accessed_at = row
+        if now - accessed_at > ACCESS_RESOLUTION:
+            self._connection().execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return CacheEntry(json.loads(body), fetched_at, stale=expires_at < now)
+
+    def lookup_any(self, endpoint: str, params: Dict) -> Optional[CacheEntry]:
+        """Read a cached response regardless of age (used when the network is down)"""
+        row = self._connection().execute(
+            "SELECT body, fetched_at FROM responses WHERE key = ?", (cache_key(endpoint, params),)
+        ).fetchone()
+        return CacheEntry(json.loads(row[0]), row[1], stale=True) if row else None
+
+    def store(self, endpoint: str, params: Dict, value: Any) -> None:
+        """Store a response under the endpoint's TTL"""
+        body = json.dumps(value)
+        now = time.time()
+        expires_at = now + self.ttl(endpoint)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, endpoint, body, size, fetched_at, expires_at, stale_until, accessed_at, refresh_lease) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            (cache_key(endpoint, params), endpoint, body, len(body), now, expires_at,
+             expires_at + self.stale_window, now)
+        )
+        with self._lock:
+            self._writes += 1
+            check = self._writes % EVICTION_INTERVAL == 0
+        if check:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop entries past their stale window, then least recently used
+        entries until the cache is under ``max_bytes``.
+
+        Returns:
+            Number of entries removed
+        """
+        conn = self._connection()
+        removed = conn.execute("DELETE FROM responses WHERE stale_until < ?", (time.time(),)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return removed
+
+        excess = total - self.max_bytes
+        keys, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            keys.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys])
+        return removed + len(keys)
+
+    def claim_refresh(self, endpoint: str, params: Dict) -> bool:
+        """
+        Take the refresh lease for a stale entry.
+
+        Returns:
+            True if this caller should refresh the entry; False if another
+            thread or process already is
+        """
+        key = cache_key(endpoint, params)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+        now = time.time()
+        claimed = self._connection().execute(
+            "UPDATE responses SET refresh_lease = ? WHERE key = ? AND refresh_lease < ?",
+            (now + REFRESH_LEASE, key, now)
+        ).rowcount == 1
+        if claimed:
+            with self._lock:
+                self._refreshing.add(key)
+        return claimed
+
+    def release_refresh(self, endpoint: str, params: Dict) -> None:
+        key = cache_key(endpoint, params)
+        with self._lock:
+            self._refreshing.discard(key)
+        self._connection().execute("UPDATE responses SET refresh_lease = 0 WHERE key = ?", (key,))
+
+    def revalidate(self, endpoint: str, params_list: List[Dict],
+                   refresh: Callable[[List[Dict]], None]) -> Optional[threading.Thread]:
+        """
+        Refresh stale entries in the background.
+
+        Only the entries whose lease this caller wins are passed to
+        ``refresh``, which is expected to fetch and ``store`` them.
+
+        Returns:
+            The background thread, or None if nothing needed refreshing here
+        """
+        claimed = [params for params in params_list if self.claim_refresh(endpoint, params)]
+        if not claimed:
+            return None
+
+        def run():
+            try:
+                refresh(claimed)
+            except Exception as e:
+                print(f"Background refresh of {endpoint} failed: {str(e)}")
+            finally:
+                for params in claimed:
+                    self.release_refresh(endpoint, params)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def fetch(self, endpoint: str, params: Dict, loader: Callable[[], Any]) -> Any:
+        """
+        Get a response through the cache.
+
+        Fresh entries are returned directly. Stale entries are returned while
+        a background refresh runs. On a miss ``loader`` is called and its
+        result stored; if it raises, an expired entry is returned if one exists.
+
+        Args:
+            endpoint: Endpoint name (selects the TTL)
+            params: Request parameters identifying the response
+            loader: Function performing the request and returning JSON data
+
+        Returns:
+            Response data
+        """
+        entry = self.lookup(endpoint, params)
+        if entry is not None:
+            if entry.stale:
+                self.revalidate(endpoint, [params],
+                                lambda claimed: self.store(endpoint, params, loader()))
+            return entry.value
+
+        key = cache_key(endpoint, params)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            # Another thread may have stored the key between the lookup and the claim
+            entry = self.lookup(endpoint, params)
+            value = entry.value if entry is not None else self._load(endpoint, params, loader)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def fetch_stream(self, endpoint: str, params: Dict, loader: Callable[[], Iterable[str]],
+                     finalize: Callable[[str], Any]) -> Iterator[Any]:
+        """
+        Get a streamed response through the cache.
+
+        Like ``fetch``, with the same stale refresh and single-flight: the
+        caller that makes the request yields its text pieces as they arrive,
+        while concurrent callers for the same key wait and yield the stored
+        value whole. Cached values are also yielded whole. If the request
+        fails before any text arrived, an expired entry is yielded if one exists.
+
+        Args:
+            endpoint: Endpoint name (selects the TTL)
+            params: Request parameters identifying the response
+            loader: Function starting the request and returning its text pieces
+            finalize: Function turning the complete text into the value to
+                store; raises if the text is not a complete response
+
+        Yields:
+            Text pieces of a new response, or a single cached value
+        """
+        entry = self.lookup(endpoint, params)
+        if entry is not None:
+            if entry.stale:
+                self.revalidate(endpoint, [params],
+                                lambda claimed: self.store(endpoint, params, finalize(''.join(loader()))))
+            yield entry.value
+            return
+
+        key = cache_key(endpoint, params)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            yield self._await(endpoint, params, future)
+            return
+
+        try:
+            entry = self.lookup(endpoint, params)
+            if entry is not None:
+                value, replay = entry.value, True
+            else:
+                value, replay = yield from self._load_stream(endpoint, params, loader, finalize)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # The consumer stopped reading mid-stream; waiting callers fall back to the cache
+            future.set_exception(RuntimeError(f"Streaming {endpoint} was abandoned"))
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        if replay:
+            yield value
+
+    def _load_stream(self, endpoint: str, params: Dict, loader: Callable[[], Iterable[str]],
+                     finalize: Callable[[str], Any]) -> Generator[str, None, Tuple[Any, bool]]:
+        """
+        Yield the loader's pieces and store the finalized text.
+
+        Returns:
+            (value, replay): the stored value, or an expired entry to replay
+            when the request failed before any text arrived
+        """
+        pieces: List[str] = []
+        try:
+            for piece in loader():
+                pieces.append(piece)
+                yield piece
+            value = finalize(''.join(pieces))
+        except Exception:
+            fallback = None if pieces else self.lookup_any(endpoint, params)
+            if fallback is None:
+                raise
+            return fallback.value, True
+        self.store(endpoint, params, value)
+        return value, False
+
+    def _await(self, endpoint: str, params: Dict, future: Future) -> Any:
+        """Wait for another caller's request, falling back to an expired entry if it failed"""
+        try:
+            return future.result()
+        except Exception:
+            fallback = self.lookup_any(endpoint, params)
+            if fallback is None:
+                raise
+            return fallback.value
+
+    def _load(self, endpoint: str, params: Dict, loader: Callable[[], Any]) -> Any:
+        """Call the loader and store its result, falling back to an expired entry on failure"""
+        try:
+            value = loader()
+        except Exception:
+            fallback = self.lookup_any(endpoint, params)
+            if fallback is None:
+                raise
+            return fallback.value
+        self.store(endpoint, params, value)
+        return value
+
+
+_shared_caches: Dict[str, HttpCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_cache(path: str = DEFAULT_CACHE_PATH) -> HttpCache:
+    """Process-wide cache instance for a database path"""
+    with _shared_caches_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = HttpCache(path)
+        return _shared_caches[path]
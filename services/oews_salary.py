@@ -0,0 +1,198 @@
+"""Offline salary provider backed by the bundled BLS OEWS table
+
+``OEWSSalaryService`` answers the same calls as ``BLSApi`` from an in-memory
+(area, occupation) index built once from ``attached_assets/BLS OEWS.csv``.
+Lookups need no network or API key; the live API is only consulted for data
+the file does not contain (e.g. employment projections) when a key is set.
+"""
+import asyncio
+import copy
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.search_index import SearchIndex
+
+# BLS area codes that refer to the whole country; the OEWS file uses '99'
+NATIONAL_AREA_CODES = {'0000000', '99', 'US', ''}
+NATIONAL_AREA = '99'
+
+_SOC_CODE = re.compile(r'^\d{2}-\d{4}$')
+
+# OEWS columns -> keys of the salary records returned by the service
+SALARY_FIELDS = {
+    'A_MEAN': 'annual_mean_wage',
+    'A_MEDIAN': 'annual_median_wage',
+    'A_PCT10': 'annual_pct10',
+    'A_PCT25': 'annual_pct25',
+    'A_PCT75': 'annual_pct75',
+    'A_PCT90': 'annual_pct90',
+    'H_MEAN': 'hourly_mean_wage',
+    'H_MEDIAN': 'hourly_median_wage',
+    'TOT_EMP': 'total_employment',
+}
+ALIAS_COLUMNS = ['Alias 1', 'Alias 2', 'Alias 3', 'Alias 4', 'Alias 5']
+
+
+def normalize_area(area_code: str) -> str:
+    """Map a BLS series area code or OEWS AREA value to the index's area key"""
+    area_code = str(area_code).strip()
+    if area_code in NATIONAL_AREA_CODES:
+        return NATIONAL_AREA
+    # Series codes zero-pad areas to seven digits; the OEWS file does not
+    return area_code.lstrip('0') or '0'
+
+
+def occupation_key(occ_code: str, title: str) -> str:
+    """
+    Key an occupation by its SOC code.
+
+    Some codes in the bundled file were turned into dates by a spreadsheet
+    (e.g. '11-2021' -> 'Nov-21') and can no longer be told apart; those rows
+    are keyed by their title instead.
+    """
+    occ_code = str(occ_code).strip()
+    return occ_code if _SOC_CODE.match(occ_code) else str(title).strip()
+
+
+class OEWSSalaryService:
+    """BLSApi-compatible salary lookups served from the OEWS table"""
+
+    def __init__(self, df: pd.DataFrame, fallback=None):
+        """
+        Args:
+            df: OEWS table as returned by ``utils.datasets.load_oews_table``
+            fallback: Optional ``BLSApi`` used for data the table does not hold
+        """
+        self.fallback = fallback
+        self.titles: List[str] = df['OCC_TITLE'].astype(str).tolist()
+        self.codes: List[str] = [occupation_key(code, title)
+                                 for code, title in zip(df['OCC_CODE'], self.titles)]
+        self.area_titles: List[str] = df['AREA_TITLE'].astype(str).tolist()
+        self.columns: Dict[str, np.ndarray] = {
+            column: df[column].to_numpy(dtype=float) for column in SALARY_FIELDS if column in df.columns
+        }
+
+        # (area, occupation key) -> row; the first row wins for duplicate keys
+        self.index: Dict[Tuple[str, str], int] = {}
+        for row, (area, code) in enumerate(zip(df['AREA'], self.codes)):
+            self.index.setdefault((normalize_area(area), code), row)
+
+        # One search document per distinct occupation, national rows preferred
+        self.occupation_rows: Dict[str, int] = {}
+        for (area, code), row in self.index.items():
+            if code not in self.occupation_rows or area == NATIONAL_AREA:
+                self.occupation_rows[code] = row
+        doc_rows = list(self.occupation_rows.values())
+        aliases = {
+            doc_id: [alias for alias in df.iloc[row][ALIAS_COLUMNS] if isinstance(alias, str) and alias.strip()]
+            for doc_id, row in enumerate(doc_rows)
+        } if all(column in df.columns for column in ALIAS_COLUMNS) else None
+        self.search_rows = doc_rows
+        self.search_index = SearchIndex([self.titles[row] for row in doc_rows], aliases)
+
+    def with_fallback(self, fallback) -> "OEWSSalaryService":
+        """Copy of the service sharing this index but using another network fallback"""
+        service = copy.copy(self)
+        service.fallback = fallback
+        return service
+
+    def _record(self, row: int) -> Dict:
+        record = {
+            'occupation_code': self.codes[row],
+            'occupation_title': self.titles[row],
+            'area_title': self.area_titles[row],
+            'source': 'OEWS',
+        }
+        for column, field in SALARY_FIELDS.items():
+            if column in self.columns:
+                value = self.columns[column][row]
+                record[field] = None if np.isnan(value) else float(value)
+        return record
+
+    def lookup(self, occupation_code: str, area_code: str = NATIONAL_AREA) -> Optional[Dict]:
+        """Salary record for an occupation in an area, or None if the table has no row"""
+        row = self.index.get((normalize_area(area_code), str(occupation_code).strip()))
+        if row is None:
+            return None
+        record = self._record(row)
+        record['area_code'] = area_code
+        return record
+
+    def get_salary_by_location(self, occupation_code: str, area_code: str) -> Dict:
+        """
+        Get salary data for an occupation in a specific area
+
+        Args:
+            occupation_code: SOC code for the occupation
+            area_code: BLS area code ('0000000' for national)
+        """
+        record = self.lookup(occupation_code, area_code)
+        if record is not None:
+            return record
+        if self.fallback is not None:
+            return self.fallback.get_salary_by_location(occupation_code, area_code)
+        return {}
+
+    def get_occupation_data(self, occupation_code: str, start_year: Optional[int] = None,
+                            end_year: Optional[int] = None) -> Dict:
+        """
+        Fetch national data for an occupation (the OEWS table holds a single year)
+
+        Args:
+            occupation_code: SOC code for the occupation
+            start_year: Only used by the network fallback
+            end_year: Only used by the network fallback
+        """
+        record = self.lookup(occupation_code, NATIONAL_AREA)
+        if record is not None:
+            return record
+        if self.fallback is not None:
+            return self.fallback.get_occupation_data(occupation_code, start_year, end_year)
+        return {}
+
+    def search_occupations(self, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Search for occupations by title or alias
+
+        Args:
+            query: Search term
+            limit: Maximum number of results to return
+        """
+        results = []
+        for doc_id in self.search_index.search_ids(query, limit=limit):
+            row = self.search_rows[doc_id]
+            record = self._record(row)
+            # OEWS column names as well, so results work with UserFavorites
+            results.append({
+                "code": self.codes[row],
+                "title": self.titles[row],
+                "OCC_TITLE": self.titles[row],
+                "A_MEAN": record.get('annual_mean_wage'),
+                "TOT_EMP": record.get('total_employment'),
+            })
+        return results
+
+    def get_employment_projection(self, occupation_code: str) -> Dict:
+        """
+        Get employment projections for an occupation (network only; not in the OEWS file)
+
+        Args:
+            occupation_code: SOC code for the occupation
+        """
+        if self.fallback is not None and _SOC_CODE.match(str(occupation_code)):
+            return self.fallback.get_employment_projection(occupation_code)
+        return {}
+
+    def prefetch_career_details(self, occupation_codes: Iterable[str], area_code: str = "0000000") -> None:
+        """Prefetch network-only data for careers about to be displayed"""
+        if self.fallback is None:
+            return
+        codes = [code for code in occupation_codes if _SOC_CODE.match(str(code))]
+        missing_salary = [code for code in codes if self.lookup(code, area_code) is None]
+        series_ids = [self.fallback.projection_series_id(code) for code in codes]
+        series_ids += [self.fallback.salary_series_id(code, area_code) for code in missing_salary]
+        if series_ids:
+            asyncio.run(self.fallback.fetch_series_async(series_ids))
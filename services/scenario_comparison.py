@@ -0,0 +1,151 @@
+"""Side-by-side comparison of saved scenarios
+
+``ScenarioComparison`` aligns N scenarios' yearly series into one
+(scenarios x years x metrics) array. Pairwise differences and crossover
+years for every pair, year and metric then come from broadcast array
+operations rather than loops over scenario pairs, and rankings from one
+sort per year and metric, so comparing dozens of scenarios costs about as
+much as comparing two.
+"""
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services.scenario_store import YEARLY_SERIES, ScenarioStore
+
+METRIC_LABELS = {
+    'net_worth': 'Net Worth',
+    'cash_flow': 'Cash Flow',
+    'total_income': 'Total Income',
+    'total_expenses': 'Total Expenses',
+    'asset_values': 'Total Assets',
+    'liability_values': 'Total Liabilities',
+}
+# Metrics where a smaller value ranks higher
+LOWER_IS_BETTER = {'total_expenses', 'liability_values'}
+
+
+def rank_values(keys: np.ndarray) -> np.ndarray:
+    """
+    Rank along the first axis, 1 for the smallest key.
+
+    Ties share the better rank and NaN keys rank last. Sorting each column
+    keeps this O(N log N) in the number of scenarios.
+    """
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    count = keys.shape[0]
+    order = np.argsort(keys, axis=0, kind='stable')
+    ordered = np.take_along_axis(keys, order, axis=0)
+
+    # Every sorted position takes the position where its run of equal keys starts
+    positions = np.arange(count).reshape((count,) + (1,) * (keys.ndim - 1))
+    run_starts = np.ones(keys.shape, dtype=bool)
+    run_starts[1:] = ordered[1:] != ordered[:-1]
+    firsts = np.maximum.accumulate(np.where(run_starts, positions, 0), axis=0)
+
+    ranks = np.empty(keys.shape, dtype=np.intp)
+    np.put_along_axis(ranks, order, firsts + 1, axis=0)
+    return ranks
+
+
+class ScenarioComparison:
+    """Aligned yearly series of several scenarios with their rankings and crossovers"""
+
+    def __init__(self, names: List[str], series: Sequence[np.ndarray], metrics: Sequence[str] = YEARLY_SERIES):
+        """
+        Args:
+            names: Scenario names, one per series matrix
+            series: (metrics x years) arrays; shorter projections are padded with NaN
+            metrics: Metric names in matrix row order
+        """
+        self.names = list(names)
+        self.metrics = list(metrics)
+        self.metric_index: Dict[str, int] = {metric: i for i, metric in enumerate(self.metrics)}
+        self.lengths = np.array([matrix.shape[1] for matrix in series], dtype=np.intp)
+        years = int(self.lengths.max()) if len(series) else 0
+
+        self.values = np.full((len(series), years, len(self.metrics)), np.nan)
+        for i, matrix in enumerate(series):
+            self.values[i, :matrix.shape[1]] = np.asarray(matrix, dtype=float).T
+        self.years = np.arange(years)
+
+        # Sorting by value * sign puts the best scenario first for every metric
+        self.signs = np.array([1.0 if metric in LOWER_IS_BETTER else -1.0 for metric in self.metrics])
+
+    @cached_property
+    def ranks(self) -> np.ndarray:
+        """(scenarios x years x metrics) rank of every scenario in every year and metric (1 = best)"""
+        return rank_values(self.values * self.signs)
+
+    @classmethod
+    def from_store(cls, store: ScenarioStore, scenario_ids: Sequence[int]) -> 'ScenarioComparison':
+        """Compare stored scenarios, reading their series in one query"""
+        summaries = store.summaries(scenario_ids)
+        series = store.series_many([summary['id'] for summary in summaries])
+        return cls([summary['name'] for summary in summaries], [series[summary['id']] for summary in summaries])
+
+    def metric(self, metric: str) -> np.ndarray:
+        """(scenarios x years) view of one metric"""
+        return self.values[:, :, self.metric_index[metric]]
+
+    def final_values(self, metric: str) -> np.ndarray:
+        """Each scenario's value in its own last projected year"""
+        return self.metric(metric)[np.arange(len(self.names)), self.lengths - 1]
+
+    def pairwise_diffs(self, metric: str, year: Optional[int] = None) -> np.ndarray:
+        """
+        Differences between every pair of scenarios.
+
+        Args:
+            metric: Metric name
+            year: Year index (each scenario's final year if None)
+
+        Returns:
+            (scenarios x scenarios) array where [a, b] is a minus b
+        """
+        values = self.final_values(metric) if year is None else self.metric(metric)[:, year]
+        return values[:, None] - values[None, :]
+
+    def crossovers(self, metric: str) -> np.ndarray:
+        """
+        First year in which each scenario overtakes each other one.
+
+        A overtakes B in year t when A is ahead in t after being level or
+        behind in t - 1 ("ahead" means lower for expenses and liabilities).
+
+        Returns:
+            (scenarios x scenarios) int array where [a, b] is the year a first
+            overtakes b, or -1 if it never does
+        """
+        values = self.metric(metric)
+        if metric in LOWER_IS_BETTER:
+            values = -values
+        ahead = values[:, None, :] > values[None, :, :]  # (a, b, year); NaN comparisons are False
+        overtakes = ahead[:, :, 1:] & ~ahead[:, :, :-1]
+        first = overtakes.argmax(axis=2) + 1
+        return np.where(overtakes.any(axis=2), first, -1)
+
+    def summary_table(self, metric: str, baseline: int = 0) -> pd.DataFrame:
+        """
+        One row per scenario: final value and its rank, difference from and crossovers with a baseline.
+
+        Args:
+            metric: Metric to compare on
+            baseline: Position of the scenario the others are measured against
+        """
+        final = self.final_values(metric)
+        ranks = rank_values(final * self.signs[self.metric_index[metric]])
+        crossovers = self.crossovers(metric)
+        diff = final - final[baseline]
+        label = METRIC_LABELS.get(metric, metric)
+        return pd.DataFrame({
+            'Scenario': self.names,
+            'Years': self.lengths,
+            f'Final {label}': final,
+            'Rank': ranks,
+            'vs Baseline': diff,
+            'Overtakes Baseline': crossovers[:, baseline],
+            'Overtaken by Baseline': crossovers[baseline, :],
+        })
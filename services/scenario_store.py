@@ -0,0 +1,302 @@
+"""Persistent store of saved financial projections
+
+Saved scenarios live in SQLite instead of ``st.session_state``, so they
+survive the session and do not hold every projection's yearly lists in
+memory. A scenario's spec (name, location, occupation, milestones, ...) is a
+row of the ``scenarios`` table, indexed per owner by date, occupation,
+location and final net worth. Its six yearly series are kept apart in
+``scenario_series`` as one blob: whole-dollar values, delta-encoded along the
+years and zlib-compressed. Listing scenarios never reads the blobs; they are
+decoded only when a scenario's yearly data is asked for.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import streamlit as st
+
+DEFAULT_STORE_PATH = os.environ.get("SCENARIO_STORE_PATH", os.path.join(".cache", "scenarios.sqlite"))
+
+# Yearly series of a projection, in blob row order
+YEARLY_SERIES = ('net_worth', 'cash_flow', 'total_income', 'total_expenses', 'asset_values', 'liability_values')
+
+# Sort orders offered by ``ScenarioStore.ids``
+ORDER_BY = {
+    'newest': 'created_at DESC, id DESC',
+    'oldest': 'created_at, id',
+    'net_worth_desc': 'final_net_worth DESC, id DESC',
+    'net_worth_asc': 'final_net_worth, id',
+}
+
+_SPEC_COLUMNS = 'id, name, created_at, location, occupation, investment_rate, final_net_worth, years, spec'
+
+
+def encode_series(yearly_data: Dict[str, Sequence[float]]) -> bytes:
+    """
+    Pack a projection's yearly series into one compressed blob.
+
+    Values are rounded to whole dollars and stored as year-over-year
+    differences, which are small and repetitive and so compress well.
+    Missing series are stored as zeros.
+    """
+    years = len(yearly_data.get('net_worth') or [])
+    matrix = np.zeros((len(YEARLY_SERIES), years), dtype=np.int64)
+    for row, name in enumerate(YEARLY_SERIES):
+        values = np.rint(np.asarray(yearly_data.get(name) or [], dtype=float)[:years])
+        matrix[row, :len(values)] = values
+    deltas = np.diff(matrix, axis=1, prepend=0)
+    return zlib.compress(deltas.astype('<i8').tobytes())
+
+
+def decode_series(blob: bytes, years: int) -> np.ndarray:
+    """Unpack a blob from ``encode_series`` into a (series x years) int64 array"""
+    deltas = np.frombuffer(zlib.decompress(blob), dtype='<i8').reshape(len(YEARLY_SERIES), years)
+    return np.cumsum(deltas, axis=1)
+
+
+class ScenarioStore:
+    """SQLite repository of saved projections"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scenarios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                owner TEXT NOT NULL,
+                name TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                location TEXT,
+                occupation TEXT,
+                investment_rate REAL,
+                final_net_worth INTEGER,
+                years INTEGER NOT NULL,
+                spec TEXT NOT NULL DEFAULT '{}'
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scenario_series (
+                scenario_id INTEGER PRIMARY KEY REFERENCES scenarios (id) ON DELETE CASCADE,
+                data BLOB NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS scenarios_owner ON scenarios (owner, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS scenarios_occupation ON scenarios (owner, occupation)")
+        conn.execute("CREATE INDEX IF NOT EXISTS scenarios_location ON scenarios (owner, location)")
+        conn.execute("CREATE INDEX IF NOT EXISTS scenarios_net_worth ON scenarios (owner, final_net_worth)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def save(self, owner: str, projection: Dict) -> int:
+        """
+        Store a projection as built by the financial planning page.
+
+        Args:
+            owner: Id of the profile the scenario belongs to
+            projection: Scenario dict with 'name', 'date', 'location',
+                'occupation', 'investment_rate', 'final_net_worth',
+                'milestones' and 'yearly_data'
+
+        Returns:
+            Id of the new scenario
+        """
+        yearly_data = projection.get('yearly_data') or {}
+        spec = {'milestones': projection.get('milestones') or []}
+        if projection.get('assessment'):
+            spec['assessment'] = projection['assessment']
+
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            cursor = conn.execute(
+                "INSERT INTO scenarios (owner, name, created_at, location, occupation, investment_rate, "
+                "final_net_worth, years, spec) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (owner, projection['name'], projection['date'], projection.get('location'),
+                 projection.get('occupation'), projection.get('investment_rate'),
+                 projection.get('final_net_worth'), len(yearly_data.get('net_worth') or []),
+                 json.dumps(spec))
+            )
+            scenario_id = cursor.lastrowid
+            conn.execute("INSERT INTO scenario_series (scenario_id, data) VALUES (?, ?)",
+                         (scenario_id, encode_series(yearly_data)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return scenario_id
+
+    def ids(self, owner: str, occupation: Optional[str] = None, location: Optional[str] = None,
+            order: str = 'newest') -> np.ndarray:
+        """
+        Ids of an owner's scenarios, read from the indexes only.
+
+        Args:
+            owner: Profile id
+            occupation: Only scenarios for this occupation
+            location: Only scenarios for this location
+            order: Key of ``ORDER_BY``
+
+        Returns:
+            Scenario ids in the requested order
+        """
+        clauses, params = ["owner = ?"], [owner]
+        if occupation:
+            clauses.append("occupation = ?")
+            params.append(occupation)
+        if location:
+            clauses.append("location = ?")
+            params.append(location)
+        rows = self._connection().execute(
+            f"SELECT id FROM scenarios WHERE {' AND '.join(clauses)} ORDER BY {ORDER_BY[order]}", params
+        ).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def count(self, owner: str) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM scenarios WHERE owner = ?", (owner,)).fetchone()[0]
+
+    def distinct(self, owner: str, column: str) -> List[str]:
+        """Distinct occupations or locations among an owner's scenarios"""
+        if column not in ('occupation', 'location'):
+            raise ValueError(f"Unsupported column: {column}")
+        return [row[0] for row in self._connection().execute(
+            f"SELECT DISTINCT {column} FROM scenarios WHERE owner = ? AND {column} IS NOT NULL ORDER BY {column}",
+            (owner,)
+        )]
+
+    def summaries(self, scenario_ids: Sequence[int]) -> List[Dict]:
+        """
+        Specs of the given scenarios, without their yearly data.
+
+        Returns:
+            Scenario dicts (shaped like saved projections plus 'id') in the order of ``scenario_ids``
+        """
+        scenario_ids = [int(scenario_id) for scenario_id in scenario_ids]
+        if not scenario_ids:
+            return []
+        rows = self._connection().execute(
+            f"SELECT {_SPEC_COLUMNS} FROM scenarios WHERE id IN ({','.join('?' * len(scenario_ids))})",
+            scenario_ids
+        ).fetchall()
+        by_id = {row['id']: self._summary(row) for row in rows}
+        return [by_id[scenario_id] for scenario_id in scenario_ids if scenario_id in by_id]
+
+    def series(self, scenario_id: int) -> Optional[np.ndarray]:
+        """A scenario's (series x years) array in ``YEARLY_SERIES`` order, or None if it does not exist"""
+        row = self._connection().execute(
+            "SELECT s.years, d.data FROM scenarios s JOIN scenario_series d ON d.scenario_id = s.id WHERE s.id = ?",
+            (int(scenario_id),)
+        ).fetchone()
+        return decode_series(row['data'], row['years']) if row else None
+
+    def series_many(self, scenario_ids: Sequence[int]) -> Dict[int, np.ndarray]:
+        """Series arrays of several scenarios, read in one query and keyed by id"""
+        scenario_ids = [int(scenario_id) for scenario_id in scenario_ids]
+        if not scenario_ids:
+            return {}
+        rows = self._connection().execute(
+            "SELECT s.id, s.years, d.data FROM scenarios s JOIN scenario_series d ON d.scenario_id = s.id "
+            f"WHERE s.id IN ({','.join('?' * len(scenario_ids))})",
+            scenario_ids
+        ).fetchall()
+        return {row['id']: decode_series(row['data'], row['years']) for row in rows}
+
+    def labels(self, scenario_ids: Sequence[int]) -> Dict[int, str]:
+        """"Name (date)" display labels of scenarios, without reading their specs"""
+        scenario_ids = [int(scenario_id) for scenario_id in scenario_ids]
+        if not scenario_ids:
+            return {}
+        return {row[0]: f"{row[1]} ({row[2]})" for row in self._connection().execute(
+            f"SELECT id, name, created_at FROM scenarios WHERE id IN ({','.join('?' * len(scenario_ids))})",
+            scenario_ids
+        )}
+
+    def yearly_data(self, scenario_id: int) -> Optional[Dict[str, List[int]]]:
+        """A scenario's yearly series as lists, keyed like a projection's 'yearly_data'"""
+        matrix = self.series(scenario_id)
+        if matrix is None:
+            return None
+        return {name: matrix[row].tolist() for row, name in enumerate(YEARLY_SERIES)}
+
+    def load(self, scenario_id: int) -> Optional[Dict]:
+        """A complete scenario, yearly data included"""
+        summaries = self.summaries([scenario_id])
+        if not summaries:
+            return None
+        scenario = summaries[0]
+        scenario['yearly_data'] = self.yearly_data(scenario_id)
+        return scenario
+
+    def update_assessment(self, scenario_id: int, assessment: Dict) -> None:
+        """Store a scenario's AI assessment (as set by ``financial_assessment.assess_scenario``)"""
+        conn = self._connection()
+        row = conn.execute("SELECT spec FROM scenarios WHERE id = ?", (int(scenario_id),)).fetchone()
+        if row is None:
+            return
+        spec = json.loads(row['spec'])
+        spec['assessment'] = assessment
+        conn.execute("UPDATE scenarios SET spec = ? WHERE id = ?", (json.dumps(spec), int(scenario_id)))
+
+    def delete(self, scenario_id: int) -> None:
+        self._connection().execute("DELETE FROM scenarios WHERE id = ?", (int(scenario_id),))
+
+    @staticmethod
+    def _summary(row: sqlite3.Row) -> Dict:
+        spec = json.loads(row['spec'])
+        summary = {
+            'id': row['id'],
+            'name': row['name'],
+            'date': row['created_at'],
+            'location': row['location'],
+            'occupation': row['occupation'],
+            'investment_rate': row['investment_rate'],
+            'final_net_worth': row['final_net_worth'],
+            'years': row['years'],
+            'milestones': spec.get('milestones', []),
+        }
+        if 'assessment' in spec:
+            summary['assessment'] = spec['assessment']
+        return summary
+
+
+_shared_stores: Dict[str, ScenarioStore] = {}
+_shared_stores_lock = threading.Lock()
+
+
+def get_scenario_store(path: str = DEFAULT_STORE_PATH) -> ScenarioStore:
+    """Process-wide store instance for a database path"""
+    with _shared_stores_lock:
+        if path not in _shared_stores:
+            _shared_stores[path] = ScenarioStore(path)
+        return _shared_stores[path]
+
+
+def current_owner() -> str:
+    """
+    Id of the current visitor's profile.
+
+    The app has no accounts, so a random id is created on the first visit and
+    kept in the ``profile`` query parameter; reopening a URL that carries it
+    brings back the saved scenarios.
+    """
+    if 'profile_id' not in st.session_state:
+        st.session_state.profile_id = st.query_params.get('profile') or uuid.uuid4().hex
+    if st.query_params.get('profile') != st.session_state.profile_id:
+        st.query_params['profile'] = st.session_state.profile_id
+    return st.session_state.profile_id
@@ -0,0 +1,350 @@
+"""Bulk College Scorecard sync into a local SQLite store
+
+``ScorecardSync`` walks every result page of the schools endpoint
+concurrently, limited by a token bucket so the api.data.gov rate limit is
+respected, and asks only for the fields the app uses. Records are upserted
+into ``ScorecardStore``, an indexed SQLite table that interactive searches
+read from instead of calling the API on each keystroke. Individual records
+can be refreshed incrementally by id.
+
+Usage:
+    python -m services.scorecard_sync              # full sync
+    python -m services.scorecard_sync --stale 168  # refresh records older than a week
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.search_index import normalize_key
+
+DEFAULT_STORE_PATH = os.environ.get("SCORECARD_STORE_PATH", os.path.join(".cache", "scorecard.sqlite"))
+BASE_URL = "https://api.data.gov/ed/collegescorecard/v1/schools"
+
+PER_PAGE = 100  # API maximum
+MAX_WORKERS = 4
+# api.data.gov allows 1,000 requests an hour per key by default
+DEFAULT_RATE = 0.25  # requests per second
+DEFAULT_BURST = 5
+
+# API field -> store column
+SYNC_FIELDS = {
+    'id': 'id',
+    'school.name': 'name',
+    'school.city': 'city',
+    'school.state': 'state',
+    'school.school_url': 'website',
+    'school.degrees_awarded.predominant': 'predominant_degree',
+    'latest.cost.tuition.in_state': 'in_state_tuition',
+    'latest.cost.tuition.out_of_state': 'out_state_tuition',
+    'latest.admissions.admission_rate.overall': 'admission_rate',
+    'latest.programs.cip_4_digit': 'programs',
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, up to ``capacity`` saved"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ScorecardStore:
+    """Indexed SQLite table of Scorecard schools"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schools (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                name_key TEXT NOT NULL,
+                city TEXT,
+                state TEXT,
+                website TEXT,
+                predominant_degree INTEGER,
+                in_state_tuition REAL,
+                out_state_tuition REAL,
+                admission_rate REAL,
+                programs TEXT NOT NULL DEFAULT '[]',
+                content_hash TEXT NOT NULL,
+                synced_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS schools_name_key ON schools (name_key)")
+        conn.execute("CREATE INDEX IF NOT EXISTS schools_state ON schools (state)")
+        conn.execute("CREATE INDEX IF NOT EXISTS schools_degree ON schools (predominant_degree)")
+        conn.execute("CREATE INDEX IF NOT EXISTS schools_synced ON schools (synced_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM schools").fetchone()[0]
+
+    def upsert(self, results: Iterable[Dict]) -> int:
+        """
+        Insert or update API result records.
+
+        Args:
+            results: Records as returned by the API (dotted field names)
+
+        Returns:
+            Number of records that were new or changed
+        """
+        now = time.time()
+        rows = []
+        for result in results:
+            record = {column: result.get(field) for field, column in SYNC_FIELDS.items()}
+            if record['id'] is None or not record['name']:
+                continue
+            # Program records are kept as the API returns them (``latest.programs.cip_4_digit``)
+            programs = [program for program in record['programs'] or [] if isinstance(program, dict)]
+            record['programs'] = json.dumps(programs, sort_keys=True)
+            record['content_hash'] = hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+            record['name_key'] = normalize_key(record['name'])
+            record['synced_at'] = now
+            rows.append(record)
+        if not rows:
+            return 0
+
+        conn = self._connection()
+        ids = [row['id'] for row in rows]
+        known = dict(conn.execute(
+            f"SELECT id, content_hash FROM schools WHERE id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall())
+        changed = [row for row in rows if known.get(row['id']) != row['content_hash']]
+        unchanged = [row['id'] for row in rows if known.get(row['id']) == row['content_hash']]
+
+        columns = list(changed[0]) if changed else []
+        conn.execute("BEGIN")
+        try:
+            if changed:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO schools ({','.join(columns)}) "
+                    f"VALUES ({','.join(':' + column for column in columns)})",
+                    changed
+                )
+            if unchanged:
+                conn.executemany("UPDATE schools SET synced_at = ? WHERE id = ?",
+                                 [(now, school_id) for school_id in unchanged])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(changed)
+
+    def stale_ids(self, max_age: float) -> List[int]:
+        """Ids of records not synced within ``max_age`` seconds"""
+        cutoff = time.time() - max_age
+        return [row[0] for row in self._connection().execute(
+            "SELECT id FROM schools WHERE synced_at < ? ORDER BY synced_at", (cutoff,)
+        )]
+
+    def search(self, query: Optional[str] = None, school_type: Optional[str] = None,
+               limit: int = 5) -> List[Dict]:
+        """
+        Search stored schools by name, shaped like ``CollegeScorecardAPI.search_colleges`` results.
+
+        ``programs`` holds the API's ``latest.programs.cip_4_digit`` records
+        (dicts with at least a ``title``), and each result also carries the
+        school ``id``.
+
+        Args:
+            query: Name search term (matches on word prefixes, shortest names first)
+            school_type: Predominant degree codes, comma separated (e.g. '1,2')
+            limit: Maximum number of results
+        """
+        clauses, params = [], []
+        key = normalize_key(query) if query else ''
+        if key:
+            clauses.append("(name_key LIKE ? OR name_key LIKE ?)")
+            params += [f"{key}%", f"% {key}%"]
+        if school_type:
+            codes = [int(code) for code in school_type.split(',') if code.strip().isdigit()]
+            clauses.append(f"predominant_degree IN ({','.join('?' * len(codes))})")
+            params += codes
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT * FROM schools {where} ORDER BY name_key NOT LIKE ?, LENGTH(name), name LIMIT ?",
+            params + [f"{key}%", limit]
+        ).fetchall()
+        return [self._result(row) for row in rows]
+
+    def get(self, school_id: int) -> Optional[Dict]:
+        row = self._connection().execute("SELECT * FROM schools WHERE id = ?", (int(school_id),)).fetchone()
+        return self._result(row) if row else None
+
+    @staticmethod
+    def _result(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'city': row['city'] or 'N/A',
+            'state': row['state'] or 'N/A',
+            'website': row['website'] or '',
+            'programs': [
+                # Stores synced before programs were kept whole hold titles only
+                program if isinstance(program, dict) else {'title': program}
+                for program in json.loads(row['programs'])
+            ],
+            'in_state_tuition': row['in_state_tuition'] if row['in_state_tuition'] is not None else 'N/A',
+            'out_state_tuition': row['out_state_tuition'] if row['out_state_tuition'] is not None else 'N/A',
+            'admission_rate': row['admission_rate'] if row['admission_rate'] is not None else 'N/A',
+        }
+
+
+class ScorecardSync:
+    """Concurrent, rate-limited sync of the Scorecard schools endpoint into a store"""
+
+    def __init__(self, store: ScorecardStore, api_key: Optional[str] = None, base_url: str = BASE_URL,
+                 rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, max_workers: int = MAX_WORKERS,
+                 session: Optional[requests.Session] = None):
+        """
+        Args:
+            store: Store to upsert into
+            api_key: api.data.gov key (defaults to the ED_GOV_API_KEY environment variable)
+            base_url: Schools endpoint URL
+            rate: Requests per second allowed by the token bucket
+            burst: Requests that may be made back to back
+            max_workers: Concurrent page requests
+            session: HTTP session (a pooled session is created by default)
+        """
+        self.store = store
+        self.api_key = api_key or os.environ.get("ED_GOV_API_KEY")
+        if not self.api_key:
+            raise ValueError("ED_GOV_API_KEY environment variable is not set")
+        self.base_url = base_url
+        self.bucket = TokenBucket(rate, burst)
+        self.max_workers = max_workers
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def _get(self, params: Dict) -> Dict:
+        self.bucket.acquire()
+        response = self.session.get(self.base_url, params=dict(params, api_key=self.api_key,
+                                                                fields=','.join(SYNC_FIELDS)))
+        response.raise_for_status()
+        return response.json()
+
+    def _fetch_page(self, page: int, params: Dict) -> int:
+        data = self._get(dict(params, page=page, per_page=PER_PAGE))
+        return self.store.upsert(data.get('results', []))
+
+    def sync_all(self, params: Optional[Dict] = None) -> Dict[str, int]:
+        """
+        Fetch every page of schools and upsert them.
+
+        Args:
+            params: Extra API filters (e.g. {'school.operating': 1})
+
+        Returns:
+            Counts of pages fetched, records seen and records changed
+        """
+        params = dict(params or {})
+        first = self._get(dict(params, page=0, per_page=PER_PAGE))
+        changed = self.store.upsert(first.get('results', []))
+        total = first.get('metadata', {}).get('total', 0)
+        pages = max(1, -(-total // PER_PAGE))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            changed += sum(executor.map(lambda page: self._fetch_page(page, params), range(1, pages)))
+        return {'pages': pages, 'records': total, 'changed': changed}
+
+    def refresh_records(self, school_ids: Iterable[int]) -> int:
+        """
+        Re-fetch specific records, a page of ids per request.
+
+        Returns:
+            Number of records that changed
+        """
+        school_ids = [int(school_id) for school_id in school_ids]
+        chunks = [school_ids[i:i + PER_PAGE] for i in range(0, len(school_ids), PER_PAGE)]
+
+        def fetch(chunk: List[int]) -> int:
+            data = self._get({'id': ','.join(map(str, chunk)), 'per_page': PER_PAGE})
+            return self.store.upsert(data.get('results', []))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return sum(executor.map(fetch, chunks))
+
+    def refresh_stale(self, max_age: float) -> int:
+        """Refresh every record not synced within ``max_age`` seconds"""
+        return self.refresh_records(self.store.stale_ids(max_age))
+
+
+_shared_stores: Dict[str, ScorecardStore] = {}
+_shared_stores_lock = threading.Lock()
+
+
+def get_shared_store(path: str = DEFAULT_STORE_PATH) -> Optional[ScorecardStore]:
+    """Process-wide store instance, or None if no sync has populated it yet"""
+    if not os.path.exists(path):
+        return None
+    with _shared_stores_lock:
+        if path not in _shared_stores:
+            _shared_stores[path] = ScorecardStore(path)
+        store = _shared_stores[path]
+    return store if store.count() else None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sync College Scorecard schools into the local store")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="SQLite store path")
+    parser.add_argument("--stale", type=float, help="Only refresh records older than this many hours")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Requests per second")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sync = ScorecardSync(ScorecardStore(args.store), rate=args.rate)
+    if args.stale is not None:
+        changed = sync.refresh_stale(args.stale * 3600)
+        print(f"Refreshed stale records: {changed} changed ({time.perf_counter() - start:.1f}s)")
+    else:
+        summary = sync.sync_all()
+        print(f"Synced {summary['records']} records in {summary['pages']} pages: "
+              f"{summary['changed']} changed ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
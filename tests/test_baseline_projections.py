@@ -0,0 +1,62 @@
+"""Precomputed baseline projections"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.baseline_projections import (BaselineTable, baseline_projection, build_baselines,
+                                           location_options, occupation_options)
+from utils.data_processor import DataProcessor
+
+
+@pytest.fixture(scope="module")
+def tables():
+    coli_df = DataProcessor.load_coli_data("COLI by Location.csv")
+    occupation_df = DataProcessor.load_occupation_data("Occupational Data.csv")
+    return coli_df, occupation_df
+
+
+@pytest.fixture(scope="module")
+def table(tables, tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("baselines") / "table")
+    counts = build_baselines(*tables, directory)
+    assert counts['skipped'] == 0
+    return BaselineTable(directory)
+
+
+def test_options_drop_missing_labels():
+    coli_df = pd.DataFrame({'Cost of Living': ['Miami', np.nan, 'Chicago', 'Miami']})
+    occupation_df = pd.DataFrame({'Occupation': ['Teacher', None]})
+    assert location_options(coli_df) == ['Chicago', 'Miami']
+    assert occupation_options(occupation_df) == ['Teacher']
+
+
+def test_every_pair_is_indexed(tables, table):
+    coli_df, occupation_df = tables
+    assert len(table) == len(location_options(coli_df)) * len(occupation_options(occupation_df))
+    assert table.values.shape[2] == 30
+    assert table.row('Atlantis', 'Teacher') is None
+
+
+@pytest.mark.parametrize("years", [1, 10, 30])
+def test_served_slices_match_the_calculator(tables, table, years):
+    coli_df, occupation_df = tables
+    for location in location_options(coli_df)[:2]:
+        for occupation in occupation_options(occupation_df)[:3]:
+            served = table.projection(location, occupation, years)
+            assert served == baseline_projection(coli_df, occupation_df, location, occupation, years=years)
+
+
+def test_served_projections_are_independent_copies(tables, table):
+    location = location_options(tables[0])[0]
+    occupation = occupation_options(tables[1])[0]
+    first = table.projection(location, occupation, 5)
+    first['net_worth'].append(0)
+    first['expense_categories'].clear()
+    second = table.projection(location, occupation, 5)
+    assert len(second['net_worth']) == 5 and second['expense_categories']
+
+
+def test_covers_only_the_precomputed_rate_and_horizon(table):
+    assert table.covers(7.0 / 100.0, 10)
+    assert not table.covers(0.075, 10)
+    assert not table.covers(0.07, 31)
@@ -0,0 +1,152 @@
+"""Batched BLS client tests against a local stub of the timeseries endpoint"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.bls_api import BLSApi, MAX_SERIES_PER_REQUEST
+from services.http_cache import HttpCache
+
+
+class StubBLSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        self.server.client_ports.add(self.client_address[1])
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        if len(body["seriesid"]) > MAX_SERIES_PER_REQUEST:
+            self.send_response(400)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload = json.dumps({
+            "status": "REQUEST_SUCCEEDED",
+            "responseTime": 12,
+            "message": [],
+            "Results": {"series": [
+                {"seriesID": series_id, "data": [{"year": "2023", "value": str(len(series_id))}]}
+                for series_id in body["seriesid"] if not series_id.startswith("MISSING")
+            ]}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBLSHandler)
+    server.requests = []
+    server.client_ports = set()
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub_server, tmp_path):
+    import requests
+    session = requests.Session()
+    yield BLSApi(api_key="test-key", base_url=f"http://127.0.0.1:{stub_server.server_port}",
+                 session=session, cache=HttpCache(str(tmp_path / "http_cache.sqlite")))
+    session.close()
+
+
+def test_queued_series_are_coalesced_into_batches_of_50(client, stub_server):
+    series_ids = [f"OEUM0000000{i:06d}" for i in range(120)]
+    results = client.fetch_series(series_ids)
+
+    assert [len(request["seriesid"]) for request in stub_server.requests] == [50, 50, 20]
+    assert all(request["registrationkey"] == "test-key" for request in stub_server.requests)
+    # Every caller gets a response shaped like a single-series reply
+    for series_id in series_ids:
+        assert results[series_id]["status"] == "REQUEST_SUCCEEDED"
+        assert [series["seriesID"] for series in results[series_id]["Results"]["series"]] == [series_id]
+    # All batches went over one pooled connection
+    assert len(stub_server.client_ports) == 1
+
+
+def test_fetched_series_are_not_requested_again(client, stub_server):
+    client.prefetch_career_details(["15-1252", "29-1141"])
+    assert len(stub_server.requests) == 1
+    assert len(stub_server.requests[0]["seriesid"]) == 4
+
+    projection = client.get_employment_projection("15-1252")
+    assert projection["Results"]["series"][0]["seriesID"] == "EP15-1252"
+    assert len(stub_server.requests) == 1
+
+
+def test_year_ranges_are_batched_separately(client, stub_server):
+    client.queue_series(["A1", "A2"], 2022, 2023)
+    client.queue_series(["B1"])
+    client.flush()
+
+    assert sorted(len(request["seriesid"]) for request in stub_server.requests) == [1, 2]
+    ranged = next(request for request in stub_server.requests if len(request["seriesid"]) == 2)
+    assert (ranged["startyear"], ranged["endyear"]) == ("2022", "2023")
+
+
+def test_missing_series_and_failed_requests(client, stub_server):
+    results = client.fetch_series(["MISSING1", "OEUN1"])
+    assert results["MISSING1"]["Results"]["series"] == []
+    assert results["OEUN1"]["Results"]["series"][0]["seriesID"] == "OEUN1"
+
+    failing = BLSApi(api_key="test-key", base_url="http://127.0.0.1:1", session=client.session,
+                     cache=client.cache)
+    assert failing.fetch_series(["X1"]) == {"X1": {}}
+
+
+def test_responses_are_shared_through_the_disk_cache(client, stub_server):
+    client.fetch_series(["OEUN1", "OEUN2"])
+    assert len(stub_server.requests) == 1
+
+    # A second client (e.g. another worker process) reads the same cache file
+    other = BLSApi(api_key="other-key", base_url=client.base_url, session=client.session,
+                   cache=HttpCache(client.cache.path))
+    results = other.fetch_series(["OEUN1", "OEUN2", "OEUN3"])
+    assert [request["seriesid"] for request in stub_server.requests[1:]] == [["OEUN3"]]
+    assert results["OEUN1"]["Results"]["series"][0]["seriesID"] == "OEUN1"
+
+
+def test_async_loader_runs_batches_concurrently(client, stub_server):
+    stub_server.delay = 0.3
+    codes = [f"{i:02d}-{i:04d}" for i in range(60)]  # 120 series -> 3 batches
+
+    start = time.perf_counter()
+    details = asyncio.run(client.load_career_details_async(codes))
+    elapsed = time.perf_counter() - start
+
+    assert len(stub_server.requests) == 3
+    assert stub_server.max_in_flight == 3
+    assert elapsed < 2 * stub_server.delay
+    assert details["05-0005"]["projection"]["Results"]["series"][0]["seriesID"] == "EP05-0005"
+
+
+def test_async_loader_respects_concurrency_limit(client, stub_server):
+    stub_server.delay = 0.1
+    codes = [f"{i:02d}-{i:04d}" for i in range(60)]
+    asyncio.run(client.load_career_details_async(codes, concurrency=1))
+    assert stub_server.max_in_flight == 1
+    assert len(stub_server.requests) == 3
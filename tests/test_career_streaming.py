@@ -0,0 +1,176 @@
+"""Streamed career suggestions against a local fake of the chat completions endpoint"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from openai import OpenAI
+
+from services.career_suggestion import SUGGESTIONS_ENDPOINT, CareerSuggestionService
+from services.http_cache import HttpCache
+from utils.json_stream import IncrementalJSONParser, select_paths
+
+REPLY = {
+    "primary_path": {
+        "title": "Data Analyst",
+        "description": "Turn data into decisions",
+        "timeline": [
+            {"year": 2025, "milestone": "Junior Analyst", "skills_needed": ["SQL"], "estimated_salary": 60000},
+            {"year": 2028, "milestone": "Analyst", "skills_needed": ["Python", "Stats"], "estimated_salary": 80000},
+            {"year": 2032, "milestone": "Lead {Analytics}", "skills_needed": [], "estimated_salary": 110000},
+        ]
+    },
+    "alternative_paths": [
+        {"title": "Data Engineer", "description": "Build pipelines", "timeline": [
+            {"year": 2025, "milestone": "Engineer I", "skills_needed": ["ETL"], "estimated_salary": 70000}
+        ]}
+    ]
+}
+CHUNK_SIZE = 16
+
+
+class FakeStreamingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        text = "```json\n" + json.dumps(REPLY, indent=2) + "\n```"
+        pieces = [text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+        self.server.total_chunks = len(pieces)
+        for piece in pieces:
+            chunk = {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self._send_event(json.dumps(chunk))
+            self.server.sent += 1
+            time.sleep(self.server.delay)
+        try:
+            self._send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+        except ConnectionError:
+            pass  # the client may hang up as soon as it reads [DONE]
+
+    def _send_event(self, data):
+        event = f"data: {data}\n\n".encode()
+        self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeStreamingHandler)
+    server.requests = []
+    server.sent = server.total_chunks = 0
+    server.delay = 0.005
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(fake_server, tmp_path):
+    client = OpenAI(api_key="test-key", base_url=f"http://127.0.0.1:{fake_server.server_port}/v1")
+    return CareerSuggestionService(client=client, cache=HttpCache(str(tmp_path / "http_cache.sqlite")))
+
+
+def stream(service):
+    return service.stream_career_suggestions(
+        interests=["Technology"], skills=["Math"],
+        education_level="Bachelor's Degree", preferred_work_style="Remote"
+    )
+
+
+def test_milestones_arrive_before_the_reply_finishes(service, fake_server):
+    events = []
+    for path, value in stream(service):
+        events.append((path, value, fake_server.sent))
+
+    assert fake_server.requests[0]["stream"] is True
+    milestones = [(path, value, sent) for path, value, sent in events
+                  if path[:2] == ('primary_path', 'timeline')]
+    assert [value for _, value, _ in milestones] == REPLY["primary_path"]["timeline"]
+    # The first milestone was available while most of the reply was still to come
+    assert milestones[0][2] < fake_server.total_chunks / 2
+    assert events[-1][:2] == ((), REPLY)
+
+
+def test_streamed_reply_is_cached(service, fake_server):
+    first = list(stream(service))
+    assert list(stream(service)) == first
+    assert len(fake_server.requests) == 1
+    # The non-streaming call shares the cache entry
+    assert json.loads(service.generate_career_suggestions(
+        ["Technology"], ["Math"], "Bachelor's Degree", "Remote")) == REPLY
+    assert len(fake_server.requests) == 1
+
+
+def test_concurrent_identical_streams_share_one_request(service, fake_server):
+    fake_server.delay = 0.02
+    results = [None, None]
+
+    def consume(slot):
+        results[slot] = list(stream(service))
+
+    threads = [threading.Thread(target=consume, args=(slot,)) for slot in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert len(fake_server.requests) == 1
+    # The caller that waited replays the stored reply
+    assert results[0][-1] == results[1][-1] == ((), REPLY)
+    assert {len(result) for result in results} == {len(results[0])}
+
+
+class FailingCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        raise ConnectionError("API unreachable")
+
+
+def test_failed_stream_serves_an_expired_reply(fake_server, tmp_path):
+    # Entries expire, and leave the stale window, as soon as they are stored
+    cache = HttpCache(str(tmp_path / "http_cache.sqlite"), ttls={SUGGESTIONS_ENDPOINT: -1}, stale_window=0)
+    client = OpenAI(api_key="test-key", base_url=f"http://127.0.0.1:{fake_server.server_port}/v1")
+    service = CareerSuggestionService(client=client, cache=cache)
+    first = list(stream(service))
+
+    completions = FailingCompletions()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    assert list(stream(service)) == first
+    assert completions.calls == 1 and len(fake_server.requests) == 1
+
+    # Without an expired reply the error reaches the caller
+    service.cache = HttpCache(str(tmp_path / "empty.sqlite"))
+    with pytest.raises(ConnectionError):
+        list(stream(service))
+
+
+def test_parser_handles_any_chunk_boundaries():
+    text = json.dumps({"a": [{"s": "x\\\"}]", "n": -1.5e3, "t": True}, {"z": None}], "b": "end"})
+    select = select_paths(('a', '*'), ('b',), ())
+    expected = [(('a', 0), {"s": "x\\\"}]", "n": -1.5e3, "t": True}), (('a', 1), {"z": None}),
+                (('b',), "end"), ((), json.loads(text))]
+    for size in range(1, 8):
+        parser = IncrementalJSONParser(select)
+        events = []
+        for i in range(0, len(text), size):
+            events += parser.feed(text[i:i + size])
+        assert events == expected
@@ -0,0 +1,155 @@
+"""Cached, coalesced OpenAI calls in CareerSuggestionService, using a local stub client"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.career_suggestion import CareerSuggestionService
+from services.http_cache import HttpCache
+
+SUGGESTIONS = {
+    "primary_path": {"title": "Data Analyst", "description": "Analyze data", "timeline": []},
+    "alternative_paths": [],
+}
+
+
+class StubChatClient:
+    """Stands in for ``OpenAI``: records calls and returns a canned completion"""
+
+    def __init__(self, content=SUGGESTIONS, delay=0.0):
+        self.content = content
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+        time.sleep(self.delay)
+        content = self.content if isinstance(self.content, str) else json.dumps(self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(str(tmp_path / "http_cache.sqlite"))
+
+
+def suggest(service, interests=("Technology", "Science"), skills=("Math",)):
+    return service.generate_career_suggestions(
+        interests=list(interests), skills=list(skills),
+        education_level="Bachelor's Degree", preferred_work_style="Remote"
+    )
+
+
+def test_identical_inputs_are_answered_from_the_cache(cache):
+    client = StubChatClient()
+    service = CareerSuggestionService(client=client, cache=cache)
+
+    assert json.loads(suggest(service)) == SUGGESTIONS
+    # Multiselect order and stray whitespace do not change the key
+    assert json.loads(suggest(service, interests=("Science ", "Technology"))) == SUGGESTIONS
+    assert len(client.calls) == 1
+
+    # The cache is persistent: another service (e.g. another session) reuses it
+    other = CareerSuggestionService(client=client, cache=HttpCache(cache.path))
+    suggest(other)
+    assert len(client.calls) == 1
+
+    suggest(service, skills=("Writing",))
+    assert len(client.calls) == 2
+
+
+def test_model_is_part_of_the_key(cache):
+    client = StubChatClient()
+    suggest(CareerSuggestionService(client=client, cache=cache))
+    suggest(CareerSuggestionService(client=client, cache=cache, model="gpt-4o"))
+    assert [call["model"] for call in client.calls] == ["gpt-4", "gpt-4o"]
+
+
+def test_concurrent_identical_requests_share_one_call(cache):
+    client = StubChatClient(delay=0.2)
+    service = CareerSuggestionService(client=client, cache=cache)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get_skill_recommendations("Nurse")))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.calls) == 1
+    assert len(results) == 5 and all(json.loads(result) == SUGGESTIONS for result in results)
+
+
+def test_failures_and_malformed_replies_are_not_cached(cache):
+    client = StubChatClient(content="not json")
+    service = CareerSuggestionService(client=client, cache=cache)
+
+    assert "error" in json.loads(suggest(service))
+    client.content = SUGGESTIONS
+    assert json.loads(suggest(service)) == SUGGESTIONS
+    assert len(client.calls) == 2
+
+
+class SlowPathClient(StubChatClient):
+    """Stub whose reply time depends on the career path in the prompt"""
+
+    def __init__(self, delays):
+        super().__init__()
+        self.delays = delays
+        self.in_flight = self.max_in_flight = 0
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        delay = next(delay for path, delay in self.delays.items() if path in prompt)
+        with self.lock:
+            self.calls.append(kwargs)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(delay)
+        with self.lock:
+            self.in_flight -= 1
+        content = json.dumps({"technical_skills": [prompt.split("career in ")[1].split("?")[0]]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_skill_recommendations_run_in_parallel_and_arrive_as_completed(cache):
+    client = SlowPathClient({"Nurse": 0.3, "Pilot": 0.1, "Chef": 0.2})
+    service = CareerSuggestionService(client=client, cache=cache)
+
+    start = time.perf_counter()
+    results = list(service.iter_skill_recommendations(["Nurse", "Pilot", "Chef", "Pilot"]))
+    elapsed = time.perf_counter() - start
+
+    assert [path for path, _ in results] == ["Pilot", "Chef", "Nurse"]
+    assert json.loads(results[0][1]) == {"technical_skills": ["Pilot"]}
+    assert client.max_in_flight == 3
+    assert elapsed < 0.5
+    assert all(call["timeout"] == 60 for call in client.calls)
+
+
+def test_skill_recommendations_respect_concurrency_and_timeouts(cache):
+    client = SlowPathClient({"Nurse": 0.05, "Pilot": 0.05, "Chef": 1.0})
+    service = CareerSuggestionService(client=client, cache=cache)
+
+    results = dict(service.iter_skill_recommendations(["Nurse", "Pilot", "Chef"], max_workers=2, timeout=0.3))
+    assert client.max_in_flight == 2
+    assert "technical_skills" in json.loads(results["Nurse"])
+    assert "timed out" in json.loads(results["Chef"])["error"]
+
+
+def test_slow_consumers_do_not_time_out_finished_requests(cache):
+    client = SlowPathClient({"Nurse": 0.05, "Pilot": 0.05, "Chef": 0.05})
+    service = CareerSuggestionService(client=client, cache=cache)
+
+    results = {}
+    for career_path, recommendations in service.iter_skill_recommendations(
+            ["Nurse", "Pilot", "Chef"], timeout=0.2):
+        results[career_path] = json.loads(recommendations)
+        time.sleep(0.3)  # e.g. rendering the result
+    assert results == {path: {"technical_skills": [path]} for path in ("Nurse", "Pilot", "Chef")}
@@ -0,0 +1,123 @@
+"""Bitmap filter index of the college discovery page"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.college_filters import CollegeFilterIndex, SortedRangeIndex, pack, unpack
+
+
+def colleges(size=400, seed=7):
+    rng = np.random.default_rng(seed)
+
+    def with_gaps(values, share=0.2):
+        values = values.astype(float)
+        values[rng.random(size) < share] = np.nan
+        return values
+
+    ranked = size // 6
+    top_150 = np.full(size, np.nan)
+    top_150[rng.choice(size, ranked, replace=False)] = rng.permutation(ranked) + 1
+    liberal_arts = np.full(size, np.nan)
+    liberal_arts[rng.choice(size, ranked, replace=False)] = rng.permutation(ranked) + 1
+    return pd.DataFrame({
+        'name': [f"College {i}" for i in range(size)],
+        'state': rng.choice(['CA', 'NY', 'TX', 'MA'], size),
+        'ownership': rng.choice([1, 2, 3], size).astype(float),
+        # Whole-percent rates and round prices put many rows exactly on slider edges
+        'admission_rate.overall': with_gaps(rng.integers(5, 101, size) / 100),
+        'sat_scores.average.overall': with_gaps(rng.integers(90, 160, size) * 10),
+        'avg_net_price.public': with_gaps(rng.integers(0, 40, size) * 1000),
+        'avg_net_price.private': with_gaps(rng.integers(0, 60, size) * 1000),
+        'US News Top 150': top_150,
+        'best liberal arts colleges': liberal_arts,
+    })
+
+
+def mask_filter(df, states=None, in_state_tuition_range=(0, float('inf')),
+                out_state_tuition_range=(0, float('inf')), admission_rate_range=(0.0, 100.0),
+                sat_range=(0, float('inf')), ownership_codes=None, top_150_only=False, liberal_arts_only=False):
+    """The page's former chained pandas masks"""
+    filtered_df = df.copy()
+    if top_150_only:
+        filtered_df = filtered_df[filtered_df['US News Top 150'].notna()].sort_values('US News Top 150')
+    if liberal_arts_only:
+        filtered_df = filtered_df[filtered_df['best liberal arts colleges'].notna()].sort_values(
+            'best liberal arts colleges')
+    if states:
+        filtered_df = filtered_df[filtered_df['state'].isin(states)].copy()
+
+    public_mask = (filtered_df['ownership'] == 1) & (
+        pd.isna(filtered_df['avg_net_price.public']) |
+        ((filtered_df['avg_net_price.public'] >= in_state_tuition_range[0]) &
+         (filtered_df['avg_net_price.public'] <= in_state_tuition_range[1])))
+    private_mask = filtered_df['ownership'].isin([2, 3]) & (
+        pd.isna(filtered_df['avg_net_price.private']) |
+        ((filtered_df['avg_net_price.private'] >= out_state_tuition_range[0]) &
+         (filtered_df['avg_net_price.private'] <= out_state_tuition_range[1])))
+    filtered_df = filtered_df[public_mask | private_mask]
+
+    filtered_df['admission_rate.overall'] = filtered_df['admission_rate.overall'].fillna(1.0)
+    filtered_df = filtered_df[
+        (filtered_df['admission_rate.overall'] * 100 >= admission_rate_range[0]) &
+        (filtered_df['admission_rate.overall'] * 100 <= admission_rate_range[1])]
+
+    sat_mask = pd.isna(filtered_df['sat_scores.average.overall']) | (
+        (filtered_df['sat_scores.average.overall'] >= sat_range[0]) &
+        (filtered_df['sat_scores.average.overall'] <= sat_range[1]))
+    filtered_df = filtered_df[sat_mask]
+
+    if ownership_codes:
+        filtered_df = filtered_df[filtered_df['ownership'].isin(ownership_codes)]
+    return filtered_df.index.to_numpy()
+
+
+FILTERS = [
+    {},
+    {'states': ['CA', 'NY']},
+    {'states': ['WA']},
+    {'in_state_tuition_range': (10000, 20000), 'out_state_tuition_range': (0, 30000)},
+    {'admission_rate_range': (20.0, 57.0)},
+    {'admission_rate_range': (100.0, 100.0)},  # only open admission and unreported rates
+    {'sat_range': (1200, 1400)},
+    {'sat_range': (1600, 1600)},
+    {'ownership_codes': [2, 3], 'states': ['TX']},
+    {'top_150_only': True, 'admission_rate_range': (0.0, 50.0)},
+    {'liberal_arts_only': True, 'sat_range': (1000, 1500)},
+    {'top_150_only': True, 'liberal_arts_only': True},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_index_matches_pandas_masks(filters):
+    df = colleges()
+    rows = CollegeFilterIndex(df).filter(**filters)
+    expected = mask_filter(df, **filters)
+    assert sorted(rows.tolist()) == sorted(expected.tolist())
+    if filters.get('top_150_only') != filters.get('liberal_arts_only'):
+        # A single ranking filter orders the rows by that ranking
+        assert rows.tolist() == expected.tolist()
+
+
+def test_range_edges_are_inclusive_and_skip_missing_values():
+    index = SortedRangeIndex(np.array([10.0, np.nan, 20.0, 20.0, 30.0]))
+    assert unpack(index.bitmap(20, 20), 5).tolist() == [False, False, True, True, False]
+    assert unpack(index.bitmap(10, 30), 5).tolist() == [True, False, True, True, True]
+    assert not unpack(index.bitmap(31, 40), 5).any()
+    assert unpack(index.missing, 5).tolist() == [False, True, False, False, False]
+    # Repeated ranges are served from the cache
+    assert index.bitmap(20, 20) is index.bitmap(20, 20)
+
+
+def test_nan_admission_rates_count_as_open_admission():
+    df = colleges(size=8)
+    df['admission_rate.overall'] = [np.nan, 0.5, 1.0, np.nan, 0.1, 0.99, np.nan, 0.3]
+    df['ownership'] = 1.0
+    df['avg_net_price.public'] = np.nan
+    index = CollegeFilterIndex(df)
+    assert index.filter(admission_rate_range=(100.0, 100.0)).tolist() == [0, 2, 3, 6]
+    assert index.filter(admission_rate_range=(0.0, 50.0)).tolist() == [1, 4, 7]
+
+
+def test_bitmaps_round_trip():
+    mask = np.array([True, False, True] * 5)
+    assert unpack(pack(mask), len(mask)).tolist() == mask.tolist()
@@ -0,0 +1,114 @@
+"""Memory-mapped columnar dataset cache"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dataset_cache import (MANIFEST_NAME, META_NAME, build_path, ensure_build, load_dataset, read_arrays,
+                                 read_columnar, source_digest, write_columnar)
+from utils.datasets import COLLEGE_COLUMNS, build_college_table, build_oews_table
+
+
+def parse(source_path):
+    df = pd.read_csv(source_path)
+    df['name'] = df['name'].fillna('').astype(str)
+    return df
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "schools.csv"
+    path.write_text("name,rate,rank\nAlpha,0.25,1\nBeta,,2\nGamma Ünïcode,0.5,3\n")
+    return str(path)
+
+
+def test_strings_and_numbers_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'name': ['Alpha', None, 'Gamma Ünïcode'],
+        'rate': [0.25, np.nan, 0.5],
+        'rank': np.array([1, 2, 3], dtype=np.int64),
+        'flag': [True, False, True],
+    })
+    directory = str(tmp_path / "build")
+    write_columnar(df, directory, meta={'dataset': 'schools'})
+
+    loaded = read_columnar(directory)
+    assert loaded['name'].tolist() == ['Alpha', '', 'Gamma Ünïcode']  # missing strings become ''
+    np.testing.assert_array_equal(loaded['rate'].to_numpy(), df['rate'].to_numpy())
+    assert loaded['rank'].dtype == np.int64 and loaded['flag'].dtype == bool
+    assert read_columnar(directory, ['rank']).columns.tolist() == ['rank']
+
+    arrays = read_arrays(directory)
+    assert isinstance(arrays['rate'], np.memmap)
+    with open(os.path.join(directory, META_NAME)) as f:
+        assert json.load(f)['dataset'] == 'schools'
+    with pytest.raises(KeyError):
+        read_arrays(directory, ['missing'])
+
+
+def test_digest_is_remembered_in_the_manifest(source, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    digest = source_digest(source, cache_dir)
+    with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+        entry = json.load(f)[os.path.abspath(source)]
+    assert entry['sha256'] == digest and entry['size'] == os.path.getsize(source)
+    assert source_digest(source, cache_dir) == digest
+
+
+def test_source_change_rebuilds(source, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = ensure_build('schools', source, parse, cache_dir)
+    assert ensure_build('schools', source, parse, cache_dir) == first
+
+    with open(source, 'a') as f:
+        f.write("Delta,0.75,4\n")
+    second = build_path('schools', source, cache_dir)
+    assert second != first
+    df = load_dataset('schools', source, parse, cache_dir=cache_dir)
+    assert os.path.exists(os.path.join(second, META_NAME))
+    assert df['name'].tolist()[-1] == 'Delta'
+
+
+def test_publish_is_atomic(tmp_path):
+    directory = str(tmp_path / "build")
+    write_columnar(pd.DataFrame({'x': [1, 2]}), directory)
+    # A second writer of the same build loses the rename and leaves the first build intact
+    write_columnar(pd.DataFrame({'x': [3, 4, 5]}), directory)
+    assert read_columnar(directory)['x'].tolist() == [1, 2]
+
+    # A failing build leaves neither the target nor its temporary directory behind
+    failing = str(tmp_path / "failing")
+    with pytest.raises(TypeError):
+        write_columnar(pd.DataFrame({'x': [1]}), failing, meta={'bad': object()})
+    assert not os.path.exists(failing)
+    assert sorted(os.listdir(tmp_path)) == ['build']
+
+
+def test_oews_numeric_columns_become_float(tmp_path):
+    path = tmp_path / "oews.csv"
+    path.write_text("OCC_CODE,OCC_TITLE,TOT_EMP,A_MEAN,ANNUAL\n"
+                    "15-1252,Software Developers,\"1,534,790\",132930,\n"
+                    "29-1141,Registered Nurses,*,#,TRUE\n")
+    df = build_oews_table(str(path))
+    # TOT_EMP was an int column before the cache; it is float now so '*' can be NaN
+    assert df['TOT_EMP'].dtype == np.float64
+    assert df['TOT_EMP'].iloc[0] == 1534790.0 and np.isnan(df['TOT_EMP'].iloc[1])
+    assert np.isnan(df['A_MEAN'].iloc[1])
+    assert df['ANNUAL'].tolist() == [False, True]
+    assert df['OCC_CODE'].tolist() == ['15-1252', '29-1141']
+
+
+def test_college_table_always_has_ids(tmp_path):
+    header = ','.join(column for column in COLLEGE_COLUMNS if column != 'id')
+    row = "MIT,Cambridge,MA,0.04,1550,35,,20000,2,2,"
+    path = tmp_path / "scorecard.csv"
+    path.write_text(f"id,extra,{header}\n166683,x,{row}\n")
+    df = build_college_table(str(path))
+    assert df.columns.tolist() == COLLEGE_COLUMNS
+    assert df['id'].tolist() == [166683] and df['name'].tolist() == ['MIT']
+
+    # Pages select colleges by id, so sources without one get row positions
+    path.write_text(f"{header}\n{row}\n{row.replace('MIT', 'Caltech')}\n")
+    assert build_college_table(str(path))['id'].tolist() == [0, 1]
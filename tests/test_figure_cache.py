@@ -0,0 +1,34 @@
+"""Per-session figure cache keyed by projection content"""
+import numpy as np
+
+from visualizations.figure_cache import FigureCache, content_hash
+
+
+def test_hash_follows_content_and_order():
+    assert content_hash([1, 2.0, 3]) == content_hash(np.array([1.0, 2.0, 3.0]).tolist())
+    assert content_hash([1, 2, 3]) != content_hash([1, 2, 4])
+    assert content_hash({'a': [1], 'b': [2]}) != content_hash({'b': [2], 'a': [1]})
+    assert content_hash(['1']) != content_hash([1])
+    assert content_hash(None) != content_hash([])
+
+
+def test_unchanged_inputs_skip_the_build():
+    cache = FigureCache(max_entries=2)
+    builds = []
+    build = lambda: builds.append(1) or {'figure': len(builds)}
+
+    first = cache.get_or_build('cash_flow', ([2025, 2026], [1.0, 2.0]), build)
+    assert cache.get_or_build('cash_flow', ([2025, 2026], [1.0, 2.0]), build) is first
+    cache.get_or_build('net_worth', ([2025, 2026], [1.0, 2.0]), build)
+    assert len(builds) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_view_is_evicted():
+    cache = FigureCache(max_entries=2)
+    for inputs in ([1], [2], [1], [3]):
+        cache.get_or_build('fig', inputs, lambda: {})
+    # [2] was the least recently used when [3] arrived
+    assert cache.misses == 3
+    cache.get_or_build('fig', [2], lambda: {})
+    assert cache.misses == 4
@@ -0,0 +1,43 @@
+"""Array helpers behind the cash flow figure and tables"""
+import numpy as np
+
+from visualizations.figure_data import (ExpenseSplits, block_labels, block_means, format_currency,
+                                        lifestyle_impact, series_matrix)
+
+
+def test_format_currency_matches_str_format():
+    values = np.array([0, -0.4, 0.5, 1.5, 999.5, 1000, -1234567.89, 1e12, np.nan, np.inf])
+    assert format_currency(values).tolist() == ['${:,.0f}'.format(value) for value in values]
+    assert format_currency([[1, 2000]]).tolist() == [['$1', '$2,000']]
+
+
+def test_series_are_padded_to_the_year_count():
+    labels, matrix = series_matrix({'a': [1, 2], 'b': [1, 2, 3, 4]}, 3)
+    assert labels == ['a', 'b']
+    assert matrix.tolist() == [[1, 2, 0], [1, 2, 3]]
+
+
+def test_small_expenses_are_grouped_into_other():
+    labels = ['Housing', 'Food', 'Coffee', 'Gum']
+    matrix = np.array([[900, 500], [80, 500], [15, 0], [5, 0]], dtype=float)
+    splits = ExpenseSplits(labels, matrix)
+
+    main, other = splits.for_year(0)
+    assert main == {'Housing': 900, 'Food': 80, 'Other': 20}
+    assert other == {'Coffee': 15, 'Gum': 5}
+    assert splits.for_year(-1) == ({'Housing': 500, 'Food': 500}, {})
+
+
+def test_lifestyle_impact_starts_at_marriage():
+    labels = ['Housing', 'Marriage One-time', 'Spouse Food']
+    matrix = np.array([[100, 100, 100], [0, 50, 0], [0, 0, 30]], dtype=float)
+    assert np.allclose(lifestyle_impact(labels, matrix), [0, 100 - 102, 130 - 100 * 1.02 ** 2])
+    assert lifestyle_impact(['Housing'], matrix[:1]) is None
+
+
+def test_block_means_ignore_missing_values():
+    values = np.array([[1, 3, 5], [np.nan, 5, np.nan], [7, 9, 11]], dtype=float)
+    means = block_means(values, 2, 2)
+    assert np.allclose(means, [[3, 5], [8, 11]])
+    assert np.isnan(block_means(np.full((2, 2), np.nan), 2, 2)).all()
+    assert block_labels(['a', 'b', 'c'], 2) == ['a – b', 'c']
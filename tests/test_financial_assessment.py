@@ -0,0 +1,87 @@
+"""Batched, cached financial assessments using a local stub client"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import financial_assessment
+from services.financial_assessment import assess_scenario, generate_assessments, scenario_hash
+
+
+class StubChatClient:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+        self.in_flight = self.max_in_flight = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        if self.fail:
+            raise ConnectionError("offline")
+        plan = kwargs["messages"][-1]["content"].split('plan "')[1].split('"')[0]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"Nice plan: {plan}"))])
+
+
+@pytest.fixture
+def client():
+    stub = StubChatClient(delay=0.1)
+    financial_assessment.set_client(stub)
+    yield stub
+    financial_assessment.set_client(None)
+
+
+def scenario(name, net_worth=100000):
+    return {
+        'name': name, 'date': '2024-01-01 10:00', 'location': 'Boston, MA', 'occupation': 'Nurse',
+        'investment_rate': 7.0, 'final_net_worth': net_worth,
+        'milestones': [{'name': 'Buy a car', 'type': 'CarPurchase', 'year': 3, 'car_price': 20000,
+                        'vehicle_type': 'Sedan', 'down_payment': 10}],
+        'yearly_data': {'net_worth': [1, 2, 3]},
+    }
+
+
+def test_batch_runs_concurrently_and_stores_results(client):
+    scenarios = [scenario(f"Plan {i}") for i in range(4)]
+    start = time.perf_counter()
+    results = generate_assessments(scenarios)
+
+    assert time.perf_counter() - start < 0.3
+    assert client.max_in_flight == 4
+    assert results == {i: f"Nice plan: Plan {i}" for i in range(4)}
+    assert scenarios[2]['assessment'] == {'hash': scenario_hash(scenarios[2]), 'text': "Nice plan: Plan 2"}
+
+
+def test_unchanged_scenarios_are_not_reassessed(client):
+    scenarios = [scenario("A"), scenario("B"), scenario("A")]
+    generate_assessments(scenarios)
+    assert len(client.calls) == 2  # identical scenarios share one request
+    assert scenarios[2]['assessment']['text'] == "Nice plan: A"
+
+    generate_assessments(scenarios)
+    assert assess_scenario(scenarios[1]) == "Nice plan: B"
+    assert len(client.calls) == 2
+
+    # The stored result does not survive a change to the scenario's content
+    scenarios[1]['final_net_worth'] = 250000
+    generate_assessments(scenarios)
+    assert len(client.calls) == 3
+
+
+def test_failures_are_not_stored():
+    financial_assessment.set_client(StubChatClient(fail=True))
+    try:
+        plan = scenario("A")
+        assert assess_scenario(plan).startswith("Unable to generate assessment")
+        assert 'assessment' not in plan
+    finally:
+        financial_assessment.set_client(None)
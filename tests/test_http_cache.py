@@ -0,0 +1,77 @@
+"""Disk-backed HTTP response cache tests"""
+import threading
+import time
+
+import pytest
+
+from services.http_cache import HttpCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(str(tmp_path / "http_cache.sqlite"), ttls={'test': 60})
+
+
+def test_key_ignores_credentials_and_param_order():
+    assert cache_key('test', {'a': 1, 'b': 2, 'api_key': 'x'}) == cache_key('test', {'b': 2, 'a': 1})
+    assert cache_key('test', {'a': 1}) != cache_key('other', {'a': 1})
+
+
+def test_fetch_uses_cache_until_expiry(cache):
+    calls = []
+    loader = lambda: calls.append(1) or {'value': len(calls)}
+
+    assert cache.fetch('test', {'q': 'x'}, loader) == {'value': 1}
+    assert cache.fetch('test', {'q': 'x'}, loader) == {'value': 1}
+    assert len(calls) == 1
+
+
+def test_stale_entries_are_served_while_one_refresh_runs(cache):
+    cache.store('test', {'q': 'x'}, {'value': 'old'})
+    cache._connection().execute("UPDATE responses SET expires_at = ?", (time.time() - 1,))
+
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(5)
+        return {'value': 'new'}
+
+    # Concurrent readers all get the stale value; only one refresh is started
+    assert cache.fetch('test', {'q': 'x'}, slow_loader) == {'value': 'old'}
+    assert cache.fetch('test', {'q': 'x'}, slow_loader) == {'value': 'old'}
+    other_process = HttpCache(cache.path)
+    assert other_process.fetch('test', {'q': 'x'}, slow_loader) == {'value': 'old'}
+    release.set()
+
+    deadline = time.time() + 5
+    while cache.lookup('test', {'q': 'x'}).value != {'value': 'new'} and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 1
+    assert not cache.lookup('test', {'q': 'x'}).stale
+
+
+def test_expired_entry_is_fallback_when_loader_fails(cache):
+    cache.store('test', {'q': 'x'}, {'value': 'old'})
+    cache._connection().execute("UPDATE responses SET expires_at = 0, stale_until = 0")
+
+    def failing_loader():
+        raise ConnectionError("offline")
+
+    assert cache.lookup('test', {'q': 'x'}) is None
+    assert cache.fetch('test', {'q': 'x'}, failing_loader) == {'value': 'old'}
+    with pytest.raises(ConnectionError):
+        cache.fetch('test', {'q': 'missing'}, failing_loader)
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = HttpCache(str(tmp_path / "small.sqlite"), max_bytes=300)
+    for i in range(5):
+        cache.store('test', {'i': i}, {'payload': 'x' * 80})
+        cache._connection().execute("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                    (i, cache_key('test', {'i': i})))
+    cache.evict()
+
+    kept = [i for i in range(5) if cache.lookup('test', {'i': i}) is not None]
+    assert kept == [2, 3, 4]
@@ -0,0 +1,98 @@
+"""ZIP-prefix, state and national income rollups"""
+import pytest
+
+import utils.income_rollups as income_rollups
+from utils.dataset_cache import read_arrays, write_columnar
+from utils.income_rollups import IncomeRollups, build_income_distribution, build_income_rollups, build_income_tables
+
+HEADER = ("The state associated with the return,The State Federal Information Processing System (FIPS) code,"
+          "zipcode,Number of returns,Number of joint returns,Number of head of household returns,"
+          "Number of individuals,Number of elderly returns,Adjusted gross income (AGI),"
+          "Number of returns with total income, Total income amount ,Total Income Tax,Mean Income,"
+          "agi_stub_count,note\n")
+
+# state, zipcode, returns, total income (thousands of dollars)
+ZIPS = [
+    ('AK', 0, 500, 45000),  # state total, excluded from every rollup
+    ('AK', 99501, 100, 10000),
+    ('AK', 99502, 300, 15000),
+    ('AK', 99999, 100, 20000),  # unlisted ZIPs: state and national only
+    ('MA', 0, 400, 60000),
+    ('MA', 2139, 200, 40000),
+    ('MA', 2140, 200, 20000),
+]
+
+
+def write_source(path, zips=ZIPS):
+    lines = [
+        f'{state},0,{zipcode},{returns},{returns // 2},0,{returns * 2},{returns // 4},{income},{returns},'
+        f'" {income:,} ",{income // 10}," {income * 1000 / returns:,.2f} ",6,note\n'
+        for state, zipcode, returns, income in zips
+    ]
+    path.write_text(HEADER + "".join(lines))
+    return str(path)
+
+
+@pytest.fixture
+def rollups(tmp_path):
+    source = write_source(tmp_path / "irs.csv")
+    cube, distribution = build_income_tables(source)
+    write_columnar(cube, str(tmp_path / "rollups"))
+    write_columnar(distribution, str(tmp_path / "distribution"))
+    return IncomeRollups(read_arrays(str(tmp_path / "rollups")),
+                         read_arrays(str(tmp_path / "distribution"), ['mean_income', 'cum_share']))
+
+
+def test_zip3_state_and_national_sums(rollups):
+    zip3 = rollups.summary('zip3', '995')
+    assert zip3['returns'] == 400 and zip3['zip_count'] == 2
+    assert zip3['mean_income'] == pytest.approx(62500)
+    assert rollups.summary('zip3', '021')['returns'] == 400
+    assert rollups.summary('zip3', '999') is None
+
+    state = rollups.summary('state', 'AK')
+    assert state['returns'] == 500 and state['zip_count'] == 3
+    assert state['mean_income'] == pytest.approx(90000)
+    assert state['joint_share'] == pytest.approx(0.5)
+
+    national = rollups.summary('national', 'US')
+    assert national['returns'] == 900 and national['zip_count'] == 5
+    assert national['total_income'] == 105000
+    assert national['mean_income'] == pytest.approx(105000 * 1000 / 900)
+
+
+def test_weighted_percentiles(rollups):
+    zip3 = rollups.summary('zip3', '995')
+    # 75% of the returns are in the 50k ZIP
+    assert zip3['p10'] == zip3['p50'] == pytest.approx(50000)
+    assert zip3['p90'] == pytest.approx(100000)
+    state = rollups.summary('state', 'AK')
+    assert state['p50'] == pytest.approx(50000)
+    assert state['p75'] == pytest.approx(100000)
+    assert state['p90'] == pytest.approx(200000)
+
+
+def test_local_rank_and_context(rollups):
+    assert rollups.local_rank(75000, 'zip3', '995') == pytest.approx(75.0)
+    assert rollups.local_rank(40000, 'zip3', '995') == 0.0
+    assert rollups.local_rank(500000, 'state', 'AK') == pytest.approx(100.0)
+    assert rollups.local_rank(75000, 'zip3', '123') is None
+
+    # Unlisted ZIPs fall back to the state
+    context = rollups.local_context(150000, 99999, 'AK')
+    assert context['level'] == 'state' and context['percentile'] == pytest.approx(80.0)
+    assert rollups.local_context(150000, 2139, 'MA')['region'] == '021'
+
+
+def test_both_builds_share_one_pass(tmp_path, monkeypatch):
+    source = write_source(tmp_path / "irs.csv")
+    calls = []
+    expand = income_rollups._expand_levels
+    monkeypatch.setattr(income_rollups, '_expand_levels', lambda frame: calls.append(1) or expand(frame))
+    income_rollups._cached_income_tables.cache_clear()
+
+    distribution = build_income_distribution(source)
+    cube = build_income_rollups(source)
+    assert len(calls) == 1
+    assert set(cube['level']) == {'zip3', 'state', 'national'}
+    assert distribution['cum_share'].max() == pytest.approx(1.0)
@@ -0,0 +1,153 @@
+"""Streaming ingest of raw IRS SOI ZIP files"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.zip_income as zip_income
+from utils.dataset_cache import read_arrays, write_columnar
+from utils.income_rollups import IncomeRollups, build_income_tables, get_income_rollups
+from utils.irs_ingest import SOI_FIELDS, ingest, ingest_file
+from utils.zip_income import ZipIncomeIndex, build_zip_income_table, get_zip_income_index
+
+# STATE, zipcode, agi_stub, N1 (returns), A02650 (total income, thousands)
+STUBS = [
+    ('AK', 0, 1, 200, 5000), ('AK', 0, 2, 300, 40000),  # state totals
+    ('AK', 99501, 1, 40, 1000), ('AK', 99501, 2, 60, 9000),
+    ('AK', 99502, 1, 300, 15000),
+    ('AK', 99999, 1, 100, 20000),  # unlisted ZIPs
+    ('MA', 0, 1, 400, 60000),
+    ('MA', 2139, 1, 150, 30000), ('MA', 2139, 2, 50, 10000),
+]
+CSV_COLUMNS = {
+    'N1': 'Number of returns',
+    'MARS2': 'Number of joint returns',
+    'MARS4': 'Number of head of household returns',
+    'N2': 'Number of individuals',
+    'ELDERLY': 'Number of elderly returns',
+    'A00100': 'Adjusted gross income (AGI)',
+    'N02650': 'Number of returns with total income',
+    'A02650': 'Total income amount',
+    'A10300': 'Total Income Tax',
+}
+
+
+def raw_frame(stubs=STUBS):
+    df = pd.DataFrame(stubs, columns=['STATE', 'zipcode', 'agi_stub', 'N1', 'A02650'])
+    df.insert(0, 'STATEFIPS', df['STATE'].map({'AK': 2, 'MA': 25}))
+    df['MARS2'] = df['N1'] // 2
+    df['MARS4'] = df['N1'] // 10
+    df['N2'] = df['N1'] * 2
+    df['ELDERLY'] = df['N1'] // 4
+    df['A00100'] = df['A02650'] + 100
+    df['N02650'] = df['N1']
+    df['A10300'] = df['A02650'] // 10
+    return df
+
+
+def write_raw(path, stubs=STUBS):
+    raw_frame(stubs).to_csv(path, index=False)
+    return str(path)
+
+
+def write_aggregated(path, stubs=STUBS):
+    """The same data in the layout of aggregated_irs_data.csv"""
+    sums = raw_frame(stubs).groupby(['STATE', 'zipcode'], sort=False)[list(CSV_COLUMNS)].sum().reset_index()
+    lines = ['The state associated with the return,The State Federal Information Processing System (FIPS) code,'
+             'zipcode,' + ','.join(f" {name} " if variable == 'A02650' else name
+                                   for variable, name in CSV_COLUMNS.items())
+             + ',Mean Income,agi_stub_count,note\n']
+    for row in sums.itertuples(index=False):
+        values = row._asdict()
+        fields = [f'" {values[variable]:,} "' if variable == 'A02650' else str(values[variable])
+                  for variable in CSV_COLUMNS]
+        mean_income = round(values['A02650'] * 1000 / values['N1'], 2)
+        lines.append(f"{values['STATE']},0,{values['zipcode']},{','.join(fields)},\" {mean_income:,.2f} \",2,note\n")
+    path.write_text(''.join(lines))
+    return str(path)
+
+
+def load_index(directory):
+    return ZipIncomeIndex(read_arrays(directory))
+
+
+@pytest.fixture
+def builds(tmp_path):
+    csv_build = str(tmp_path / "csv_build")
+    write_columnar(build_zip_income_table(write_aggregated(tmp_path / "aggregated.csv")), csv_build)
+    ingest_build = ingest([write_raw(tmp_path / "raw.csv")], str(tmp_path / "ingest_build"))
+    return load_index(csv_build), load_index(ingest_build)
+
+
+def test_stubs_are_summed_per_zip(tmp_path):
+    accumulator = ingest_file(write_raw(tmp_path / "raw.csv"), chunksize=2)
+    table = accumulator.to_table()
+    assert table.loc[99501, 'returns'] == 100
+    assert table.loc[99501, 'total_income'] == 10000
+    assert table.loc[99501, 'mean_income'] == pytest.approx(100000)
+    assert table.loc[2139, 'state'] == 'MA'
+    assert table['valid'].sum() == 3
+    assert set(SOI_FIELDS.values()) <= set(table.columns)
+
+
+def test_csv_and_ingest_builds_agree(builds):
+    csv_index, ingest_index = builds
+    for zip_code in (0, 99501, 99502, 99999, 2139, 12345):
+        from_csv, from_ingest = csv_index.lookup(zip_code), ingest_index.lookup(zip_code)
+        assert (from_csv is None) == (from_ingest is None), zip_code
+        if from_csv is not None:
+            assert from_csv.pop('mean_income') == pytest.approx(from_ingest.pop('mean_income'))
+            assert from_csv == from_ingest
+
+    # State totals and unlisted ZIPs are not lookups in either build
+    assert csv_index.lookup(0) is None and csv_index.lookup(99999) is None
+
+    zips = ['99501', '02139', '00000', '99999', 'abc']
+    from_csv, from_ingest = csv_index.lookup_many(zips), ingest_index.lookup_many(zips)
+    assert from_csv['valid'].tolist() == from_ingest['valid'].tolist() == [True, True, False, False, False]
+    np.testing.assert_allclose(from_csv['mean_income'], from_ingest['mean_income'])
+
+
+def test_newer_files_replace_older_zips(tmp_path):
+    older = write_raw(tmp_path / "older.csv")
+    newer = write_raw(tmp_path / "newer.csv", [('AK', 99501, 1, 10, 500)])
+    index = load_index(ingest([older, newer], str(tmp_path / "build")))
+    assert index.lookup(99501)['returns'] == 10
+    assert index.lookup(99502)['returns'] == 300
+
+
+def test_column_names_are_case_insensitive(tmp_path):
+    path = tmp_path / "lower.csv"
+    raw_frame().rename(columns=str.lower).to_csv(path, index=False)
+    assert ingest_file(str(path)).to_table().loc[99501, 'returns'] == 100
+
+
+def test_missing_columns_and_existing_output_are_rejected(tmp_path):
+    path = tmp_path / "partial.csv"
+    raw_frame().drop(columns='A02650').to_csv(path, index=False)
+    with pytest.raises(ValueError, match='A02650'):
+        ingest_file(str(path))
+
+    raw = write_raw(tmp_path / "raw.csv")
+    output = ingest([raw], str(tmp_path / "build"))
+    with pytest.raises(FileExistsError):
+        ingest([raw], output)
+
+
+def test_configured_ingest_build_serves_lookups_and_rollups(tmp_path, monkeypatch):
+    output = ingest([write_raw(tmp_path / "raw.csv")], str(tmp_path / "build"))
+    monkeypatch.setattr(zip_income, 'ZIP_INCOME_INDEX_DIR', output)
+
+    assert get_zip_income_index().lookup(2139)['returns'] == 200
+    rollups = get_income_rollups()
+    csv_cube, csv_distribution = build_income_tables(write_aggregated(tmp_path / "aggregated.csv"))
+    from_csv = IncomeRollups({name: csv_cube[name].to_numpy(dtype=str) if name in ('level', 'region')
+                              else csv_cube[name].to_numpy() for name in csv_cube.columns},
+                             {name: csv_distribution[name].to_numpy() for name in ('mean_income', 'cum_share')})
+
+    for region in ('995', '021'):
+        ingested, expected = rollups.summary('zip3', region), from_csv.summary('zip3', region)
+        assert ingested['returns'] == expected['returns']
+        assert ingested['mean_income'] == pytest.approx(expected['mean_income'])
+        assert ingested['p50'] == pytest.approx(expected['p50'])
+    # Unlisted ZIPs are not in the ingest build, so they are missing from its state rollup
+    assert rollups.summary('state', 'AK')['returns'] == from_csv.summary('state', 'AK')['returns'] - 100
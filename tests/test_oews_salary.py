@@ -0,0 +1,115 @@
+"""Offline OEWS salary provider"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.oews_salary import NATIONAL_AREA, OEWSSalaryService, normalize_area, occupation_key
+
+
+class RecordingApi:
+    """Stands in for BLSApi as the network fallback and records what is asked of it"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_salary_by_location(self, occupation_code, area_code):
+        self.calls.append(('salary', occupation_code, area_code))
+        return {'occupation_code': occupation_code, 'source': 'BLS'}
+
+    def get_occupation_data(self, occupation_code, start_year=None, end_year=None):
+        self.calls.append(('occupation', occupation_code))
+        return {'occupation_code': occupation_code, 'source': 'BLS'}
+
+    def get_employment_projection(self, occupation_code):
+        self.calls.append(('projection', occupation_code))
+        return {'growth_rate': 1.0}
+
+
+def oews_rows():
+    return pd.DataFrame({
+        'AREA': ['99', '6', '99', '99', '31080'],
+        'AREA_TITLE': ['U.S.', 'California', 'U.S.', 'U.S.', 'Los Angeles-Long Beach-Anaheim, CA'],
+        'OCC_CODE': ['15-1252', '15-1252', '29-1141', 'Nov-21', '29-1141'],
+        'OCC_TITLE': ['Software Developers', 'Software Developers', 'Registered Nurses',
+                      'Community Health Workers', 'Registered Nurses'],
+        'Alias 1': ['Programmer', 'Programmer', 'RN', '', 'RN'],
+        'Alias 2': [np.nan] * 5, 'Alias 3': [np.nan] * 5, 'Alias 4': [np.nan] * 5, 'Alias 5': [np.nan] * 5,
+        'A_MEAN': [132930.0, 173780.0, 86070.0, 50000.0, 133340.0],
+        'A_MEDIAN': [127260.0, 166060.0, 81220.0, np.nan, 132660.0],
+        'TOT_EMP': [1534790.0, 186650.0, 3175390.0, 61010.0, 325620.0],
+    })
+
+
+@pytest.fixture
+def service():
+    return OEWSSalaryService(oews_rows())
+
+
+def test_normalize_area():
+    for national in ('0000000', '99', 'US', '', ' 99 '):
+        assert normalize_area(national) == NATIONAL_AREA
+    # Metropolitan series codes zero-pad the OEWS area to seven digits
+    assert normalize_area('0031080') == '31080'
+    assert normalize_area('31080') == '31080'
+    assert normalize_area(6) == '6'
+
+
+def test_dates_made_from_soc_codes_fall_back_to_titles():
+    assert occupation_key('15-1252', 'Software Developers') == '15-1252'
+    assert occupation_key(' 29-1141 ', 'Registered Nurses') == '29-1141'
+    assert occupation_key('Nov-21', 'Community Health Workers') == 'Community Health Workers'
+    assert occupation_key('2021-11-01', ' Community Health Workers ') == 'Community Health Workers'
+
+
+def test_mangled_codes_are_looked_up_by_title(service):
+    record = service.lookup('Community Health Workers')
+    assert record['annual_mean_wage'] == 50000.0
+    assert record['annual_median_wage'] is None
+    assert service.lookup('Nov-21') is None
+
+
+def test_salary_by_location_hit(service):
+    national = service.get_salary_by_location('15-1252', '0000000')
+    assert national['annual_mean_wage'] == 132930.0
+    assert national['area_code'] == '0000000' and national['source'] == 'OEWS'
+    metro = service.get_salary_by_location('29-1141', '0031080')
+    assert metro['annual_median_wage'] == 132660.0
+    assert metro['area_title'] == 'Los Angeles-Long Beach-Anaheim, CA'
+    assert service.lookup('15-1252', '6')['area_title'] == 'California'
+
+
+def test_salary_by_location_miss(service):
+    assert service.get_salary_by_location('15-1252', '0000036') == {}
+    assert service.get_salary_by_location('99-9999', '0000000') == {}
+    assert service.get_occupation_data('99-9999') == {}
+    assert service.get_employment_projection('15-1252') == {}
+
+
+def test_search_occupations(service):
+    results = service.search_occupations('software dev')
+    assert results[0]['code'] == '15-1252'
+    assert results[0]['OCC_TITLE'] == results[0]['title'] == 'Software Developers'
+    # One result per occupation, with national figures
+    assert results[0]['A_MEAN'] == 132930.0
+    assert [result['code'] for result in results].count('15-1252') == 1
+
+    assert service.search_occupations('programer', limit=1)[0]['code'] == '15-1252'  # alias, with a typo
+    assert service.search_occupations('community health', limit=1)[0]['code'] == 'Community Health Workers'
+    assert service.search_occupations('') == []
+
+
+def test_with_fallback_delegates_only_on_a_miss(service):
+    api = RecordingApi()
+    online = service.with_fallback(api)
+    assert online.index is service.index and service.fallback is None
+
+    assert online.get_salary_by_location('15-1252', '0000000')['source'] == 'OEWS'
+    assert online.get_occupation_data('29-1141')['source'] == 'OEWS'
+    assert api.calls == []
+
+    assert online.get_salary_by_location('15-1252', '0000036')['source'] == 'BLS'
+    assert online.get_occupation_data('99-9999')['source'] == 'BLS'
+    assert online.get_employment_projection('15-1252') == {'growth_rate': 1.0}
+    # Title keys of mangled codes are not SOC codes, so they are never sent upstream
+    assert online.get_employment_projection('Community Health Workers') == {}
+    assert api.calls == [('salary', '15-1252', '0000036'), ('occupation', '99-9999'), ('projection', '15-1252')]
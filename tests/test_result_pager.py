@@ -0,0 +1,75 @@
+"""Windowed result pager"""
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from components.result_pager import clamp_offset, sort_rows
+
+
+def pager_app():
+    import numpy as np
+    import streamlit as st
+    from components.result_pager import render_paginated_results
+
+    total = st.session_state.get('total', 45)
+    window = render_paginated_results('items', np.arange(total), lambda rows: None, page_size=20)
+    st.session_state['window'] = None if window is None else window.tolist()
+
+
+def buttons(at):
+    return {button.label: button for button in at.button}
+
+
+def test_clamp_offset():
+    assert clamp_offset(-20, 20, 45) == 0
+    assert clamp_offset(20, 20, 45) == 20
+    assert clamp_offset(60, 20, 45) == 40
+    assert clamp_offset(60, 20, 40) == 20
+    assert clamp_offset(5, 20, 0) == 0
+
+
+def test_sort_rows_puts_missing_values_last():
+    values = pd.Series([3.0, np.nan, 1.0, 2.0])
+    rows = np.arange(4)
+    assert sort_rows(rows, values).tolist() == [2, 3, 0, 1]
+    assert sort_rows(rows, values, ascending=False).tolist() == [0, 3, 2, 1]
+    names = pd.Series(['beta', None, 'Alpha', 'gamma'])
+    assert sort_rows(rows, names).tolist() == [2, 0, 3, 1]
+
+
+def test_buttons_reflect_the_page_being_shown():
+    at = AppTest.from_function(pager_app).run()
+    assert at.session_state['window'] == list(range(20))
+    assert buttons(at)["◀ Prev"].disabled and not buttons(at)["Next ▶"].disabled
+
+    buttons(at)["Next ▶"].click()
+    at.run()
+    assert at.session_state['window'] == list(range(20, 40))
+    assert not buttons(at)["◀ Prev"].disabled
+
+    buttons(at)["Next ▶"].click()
+    at.run()
+    # The last page disables Next in the same rerun as the click that reached it
+    assert at.session_state['window'] == list(range(40, 45))
+    assert at.caption[0].value == "Showing 41–45 of 45 results"
+    assert buttons(at)["Next ▶"].disabled
+
+    buttons(at)["◀ Prev"].click()
+    at.run()
+    buttons(at)["◀ Prev"].click()
+    at.run()
+    assert at.session_state['window'] == list(range(20))
+    assert buttons(at)["◀ Prev"].disabled
+
+
+def test_cursor_resets_when_the_results_change():
+    at = AppTest.from_function(pager_app).run()
+    buttons(at)["Next ▶"].click()
+    at.run()
+    at.session_state['total'] = 30
+    at.run()
+    assert at.session_state['window'] == list(range(20))
+
+    at.session_state['total'] = 0
+    at.run()
+    assert at.session_state['window'] is None
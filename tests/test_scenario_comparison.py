@@ -0,0 +1,68 @@
+"""Vectorized comparison of saved scenarios"""
+import numpy as np
+
+from services.scenario_comparison import ScenarioComparison, rank_values
+from services.scenario_store import YEARLY_SERIES, ScenarioStore
+
+
+def scenario(net_worth, expenses=None):
+    matrix = np.zeros((len(YEARLY_SERIES), len(net_worth)))
+    matrix[YEARLY_SERIES.index('net_worth')] = net_worth
+    if expenses is not None:
+        matrix[YEARLY_SERIES.index('total_expenses')] = expenses
+    return matrix
+
+
+def test_crossovers_and_pairwise_diffs():
+    comparison = ScenarioComparison(['steady', 'late bloomer', 'short'], [
+        scenario([10, 20, 30, 40], expenses=[5, 5, 5, 5]),
+        scenario([0, 15, 35, 60], expenses=[9, 4, 4, 4]),
+        scenario([20, 25], expenses=[1, 1]),
+    ])
+    assert comparison.values.shape == (3, 4, len(YEARLY_SERIES))
+    assert np.isnan(comparison.metric('net_worth')[2, 2:]).all()
+
+    crossovers = comparison.crossovers('net_worth')
+    assert crossovers[1, 0] == 2  # the late bloomer overtakes in year 2
+    assert crossovers[0, 1] == -1
+    assert crossovers[0, 2] == -1 and crossovers[2, 0] == -1
+    # Lower expenses count as ahead
+    assert comparison.crossovers('total_expenses')[1, 0] == 1
+
+    assert comparison.final_values('net_worth').tolist() == [40, 60, 25]
+    assert comparison.pairwise_diffs('net_worth')[1, 0] == 20
+    assert comparison.pairwise_diffs('net_worth', year=0)[0, 1] == 10
+
+    table = comparison.summary_table('net_worth', baseline=0)
+    assert table['Rank'].tolist() == [2, 1, 3]
+    assert table['Overtakes Baseline'].tolist() == [-1, 2, -1]
+
+
+def test_ranks_share_ties_and_put_missing_last():
+    assert rank_values(np.array([3.0, 1.0, 3.0, np.nan])).tolist() == [2, 1, 2, 4]
+    comparison = ScenarioComparison(['a', 'b'], [scenario([1, 2]), scenario([2])])
+    assert comparison.ranks[:, :, 0].tolist() == [[2, 1], [1, 2]]
+
+
+def test_sorted_ranks_match_pairwise_counts():
+    rng = np.random.default_rng(7)
+    keys = rng.integers(0, 5, size=(40, 6, 3)).astype(float)
+    keys[rng.random(keys.shape) < 0.1] = np.nan
+    # 1 + the number of strictly better keys, with NaN worse than everything
+    filled = np.where(np.isnan(keys), np.inf, keys)
+    expected = (filled[:, None] < filled[None, :]).sum(axis=0) + 1
+    np.testing.assert_array_equal(rank_values(keys), expected)
+    assert rank_values(np.empty((0, 2))).shape == (0, 2)
+
+
+def test_from_store_keeps_the_requested_order(tmp_path):
+    store = ScenarioStore(str(tmp_path / 'scenarios.sqlite'))
+    ids = [
+        store.save('me', {'name': name, 'date': '2026-01-01', 'final_net_worth': values[-1],
+                          'yearly_data': {'net_worth': values}})
+        for name, values in [('a', [1, 2, 3]), ('b', [3, 2, 1])]
+    ]
+    comparison = ScenarioComparison.from_store(store, ids[::-1])
+    assert comparison.names == ['b', 'a']
+    assert comparison.metric('net_worth').tolist() == [[3, 2, 1], [1, 2, 3]]
+    assert comparison.crossovers('net_worth')[1, 0] == 2
@@ -0,0 +1,62 @@
+"""SQLite scenario store with compressed yearly series"""
+import numpy as np
+
+from services.scenario_store import YEARLY_SERIES, ScenarioStore, decode_series, encode_series
+
+
+def projection(name, occupation='Nurse', location='Austin, TX', net_worth=None, years=30):
+    growth = np.cumsum(np.full(years, 12345.67))
+    net_worth_series = (growth if net_worth is None else growth / growth[-1] * net_worth).tolist()
+    return {
+        'name': name,
+        'date': f'2026-01-{len(name):02d} 10:00',
+        'location': location,
+        'occupation': occupation,
+        'investment_rate': 7.0,
+        'final_net_worth': int(round(net_worth_series[-1])),
+        'milestones': [{'name': 'Buy a Home', 'year': 5, 'type': 'HomePurchase', 'home_price': 300000,
+                        'down_payment': 20, 'monthly_utilities': 200, 'monthly_hoa': 0, 'annual_renovation': 1000}],
+        'yearly_data': {
+            'net_worth': net_worth_series,
+            'cash_flow': [1000.4] * years,
+            'total_income': list(range(50000, 50000 + years)),
+            'total_expenses': [-2.6] * years,
+            'asset_values': net_worth_series,
+            'liability_values': [0] * years,
+        },
+    }
+
+
+def test_series_round_trip_to_whole_dollars():
+    data = projection('a')['yearly_data']
+    blob = encode_series(data)
+    matrix = decode_series(blob, 30)
+    assert matrix.shape == (len(YEARLY_SERIES), 30)
+    for row, name in enumerate(YEARLY_SERIES):
+        assert matrix[row].tolist() == np.rint(data[name]).astype(int).tolist()
+    assert len(blob) < matrix.nbytes / 4
+
+
+def test_listing_does_not_need_the_series(tmp_path):
+    store = ScenarioStore(str(tmp_path / 'scenarios.sqlite'))
+    first = store.save('alice', projection('Base', net_worth=500000))
+    second = store.save('alice', projection('Grad school', occupation='Doctor', net_worth=900000))
+    store.save('bob', projection('Other'))
+
+    assert store.count('alice') == 2
+    assert store.ids('alice', order='net_worth_desc').tolist() == [second, first]
+    assert store.ids('alice', occupation='Nurse').tolist() == [first]
+    assert store.distinct('alice', 'occupation') == ['Doctor', 'Nurse']
+
+    summary, = store.summaries([first])
+    assert summary['name'] == 'Base' and summary['final_net_worth'] == 500000
+    assert summary['milestones'][0]['type'] == 'HomePurchase'
+    assert 'yearly_data' not in summary
+
+    assert store.load(first)['yearly_data']['total_income'][:2] == [50000, 50001]
+    store.update_assessment(first, {'hash': 'h', 'text': 'Nice plan'})
+    assert store.summaries([first])[0]['assessment']['text'] == 'Nice plan'
+
+    store.delete(first)
+    assert store.series(first) is None
+    assert store.ids('alice').tolist() == [second]
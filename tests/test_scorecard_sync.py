@@ -0,0 +1,157 @@
+"""College Scorecard bulk sync tests against a local stub of the schools endpoint"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from services.scorecard_sync import ScorecardStore, ScorecardSync, SYNC_FIELDS, TokenBucket
+
+TOTAL_SCHOOLS = 250
+
+
+def school(school_id, version=0):
+    return {
+        'id': school_id,
+        'school.name': f"Test University {school_id}",
+        'school.city': 'Springfield',
+        'school.state': 'CA' if school_id % 2 else 'NY',
+        'school.school_url': f"test{school_id}.edu",
+        'school.degrees_awarded.predominant': 3 if school_id % 5 == 0 else 2,
+        'latest.cost.tuition.in_state': 10000 + school_id + version,
+        'latest.cost.tuition.out_of_state': 30000 + school_id,
+        'latest.admissions.admission_rate.overall': 0.5,
+        'latest.programs.cip_4_digit': [{'title': 'Nursing.'}, {'title': 'Economics.'}],
+    }
+
+
+class StubScorecardHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append(params)
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        per_page = int(params.get('per_page', 20))
+        if 'id' in params:
+            results = [school(int(school_id), self.server.version) for school_id in params['id'].split(',')]
+        else:
+            page = int(params.get('page', 0))
+            ids = range(page * per_page, min((page + 1) * per_page, TOTAL_SCHOOLS))
+            results = [school(school_id, self.server.version) for school_id in ids]
+        payload = json.dumps({
+            'metadata': {'total': TOTAL_SCHOOLS, 'page': int(params.get('page', 0)), 'per_page': per_page},
+            'results': results,
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubScorecardHandler)
+    server.requests = []
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    server.delay = 0
+    server.version = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sync(stub_server, tmp_path):
+    store = ScorecardStore(str(tmp_path / "scorecard.sqlite"))
+    return ScorecardSync(store, api_key="test-key", base_url=f"http://127.0.0.1:{stub_server.server_port}",
+                         rate=1000, burst=10)
+
+
+def test_sync_walks_every_page_concurrently(sync, stub_server):
+    stub_server.delay = 0.1
+    summary = sync.sync_all()
+
+    assert summary == {'pages': 3, 'records': TOTAL_SCHOOLS, 'changed': TOTAL_SCHOOLS}
+    assert sorted(int(request['page']) for request in stub_server.requests) == [0, 1, 2]
+    assert stub_server.max_in_flight == 2  # pages after the first are fetched together
+    assert all(request['fields'] == ','.join(SYNC_FIELDS) for request in stub_server.requests)
+    assert sync.store.count() == TOTAL_SCHOOLS
+
+
+def test_resync_only_rewrites_changed_records(sync, stub_server):
+    sync.sync_all()
+    assert sync.sync_all()['changed'] == 0
+
+    stub_server.version = 1
+    assert sync.refresh_records([3, 4]) == 2
+    assert stub_server.requests[-1]['id'] == '3,4'
+    assert sync.store.get(3)['in_state_tuition'] == 10004
+
+
+def test_stale_records_are_refreshed(sync, stub_server):
+    sync.sync_all()
+    sync.store._connection().execute("UPDATE schools SET synced_at = 0 WHERE id < 120")
+    assert len(sync.store.stale_ids(3600)) == 120
+
+    sync.refresh_stale(3600)
+    assert len(stub_server.requests) == 3 + 2  # 120 ids in pages of 100
+    assert sync.store.stale_ids(3600) == []
+
+
+def test_store_serves_searches_locally(sync):
+    sync.sync_all()
+
+    results = sync.store.search("test university 12", limit=3)
+    assert results[0]['name'] == "Test University 12"
+    # Same program records as CollegeScorecardAPI.search_colleges returns from the API
+    assert results[0]['programs'] == [{'title': 'Nursing.'}, {'title': 'Economics.'}]
+    community = sync.store.search("university", school_type="3", limit=100)
+    assert community and all(int(result['name'].split()[-1]) % 5 == 0 for result in community)
+
+
+def test_token_bucket_limits_request_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+    # Two tokens up front, then four more at 20 per second
+    assert time.perf_counter() - start >= 0.18
+
+
+def test_programs_keep_the_api_shape(tmp_path):
+    store = ScorecardStore(str(tmp_path / "store.sqlite"))
+    programs = [{'code': '5138', 'title': 'Nursing.', 'credential': {'level': 3, 'title': "Bachelor's Degree"}}]
+    store.upsert([dict(school(1), **{'latest.programs.cip_4_digit': programs}),
+                  dict(school(2), **{'latest.programs.cip_4_digit': None})])
+    assert store.get(1)['programs'] == programs
+    assert store.get(2)['programs'] == []
+
+    # Rows written by older syncs held program titles only
+    store._connection().execute("UPDATE schools SET programs = ? WHERE id = 2", (json.dumps(['Economics.']),))
+    assert store.get(2)['programs'] == [{'title': 'Economics.'}]
+
+
+def test_fields_of_study_from_the_store(tmp_path, monkeypatch):
+    from services.college_scorecard import CollegeScorecardAPI
+
+    monkeypatch.setenv("ED_GOV_API_KEY", "test-key")
+    store = ScorecardStore(str(tmp_path / "store.sqlite"))
+    store.upsert([school(1)])
+    api = CollegeScorecardAPI(cache=object(), store=store)
+    assert api.get_fields_of_study(1) == ['Nursing.', 'Economics.']
@@ -0,0 +1,72 @@
+"""Trigram search index behind the pickers"""
+from utils.search_index import SearchIndex, build_college_name_index, college_aliases, normalize_key, trigrams
+
+LOCATIONS = ['Los Angeles', 'New York', 'Chicago', 'Albuquerque', 'Miami', 'San Francisco']
+OCCUPATIONS = ['Doctor', 'Engineer', 'Accountant', 'Teacher', 'Nurse', 'Lawyer', 'Software Engineer']
+
+
+def test_keys_and_grams():
+    assert normalize_key('  San-Francisco, CA ') == 'san francisco ca'
+    assert {'  n', ' ny', 'ny '} == trigrams('ny')
+
+
+def test_exact_and_prefix_matches_rank_first():
+    index = SearchIndex(OCCUPATIONS)
+    assert index.search('engineer', limit=2) == ['Engineer', 'Software Engineer']
+    locations = SearchIndex(LOCATIONS)
+    assert locations.search('new', limit=3) == ['New York']
+    assert locations.search('san fran', limit=1) == ['San Francisco']
+
+
+def test_typos_are_tolerated():
+    assert SearchIndex(LOCATIONS).search('chicgo', limit=1) == ['Chicago']
+    assert SearchIndex(OCCUPATIONS).search('enginer', limit=1) == ['Engineer']
+    assert SearchIndex(OCCUPATIONS).search('nurs', limit=1) == ['Nurse']
+
+
+def test_limit_and_ids():
+    index = SearchIndex(OCCUPATIONS)
+    assert len(index.search('engineer', limit=1)) == 1
+    assert index.search_ids('teacher', limit=1) == [OCCUPATIONS.index('Teacher')]
+
+
+def test_empty_queries_and_indexes():
+    index = SearchIndex(LOCATIONS)
+    assert index.search('') == []
+    assert index.search('   ') == []
+    assert index.search('--') == []
+    assert index.search('xyz') == []
+    assert SearchIndex([]).search('chicago') == []
+
+
+COLLEGES = [
+    'Massachusetts Institute of Technology',
+    'University of California-Los Angeles',
+    'California Institute of Technology',
+    'University of Pennsylvania',
+    'Georgia Institute of Technology-Main Campus',
+    'Michigan State University',
+    'University of Michigan-Ann Arbor',
+    'Harvard University',
+]
+
+
+def test_college_aliases():
+    assert college_aliases('University of California-Los Angeles') == ['ucla']
+    assert college_aliases('Massachusetts Institute of Technology') == ['mit']
+    assert college_aliases('California Institute of Technology') == ['caltech', 'cit']
+    assert college_aliases('Harvard University') == ['hu']
+    assert college_aliases('Juilliard') == []
+
+
+def test_acronyms_and_nicknames_find_colleges():
+    index = build_college_name_index(COLLEGES)
+    assert index.search('MIT', limit=1) == ['Massachusetts Institute of Technology']
+    assert index.search('UCLA', limit=1) == ['University of California-Los Angeles']
+    assert index.search('caltech', limit=1) == ['California Institute of Technology']
+    assert index.search('upenn', limit=1) == ['University of Pennsylvania']
+    assert index.search('georgia tech', limit=1) == ['Georgia Institute of Technology-Main Campus']
+    assert index.search('umich', limit=1) == ['University of Michigan-Ann Arbor']
+    assert index.search('msu', limit=1) == ['Michigan State University']
+    # Official names still match, typos included
+    assert index.search('harvrd', limit=1) == ['Harvard University']
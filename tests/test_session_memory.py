@@ -0,0 +1,76 @@
+"""Shared datasets, key-only favorites and the session memory report"""
+from streamlit.testing.v1 import AppTest
+
+from utils.dataset_registry import get_shared_dataset
+from utils.session_memory import deep_size, session_memory_report
+
+
+def favorites_script():
+    import streamlit as st
+    from models.user_favorites import UserFavorites
+    from utils.dataset_registry import get_shared_dataset
+
+    UserFavorites.init_session_state()
+    careers = get_shared_dataset('careers')
+    UserFavorites.add_favorite_career(careers.iloc[0])
+    UserFavorites.add_favorite_career({'code': careers['OCC_CODE'].iloc[0], 'title': 'Duplicate'})
+    UserFavorites.add_favorite_career({'code': '15-1252', 'title': 'Software Developers'})
+    favorites = UserFavorites.get_favorite_careers()
+    st.session_state.favorite_titles = [career['title'] for career in favorites]
+    st.session_state.favorite_codes = [career.get('code') for career in favorites]
+
+
+def test_favorites_keep_only_keys():
+    at = AppTest.from_function(favorites_script).run()
+    assert not at.exception
+    careers = get_shared_dataset('careers')
+    assert at.session_state['favorite_careers'] == [careers['OCC_KEY'].iloc[0], '15-1252']
+    assert at.session_state['favorite_titles'] == [careers['OCC_TITLE'].iloc[0], 'Software Developers']
+    assert at.session_state['favorite_codes'][1] == '15-1252'
+
+
+def title_keyed_favorite_script():
+    import streamlit as st
+    from models.user_favorites import UserFavorites
+    from pages.career_discovery import show_career_details
+    from utils.cache_utils import get_salary_service
+
+    UserFavorites.init_session_state()
+    # Spreadsheets turned this SOC code into a date, so the career is keyed by its title
+    UserFavorites.add_favorite_career({'OCC_KEY': 'Marketing Managers', 'OCC_CODE': 'Nov-21'})
+    for career in UserFavorites.get_favorite_careers():
+        show_career_details(career, get_salary_service(), prefix="fav_")
+
+
+def test_title_keyed_favorites_render():
+    at = AppTest.from_function(title_keyed_favorite_script).run()
+    assert not at.exception
+    assert at.markdown[0].value == "### Marketing Managers 💼"
+    assert at.metric[0].value != "Data not available"
+    assert at.button(key="fav_remove_Marketing Managers")
+
+
+def test_derived_frames_do_not_write_through():
+    careers = get_shared_dataset('careers')
+    title = careers['OCC_TITLE'].iloc[0]
+    derived = careers[['OCC_TITLE']]
+    derived.iloc[0, 0] = 'Changed'
+    column = careers['OCC_TITLE']
+    column.iloc[0] = 'Changed'
+    assert careers['OCC_TITLE'].iloc[0] == title
+
+
+def test_shared_datasets_are_not_charged_to_sessions():
+    careers = get_shared_dataset('careers')
+    assert get_shared_dataset('careers') is careers
+
+    report = session_memory_report({'careers': careers, 'keys': ['15-1252'], 'copy': careers.head(50).copy()})
+    sizes = dict(zip(report['Key'], report['Bytes']))
+    assert sizes['careers'] == 0
+    assert 0 < sizes['keys'] < sizes['copy']
+
+    # An object reachable from two entries is charged to the first only
+    trace = list(range(1000))
+    report = session_memory_report({'first': {'trace': trace}, 'second': {'trace': trace}})
+    sizes = dict(zip(report['Key'], report['Bytes']))
+    assert sizes['first'] > deep_size(trace) > sizes['second']
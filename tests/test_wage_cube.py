@@ -0,0 +1,45 @@
+"""Occupation x area x statistic wage cube"""
+import numpy as np
+import pandas as pd
+
+from utils.wage_cube import build_wage_cube
+
+
+def oews_rows():
+    return pd.DataFrame({
+        'AREA': ['99', '99', '6', '99', '6', '6'],
+        'AREA_TITLE': ['U.S.', 'U.S.', 'California', 'U.S.', 'California', 'California'],
+        'OCC_CODE': ['15-1252', '29-1141', '15-1252', 'Nov-21', '29-1141', '15-1252'],
+        'OCC_TITLE': ['Software Developers', 'Registered Nurses', 'Software Developers',
+                      'Community Health Workers', 'Registered Nurses', 'Software Developers'],
+        'A_MEAN': [130000, 90000, 170000, 50000, np.nan, 1],
+        'A_MEDIAN': [125000, 85000, 160000, 48000, 120000, 1],
+    })
+
+
+def test_rows_are_scattered_into_cells():
+    cube = build_wage_cube(oews_rows())
+    assert cube.shape == (3, 2, 2)
+    assert cube.stats == ['mean', 'median']
+    assert cube.occupations == ['15-1252', '29-1141', 'Community Health Workers']
+    # First row wins for a repeated (occupation, area) pair
+    assert cube.value('15-1252', '06', 'median') == 160000
+    assert cube.value('29-1141', '6', 'mean') is None
+    assert cube.value('Community Health Workers', '99', 'mean') == 50000
+    assert not cube.mask[2, 1].any()
+    assert cube.occupation('15-1252')[:, 0].tolist() == [130000, 170000]
+
+
+def test_slices_rank_and_frames():
+    cube = build_wage_cube(oews_rows())
+    assert [code for code, _, _ in cube.rank('median', '99')] == ['15-1252', '29-1141', 'Community Health Workers']
+    assert cube.rank('mean', '6', limit=1, ascending=True)[0][2] == 170000
+
+    frame = cube.heatmap_frame('median', codes=['29-1141', '15-1252'])
+    assert list(frame.index) == ['Registered Nurses', 'Software Developers']
+    assert list(frame.columns) == ['U.S.', 'California']
+    assert frame.to_numpy().tolist() == [[85000, 120000], [125000, 160000]]
+
+    stats = cube.stats_frame('99', ['29-1141'], stats=['median'])
+    assert stats.loc['Registered Nurses', 'Median'] == 85000
+    assert cube.compare(['15-1252', '29-1141'], '6')[:, 1].tolist() == [160000, 120000]
@@ -0,0 +1,66 @@
+"""Dense ZIP income index"""
+import numpy as np
+import pytest
+
+from utils.dataset_cache import read_arrays, write_columnar
+from utils.zip_income import ZIP_SLOTS, ZipIncomeIndex, build_zip_income_table, dense_zip_table
+
+HEADER = ("The state associated with the return,The State Federal Information Processing System (FIPS) code,"
+          "zipcode,Number of returns,Number of joint returns,Number of head of household returns,"
+          "Number of individuals,Number of elderly returns,Adjusted gross income (AGI),"
+          "Number of returns with total income, Total income amount ,Total Income Tax,Mean Income,"
+          "agi_stub_count,note\n")
+ROWS = [
+    'AK,2,0,344240,120580,35530,630120,82430,30327338,344230," 30,606,142 ",3815456," 88,909.31 ",6,total\n',
+    'AK,2,99501,7560,1440,970,11710,1720,712828,7560," 720,216 ",111107," 95,266.67 ",6,zip\n',
+    'MA,25,0,3000000,1000000,300000,6000000,900000,400000000,3000000," 410,000,000 ",60000000," 136,666.67 ",6,total\n',
+    'MA,25,2139,12000,3000,800,20000,1500,2400000,12000," 2,450,000 ",500000," 204,166.67 ",6,zip\n',
+]
+
+
+def write_source(path, rows=ROWS):
+    path.write_text(HEADER + "".join(rows))
+    return str(path)
+
+
+@pytest.fixture
+def index(tmp_path):
+    directory = str(tmp_path / "build")
+    write_columnar(build_zip_income_table(write_source(tmp_path / "irs.csv")), directory)
+    return ZipIncomeIndex(read_arrays(directory))
+
+
+def test_dense_table_has_a_slot_per_zip():
+    table = dense_zip_table(np.array([5, 5, 7, -1, ZIP_SLOTS]), {'mean_income': np.array([1.0, 2.0, 3.0, 4.0, 5.0])},
+                            np.array(['AA', 'BB', 'CC', 'DD', 'EE']))
+    assert len(table) == ZIP_SLOTS
+    assert table['valid'].sum() == 2
+    # The first row wins for a repeated ZIP; out-of-range codes are dropped
+    assert table.loc[5, 'mean_income'] == 1.0 and table.loc[5, 'state'] == 'AA'
+    assert np.isnan(table.loc[6, 'mean_income'])
+
+
+def test_lookup_valid_and_unknown_zips(index):
+    record = index.lookup(99501)
+    assert record['zipcode'] == 99501
+    assert record['state'] == 'AK'
+    assert record['mean_income'] == pytest.approx(95266.67)
+    assert record['total_income'] == 720216
+    assert index.lookup(12345) is None
+    assert index.lookup(-1) is None
+    assert index.lookup(ZIP_SLOTS) is None
+
+
+def test_slots_from_strings_with_leading_zeros_and_junk():
+    slots = ZipIncomeIndex.to_slots(['02139', 2139, '99501', 'abc', '', None, '123.5', -5, '100000'])
+    assert slots.tolist() == [2139, 2139, 99501, -1, -1, -1, -1, -1, -1]
+
+
+def test_lookup_many(index):
+    result = index.lookup_many(['02139', 'abc', '99501', 12345])
+    assert result['valid'].tolist() == [True, False, True, False]
+    assert result['state'].tolist() == ['MA', '', 'AK', '']
+    assert result['returns'].tolist() == [12000, 0, 7560, 0]
+    assert result['mean_income'][0] == pytest.approx(204166.67)
+    assert np.isnan(result['mean_income'][[1, 3]]).all()
+    assert index.lookup_many([])['valid'].tolist() == []
@@ -1,7 +1,13 @@
 """Caching utilities for expensive operations"""
+import os
 import streamlit as st
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 import pandas as pd
+from utils.search_index import SearchIndex, build_college_name_index
+from utils.college_filters import CollegeFilterIndex
+from utils.datasets import OEWS_DATA_PATH, load_oews_table
+from services.oews_salary import OEWSSalaryService
+from utils.wage_cube import CUBE_COLUMNS, WageCube, build_wage_cube
 
 @st.cache_data
 def process_location_data(_data_processor, coli_df: pd.DataFrame, occupation_df: pd.DataFrame, 
@@ -38,6 +44,92 @@ def calculate_yearly_projection(_calculator, years: int) -> Dict:
     """
     return _calculator.calculate_yearly_projection(years)
 
+@st.cache_resource(max_entries=16)
+def get_search_index(dataset_key: str, _labels: Sequence[str]) -> SearchIndex:
+    """
+    Build (once per dataset version) the shared search index for a picker.
+
+    Args:
+        dataset_key: Version key of the labels' source (see ``dataset_version``)
+            plus the picker name, so a changed dataset gets a fresh index
+            without hashing every label on each rerun
+        _labels: All selectable labels (underscore prefix to prevent hashing)
+
+    Returns:
+        SearchIndex shared by every session in this process
+    """
+    return SearchIndex(_labels)
+
+def labels_key(labels: Sequence[str]) -> str:
+    """Fallback ``get_search_index`` key for labels without a known source file"""
+    return '\x1f'.join(labels)
+
+def dataset_version(file_path: str) -> str:
+    """Cheap version key for a data file based on its size and modification time"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return f"{file_path}:missing"
+    return f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+@st.cache_resource(max_entries=4)
+def get_college_name_index(dataset_key: str, _names: Sequence[str]) -> SearchIndex:
+    """
+    Build the college name index once per dataset version.
+
+    Args:
+        dataset_key: Version key of the college dataset (see ``dataset_version``)
+        _names: College names in row order (underscore prefix to prevent hashing)
+
+    Returns:
+        SearchIndex over names, acronyms and nicknames
+    """
+    return build_college_name_index(_names)
+
+@st.cache_resource(max_entries=4)
+def get_college_filter_index(dataset_key: str, _df: pd.DataFrame) -> CollegeFilterIndex:
+    """
+    Build the college filter bitmaps once per dataset version.
+
+    Args:
+        dataset_key: Version key of the college dataset (see ``dataset_version``)
+        _df: College table (underscore prefix to prevent hashing)
+
+    Returns:
+        CollegeFilterIndex shared by every session in this process
+    """
+    return CollegeFilterIndex(_df)
+
+@st.cache_resource(max_entries=2)
+def _build_oews_salary_service(dataset_key: str) -> OEWSSalaryService:
+    return OEWSSalaryService(load_oews_table())
+
+def get_salary_service(fallback=None) -> OEWSSalaryService:
+    """
+    Get the offline OEWS salary service, built once per dataset version.
+
+    Args:
+        fallback: Optional BLSApi used for data missing from the OEWS file
+
+    Returns:
+        OEWSSalaryService with the BLSApi interface
+    """
+    service = _build_oews_salary_service(dataset_version(OEWS_DATA_PATH))
+    return service.with_fallback(fallback) if fallback is not None else service
+
+@st.cache_resource(max_entries=2)
+def _build_wage_cube(dataset_key: str) -> WageCube:
+    return build_wage_cube(load_oews_table(CUBE_COLUMNS))
+
+def get_wage_cube() -> WageCube:
+    """
+    Get the occupation x area x statistic wage cube, built once per dataset version.
+
+    Returns:
+        WageCube shared by every session in this process
+    """
+    return _build_wage_cube(dataset_version(OEWS_DATA_PATH))
+
 @st.cache_data
 def get_best_matches(query: str, df: pd.DataFrame, n: int = 3) -> pd.DataFrame:
     """
@@ -51,5 +143,6 @@ def get_best_matches(query: str, df: pd.DataFrame, n: int = 3) -> pd.DataFrame:
     Returns:
         DataFrame containing best matches
     """
-    matches = get_close_matches(query.lower(), df.index.str.lower(), n=n, cutoff=0.1)
-    return df[df.index.str.lower().isin(matches)] 
\ No newline at end of file
+    labels = df.index.astype(str).tolist()
+    index = get_search_index(labels_key(labels), labels)
+    return df.iloc[index.search_ids(query, limit=n)]
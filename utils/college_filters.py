@@ -0,0 +1,169 @@
+"""Precomputed filter indexes for the college discovery page
+
+Every filter on the page is answered from bitmaps built once per dataset:
+per-state and per-ownership bitmaps, flag bitmaps for the ranking lists, and
+sorted value arrays for the range sliders (a slider range is two binary
+searches turned into a bitmap). A filter combination is then a handful of
+bitset intersections instead of chained DataFrame masks and copies.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Range bitmaps kept per column; slider drags revisit the same ranges often
+RANGE_CACHE_SIZE = 64
+
+
+def pack(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean mask into a bitmap (8 rows per byte)"""
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def unpack(bits: np.ndarray, size: int) -> np.ndarray:
+    """Expand a bitmap back into a boolean mask of ``size`` rows"""
+    return np.unpackbits(bits, count=size).astype(bool)
+
+
+class SortedRangeIndex:
+    """Sorted copy of one numeric column for range → bitmap lookups"""
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        self.size = len(values)
+        valid = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[valid], kind='stable')
+        self.row_ids = valid[order]
+        self.sorted_values = values[self.row_ids]
+        self.missing = pack(np.isnan(values))
+        self._cache: "OrderedDict[Tuple[float, float], np.ndarray]" = OrderedDict()
+        # The index is shared by all sessions, so cache updates are serialized
+        self._lock = threading.Lock()
+
+    def bitmap(self, low: float, high: float) -> np.ndarray:
+        """Bitmap of rows whose value lies in the closed range [low, high]"""
+        key = (float(low), float(high))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        start = np.searchsorted(self.sorted_values, low, side='left')
+        stop = np.searchsorted(self.sorted_values, high, side='right')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.row_ids[start:stop]] = True
+        bits = pack(mask)
+
+        with self._lock:
+            self._cache[key] = bits
+            if len(self._cache) > RANGE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return bits
+
+
+class CollegeFilterIndex:
+    """Bitmap indexes over the college table used by the discovery filters"""
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: College table as returned by ``load_college_data``
+        """
+        self.size = len(df)
+        self.all_rows = pack(np.ones(self.size, dtype=bool))
+
+        states = df['state'].astype(str).to_numpy()
+        self.state_bitmaps: Dict[str, np.ndarray] = {
+            state: pack(states == state) for state in np.unique(states)
+        }
+
+        ownership = df['ownership'].to_numpy(dtype=float)
+        self.ownership_bitmaps: Dict[int, np.ndarray] = {
+            code: pack(ownership == code) for code in (1, 2, 3)
+        }
+
+        self.top_150_rank = df['US News Top 150'].to_numpy(dtype=float)
+        self.liberal_arts_rank = df['best liberal arts colleges'].to_numpy(dtype=float)
+        self.flag_bitmaps: Dict[str, np.ndarray] = {
+            'top_150': pack(~np.isnan(self.top_150_rank)),
+            'liberal_arts': pack(~np.isnan(self.liberal_arts_rank)),
+        }
+
+        # Schools without a reported admission rate are treated as open admission (100%)
+        admission_pct = np.nan_to_num(df['admission_rate.overall'].to_numpy(dtype=float), nan=1.0) * 100
+        self.ranges: Dict[str, SortedRangeIndex] = {
+            'public_price': SortedRangeIndex(df['avg_net_price.public'].to_numpy(dtype=float)),
+            'private_price': SortedRangeIndex(df['avg_net_price.private'].to_numpy(dtype=float)),
+            'admission_pct': SortedRangeIndex(admission_pct),
+            'sat': SortedRangeIndex(df['sat_scores.average.overall'].to_numpy(dtype=float)),
+        }
+
+    def _union(self, bitmaps: Iterable[np.ndarray]) -> np.ndarray:
+        result = np.zeros_like(self.all_rows)
+        for bits in bitmaps:
+            result |= bits
+        return result
+
+    def _range_or_missing(self, column: str, value_range: Sequence[float]) -> np.ndarray:
+        index = self.ranges[column]
+        return index.missing | index.bitmap(value_range[0], value_range[1])
+
+    def filter(
+        self,
+        states: Optional[Sequence[str]] = None,
+        in_state_tuition_range: Sequence[float] = (0, float('inf')),
+        out_state_tuition_range: Sequence[float] = (0, float('inf')),
+        admission_rate_range: Sequence[float] = (0.0, 100.0),
+        sat_range: Sequence[float] = (0, float('inf')),
+        ownership_codes: Optional[Sequence[int]] = None,
+        top_150_only: bool = False,
+        liberal_arts_only: bool = False
+    ) -> np.ndarray:
+        """
+        Apply the discovery page filters.
+
+        Args:
+            states: States to keep (all states if empty)
+            in_state_tuition_range: Range for public schools' in-state net price
+            out_state_tuition_range: Range for private schools' net price
+            admission_rate_range: Admission rate range in percent
+            sat_range: Average SAT range (schools without SAT data always pass)
+            ownership_codes: Scorecard ownership codes to keep (all if empty)
+            top_150_only: Keep only US News Top 150 schools
+            liberal_arts_only: Keep only ranked liberal arts colleges
+
+        Returns:
+            Row positions of matching colleges, ordered by ranking when a
+            ranking filter is active
+        """
+        bits = self.all_rows.copy()
+
+        if top_150_only:
+            bits &= self.flag_bitmaps['top_150']
+        if liberal_arts_only:
+            bits &= self.flag_bitmaps['liberal_arts']
+        if states:
+            bits &= self._union(self.state_bitmaps.get(state, self._union([])) for state in states)
+
+        # Public schools are checked on in-state price, private schools on their net price
+        public = self.ownership_bitmaps[1] & self._range_or_missing('public_price', in_state_tuition_range)
+        private = ((self.ownership_bitmaps[2] | self.ownership_bitmaps[3])
+                   & self._range_or_missing('private_price', out_state_tuition_range))
+        bits &= public | private
+
+        bits &= self.ranges['admission_pct'].bitmap(*admission_rate_range)
+        bits &= self._range_or_missing('sat', sat_range)
+
+        if ownership_codes:
+            bits &= self._union(self.ownership_bitmaps[code] for code in ownership_codes
+                                if code in self.ownership_bitmaps)
+
+        rows = np.flatnonzero(unpack(bits, self.size))
+        if liberal_arts_only:
+            rows = rows[np.argsort(self.liberal_arts_rank[rows], kind='stable')]
+        elif top_150_only:
+            rows = rows[np.argsort(self.top_150_rank[rows], kind='stable')]
+        return rows
@@ -0,0 +1,211 @@
+"""Binary columnar cache for CSV datasets
+
+CSV sources are converted once into a directory of typed ``.npy`` column files
+plus a ``meta.json`` descriptor. Cache directories are keyed by the SHA-256 of
+the source file, so editing the CSV transparently produces a new build, and the
+columns are memory-mapped on load instead of being parsed again.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", os.path.join(".cache", "datasets"))
+MANIFEST_NAME = "manifest.json"
+META_NAME = "meta.json"
+# Bump when a builder's output changes so existing builds are not reused
+FORMAT_VERSION = 2
+
+
+def _atomic_write_json(path: str, payload: Dict) -> None:
+    """Write JSON via a temporary file so concurrent readers never see partial data"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(cache_dir: str) -> Dict:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def source_digest(source_path: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Get the SHA-256 of a source file.
+
+    The digest is remembered in a manifest keyed by size and modification time,
+    so the file is only re-hashed after it changes.
+
+    Args:
+        source_path: Path of the CSV source
+        cache_dir: Cache root holding the manifest
+
+    Returns:
+        Hex digest of the file contents
+    """
+    stat = os.stat(source_path)
+    manifest = _read_manifest(cache_dir)
+    entry = manifest.get(os.path.abspath(source_path))
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    sha = hashlib.sha256()
+    with open(source_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _read_manifest(cache_dir)
+    manifest[os.path.abspath(source_path)] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+    }
+    _atomic_write_json(os.path.join(cache_dir, MANIFEST_NAME), manifest)
+    return digest
+
+
+def _column_array(series: pd.Series) -> np.ndarray:
+    """Convert a column to a fixed-width array that np.load can memory-map"""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy()
+    # Strings are stored as fixed-width unicode; missing values become ''
+    return series.fillna("").astype(str).to_numpy(dtype=str)
+
+
+def write_columnar(df: pd.DataFrame, directory: str, meta: Optional[Dict] = None) -> None:
+    """
+    Write a DataFrame as one ``.npy`` file per column plus ``meta.json``.
+
+    The directory is assembled under a temporary name and renamed into place,
+    so a half-written build is never visible to readers.
+
+    Args:
+        df: Cleaned, typed DataFrame
+        directory: Target directory
+        meta: Extra metadata to record (e.g. the source digest)
+    """
+    parent = os.path.dirname(directory) or "."
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".build-")
+    try:
+        columns = []
+        for idx, column in enumerate(df.columns):
+            array = _column_array(df[column])
+            file_name = f"col_{idx:03d}.npy"
+            np.save(os.path.join(tmp_dir, file_name), array, allow_pickle=False)
+            columns.append({"name": column, "file": file_name, "dtype": array.dtype.str})
+
+        payload = dict(meta or {})
+        payload.update({"format": FORMAT_VERSION, "rows": len(df), "columns": columns})
+        with open(os.path.join(tmp_dir, META_NAME), "w") as f:
+            json.dump(payload, f, indent=2)
+
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another process finished the same build first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def read_arrays(directory: str, columns: Optional[List[str]] = None,
+                mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Load the raw column arrays of a columnar build.
+
+    Args:
+        directory: Build directory written by ``write_columnar``
+        columns: Subset of columns to load (defaults to all, in stored order)
+        mmap: Memory-map the arrays instead of reading them into memory
+
+    Returns:
+        Mapping of column name to its stored array
+    """
+    with open(os.path.join(directory, META_NAME)) as f:
+        meta = json.load(f)
+
+    stored = {column["name"]: column for column in meta["columns"]}
+    wanted = columns or [column["name"] for column in meta["columns"]]
+    missing = [name for name in wanted if name not in stored]
+    if missing:
+        raise KeyError(f"Columns not found in dataset cache: {missing}")
+
+    return {
+        name: np.load(os.path.join(directory, stored[name]["file"]),
+                      mmap_mode="r" if mmap else None, allow_pickle=False)
+        for name in wanted
+    }
+
+
+def read_columnar(directory: str, columns: Optional[List[str]] = None,
+                  mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a columnar build back into a DataFrame.
+
+    Args:
+        directory: Build directory written by ``write_columnar``
+        columns: Subset of columns to load (defaults to all, in stored order)
+        mmap: Memory-map numeric columns instead of reading them into memory
+
+    Returns:
+        DataFrame backed by the stored arrays
+    """
+    data = {
+        name: array.astype(object) if array.dtype.kind == "U" else array
+        for name, array in read_arrays(directory, columns, mmap).items()
+    }
+    return pd.DataFrame(data, copy=False)
+
+
+def build_path(name: str, source_path: str, cache_dir: str = CACHE_DIR) -> str:
+    """Cache directory for a dataset build of the current source contents"""
+    digest = source_digest(source_path, cache_dir)
+    return os.path.join(cache_dir, f"{name}-{digest[:16]}-v{FORMAT_VERSION}")
+
+
+def ensure_build(name: str, source_path: str,
+                 builder: Callable[[str], pd.DataFrame],
+                 cache_dir: str = CACHE_DIR) -> str:
+    """
+    Make sure a columnar build exists for the current source contents.
+
+    Args:
+        name: Dataset name used in the cache directory
+        source_path: CSV source file
+        builder: Function that parses and cleans the source into a typed DataFrame
+        cache_dir: Cache root
+
+    Returns:
+        Path of the build directory
+    """
+    directory = build_path(name, source_path, cache_dir)
+    if not os.path.exists(os.path.join(directory, META_NAME)):
+        df = builder(source_path)
+        write_columnar(df, directory, meta={
+            "dataset": name,
+            "source": os.path.abspath(source_path),
+            "sha256": source_digest(source_path, cache_dir),
+        })
+    return directory
+
+
+def load_dataset(name: str, source_path: str,
+                 builder: Callable[[str], pd.DataFrame],
+                 columns: Optional[List[str]] = None,
+                 cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """Load a dataset from its columnar build, building it first if needed"""
+    return read_columnar(ensure_build(name, source_path, builder, cache_dir), columns)
@@ -0,0 +1,90 @@
+"""Process-wide registry of shared read-only datasets
+
+Every Streamlit session used to parse or map its own copy of the COLI,
+occupation, OEWS and college tables on each rerun. The registry loads each
+dataset once per process (and per source file version) with
+``st.cache_resource`` and hands every session the same DataFrame. Sessions
+keep only row keys, such as favorite college ids, and look rows up through
+``get_row_index``.
+
+The shared frames must be treated as read-only. With pandas copy-on-write,
+frames and arrays derived from them are copies or read-only views, so only
+an in-place assignment on the shared frame itself could alter it.
+Copy-on-write is always on from pandas 3; importing this module turns it on
+for pandas 2.x, which the project still supports.
+"""
+from typing import Callable, Dict, Hashable, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from services.oews_salary import occupation_key
+from utils.cache_utils import dataset_version
+from utils.data_processor import DataProcessor
+from utils.datasets import (CAREER_COLUMNS, COLLEGE_DATA_PATH, OEWS_DATA_PATH, load_college_table,
+                            load_oews_table)
+
+COLI_DATA_PATH = "COLI by Location.csv"
+OCCUPATION_DATA_PATH = "Occupational Data.csv"
+
+if int(pd.__version__.split('.')[0]) < 3:
+    # Opt-in before pandas 3; without it derived frames can write through to the shared ones
+    pd.set_option('mode.copy_on_write', True)
+
+
+def _load_careers() -> pd.DataFrame:
+    df = load_oews_table(CAREER_COLUMNS)
+    # Favorites and other session state refer to careers by this key
+    df['OCC_KEY'] = [occupation_key(code, title) for code, title in zip(df['OCC_CODE'], df['OCC_TITLE'])]
+    return df
+
+
+# Dataset name -> (source file, loader)
+SHARED_DATASETS: Dict[str, Tuple[str, Callable[[], pd.DataFrame]]] = {
+    'coli': (COLI_DATA_PATH, lambda: DataProcessor.load_coli_data(COLI_DATA_PATH)),
+    'occupations': (OCCUPATION_DATA_PATH, lambda: DataProcessor.load_occupation_data(OCCUPATION_DATA_PATH)),
+    'careers': (OEWS_DATA_PATH, _load_careers),
+    'colleges': (COLLEGE_DATA_PATH, load_college_table),
+}
+
+# Latest loaded frame per dataset, for memory reports
+_loaded: Dict[str, pd.DataFrame] = {}
+
+
+@st.cache_resource(max_entries=2 * len(SHARED_DATASETS))
+def _load_shared_dataset(name: str, version: str) -> pd.DataFrame:
+    df = SHARED_DATASETS[name][1]()
+    _loaded[name] = df
+    return df
+
+
+def get_shared_dataset(name: str) -> pd.DataFrame:
+    """
+    Get a dataset shared by every session in this process.
+
+    Args:
+        name: Key of ``SHARED_DATASETS``
+
+    Returns:
+        The process-wide DataFrame (read-only; copy before modifying)
+    """
+    return _load_shared_dataset(name, dataset_version(SHARED_DATASETS[name][0]))
+
+
+@st.cache_resource(max_entries=2 * len(SHARED_DATASETS))
+def _build_row_index(name: str, version: str, column: str) -> Dict[Hashable, int]:
+    values = get_shared_dataset(name)[column].tolist()
+    index: Dict[Hashable, int] = {}
+    for position, value in enumerate(values):
+        index.setdefault(value, position)  # the first row wins for duplicate keys
+    return index
+
+
+def get_row_index(name: str, column: str) -> Dict[Hashable, int]:
+    """Map of a shared dataset's key column values to row positions, built once per process"""
+    return _build_row_index(name, dataset_version(SHARED_DATASETS[name][0]), column)
+
+
+def loaded_datasets() -> Dict[str, pd.DataFrame]:
+    """Shared datasets loaded so far in this process"""
+    return dict(_loaded)
@@ -0,0 +1,123 @@
+"""Dataset definitions and build step for the bundled CSV files
+
+Run ``python -m utils.datasets`` to convert the CSVs into their columnar
+cache ahead of time; page loaders then only memory-map the result.
+"""
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_cache import ensure_build, load_dataset
+from utils.zip_income import ZIP_INCOME_DATA_PATH, build_zip_income_table
+from utils.income_rollups import build_income_distribution, build_income_rollups
+
+COLLEGE_DATA_PATH = 'attached_assets/Updated_Most-Recent-Cohorts-Institution.csv'
+OEWS_DATA_PATH = 'attached_assets/BLS OEWS.csv'
+
+COLLEGE_COLUMNS = [
+    'id',  # Scorecard UNITID; pages and session state refer to colleges by it
+    'name', 'city', 'state',
+    'admission_rate.overall',
+    'sat_scores.average.overall',
+    'act_scores.midpoint.cumulative',
+    'avg_net_price.public',
+    'avg_net_price.private',
+    'ownership',
+    'US News Top 150',
+    'best liberal arts colleges'
+]
+COLLEGE_STRING_COLUMNS = ['name', 'city', 'state']
+
+# OEWS columns used by the career pages
+CAREER_COLUMNS = [
+    'OCC_CODE',   # SOC code
+    'OCC_TITLE',  # Career title
+    'Alias 1', 'Alias 2', 'Alias 3', 'Alias 4', 'Alias 5',  # Alternative titles
+    'TOT_EMP',    # Total employment
+    'A_MEAN',     # Annual mean wage
+    'A_PCT10', 'A_PCT25', 'A_MEDIAN', 'A_PCT75', 'A_PCT90'  # Wage percentiles
+]
+
+OEWS_STRING_COLUMNS = [
+    'AREA', 'AREA_TITLE', 'PRIM_STATE', 'NAICS', 'NAICS_TITLE', 'I_GROUP',
+    'OCC_CODE', 'OCC_TITLE', 'Alias 1', 'Alias 2', 'Alias 3', 'Alias 4', 'Alias 5',
+    'O_GROUP'
+]
+OEWS_FLAG_COLUMNS = ['ANNUAL', 'HOURLY']
+
+
+def build_college_table(source_path: str) -> pd.DataFrame:
+    """Parse the College Scorecard CSV and keep the typed columns the app uses"""
+    df = pd.read_csv(source_path, low_memory=False)
+    if 'id' not in df.columns:
+        # Sources without Scorecard ids fall back to row positions, stable within a dataset version
+        df.insert(0, 'id', np.arange(len(df)))
+    df = df[COLLEGE_COLUMNS].copy()
+    for col in df.columns:
+        if col in COLLEGE_STRING_COLUMNS:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+    return df
+
+
+def clean_numeric_column(values: pd.Series) -> pd.Series:
+    """Convert OEWS numeric strings ('1,234', '#', '*') to floats"""
+    values = values.astype(str).str.replace(',', '').str.strip()
+    return pd.to_numeric(values.replace(['#', '*', '', 'nan'], np.nan), errors='coerce').astype(float)
+
+
+def build_oews_table(source_path: str) -> pd.DataFrame:
+    """
+    Parse the BLS OEWS CSV once, cleaning numeric strings into floats.
+
+    Every numeric column, including counts such as ``TOT_EMP`` that used to
+    load as int, becomes float64 so suppressed values ('*', '#') can be NaN.
+    """
+    df = pd.read_csv(source_path, dtype=str, keep_default_na=False)
+    df.columns = df.columns.str.strip()
+    for col in df.columns:
+        if col in OEWS_STRING_COLUMNS:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+        elif col in OEWS_FLAG_COLUMNS:
+            df[col] = df[col].astype(str).str.strip().str.upper().eq('TRUE')
+        else:
+            df[col] = clean_numeric_column(df[col])
+    return df
+
+
+def load_college_table(columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load the College Scorecard table from its columnar cache"""
+    return load_dataset('college_scorecard', COLLEGE_DATA_PATH, build_college_table, columns)
+
+
+def load_oews_table(columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load the BLS OEWS table from its columnar cache"""
+    return load_dataset('bls_oews', OEWS_DATA_PATH, build_oews_table, columns)
+
+
+DATASETS = {
+    'college_scorecard': (COLLEGE_DATA_PATH, build_college_table),
+    'bls_oews': (OEWS_DATA_PATH, build_oews_table),
+    'irs_zip_income': (ZIP_INCOME_DATA_PATH, build_zip_income_table),
+    'irs_income_rollups': (ZIP_INCOME_DATA_PATH, build_income_rollups),
+    'irs_income_distribution': (ZIP_INCOME_DATA_PATH, build_income_distribution),
+}
+
+
+def build_all() -> None:
+    """Build the columnar cache for every dataset whose source is present"""
+    for name, (source_path, builder) in DATASETS.items():
+        start = time.perf_counter()
+        try:
+            directory = ensure_build(name, source_path, builder)
+        except FileNotFoundError:
+            print(f"Skipping {name}: source file {source_path} not found")
+            continue
+        print(f"Built {name} -> {directory} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    build_all()
@@ -0,0 +1,291 @@
+"""ZIP-prefix, state and national rollups of the IRS per-ZIP income data
+
+The per-ZIP rows are expanded once into (level, region) keys and aggregated
+in a single groupby. Alongside the sums, each region keeps the return-weighted
+distribution of its ZIP mean incomes (sorted values with cumulative shares),
+which gives approximate income percentiles and a fast "where does this income
+rank locally" lookup without rescanning the source file.
+"""
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_cache import ensure_build, read_arrays
+from utils.zip_income import (OTHER_ZIPS, STATE_TOTAL_ZIP, ZIP_COUNT_FIELDS, ZIP_INCOME_DATA_PATH, ZipIncomeIndex,
+                              clean_currency, get_zip_income_index, load_zip_income_data, prebuilt_index_dir)
+
+LEVELS = ('zip3', 'state', 'national')
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Of the rows outside the ZIP lookup index, the unlisted-ZIP rows (OTHER_ZIPS)
+# still count towards the state and national rollups; state totals do not
+
+
+def _zip_frame(source_path: str) -> pd.DataFrame:
+    """Per-ZIP rows with numeric fields, excluding the state total rows"""
+    df = load_zip_income_data(source_path)
+    if df is None:
+        raise ValueError(f"Could not load income data from {source_path}")
+    df = df[df['zipcode'] != STATE_TOTAL_ZIP]
+
+    frame = pd.DataFrame({
+        field: clean_currency(df[column]).to_numpy()
+        for column, field in ZIP_COUNT_FIELDS.items()
+    })
+    frame['zipcode'] = df['zipcode'].to_numpy()
+    frame['state'] = df['The state associated with the return'].astype(str).str.strip().to_numpy()
+    return _with_mean_income(frame)
+
+
+def _index_zip_frame(index: ZipIncomeIndex) -> pd.DataFrame:
+    """
+    Per-ZIP rows of a dense ZIP index (e.g. a raw SOI ingest build).
+
+    The index holds listed ZIP codes only, so returns from unlisted ZIPs are
+    missing from the state and national rollups built from it.
+    """
+    slots = np.flatnonzero(index.valid)
+    frame = pd.DataFrame({
+        field: np.asarray(index.arrays[field][slots], dtype=float)
+        for field in ZIP_COUNT_FIELDS.values()
+    })
+    frame['zipcode'] = slots
+    frame['state'] = np.asarray(index.arrays['state'][slots], dtype=str)
+    return _with_mean_income(frame)
+
+
+def _with_mean_income(frame: pd.DataFrame) -> pd.DataFrame:
+    # Amounts are reported in thousands of dollars
+    frame['mean_income'] = np.where(frame['returns'] > 0,
+                                    frame['total_income'] * 1000 / frame['returns'].where(frame['returns'] > 0),
+                                    np.nan)
+    return frame
+
+
+def _expand_levels(frame: pd.DataFrame) -> pd.DataFrame:
+    """Repeat each ZIP row once per rollup level it contributes to"""
+    is_zip = frame['zipcode'] != OTHER_ZIPS
+    zip3 = frame[is_zip].assign(level='zip3', region=(frame['zipcode'][is_zip] // 100).map('{:03d}'.format))
+    state = frame.assign(level='state', region=frame['state'])
+    national = frame.assign(level='national', region='US')
+    return pd.concat([zip3, state, national], ignore_index=True)
+
+
+def _distribution(long: pd.DataFrame) -> pd.DataFrame:
+    long = long[long['returns'] > 0].sort_values(['level', 'region', 'mean_income'], kind='stable')
+    weights = long.groupby(['level', 'region'], sort=False)['returns']
+    long['cum_share'] = weights.cumsum() / weights.transform('sum')
+    return long[['level', 'region', 'mean_income', 'returns', 'cum_share']].reset_index(drop=True)
+
+
+def build_income_tables(source_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Build the rollup cube and the income distributions in one pass over the source.
+
+    Returns:
+        (rollups, distribution); see ``build_income_rollups`` and
+        ``build_income_distribution``
+    """
+    return _tables(_zip_frame(source_path))
+
+
+def build_income_tables_from_index(index: ZipIncomeIndex) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Build the rollup cube and the income distributions from a dense ZIP index"""
+    return _tables(_index_zip_frame(index))
+
+
+def _tables(frame: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    long = _expand_levels(frame)
+    distribution = _distribution(long)
+    return _rollups(long, distribution), distribution
+
+
+@lru_cache(maxsize=1)
+def _cached_income_tables(source_path: str, size: int, mtime_ns: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Size and mtime are part of the key so an edited source is read again
+    return build_income_tables(source_path)
+
+
+def _income_tables(source_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Both tables of a source; the second of the two dataset builds reuses the first pass"""
+    stat = os.stat(source_path)
+    return _cached_income_tables(os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns)
+
+
+def build_income_distribution(source_path: str) -> pd.DataFrame:
+    """
+    Build the per-region income distributions.
+
+    Returns:
+        Rows sorted by (level, region, mean_income) with the return-weighted
+        cumulative share of each row within its region
+    """
+    return _income_tables(source_path)[1]
+
+
+def build_income_rollups(source_path: str) -> pd.DataFrame:
+    """
+    Build the rollup cube: one row per (level, region).
+
+    Sums come from a single groupby over the expanded rows. The weighted
+    means are ratios of those sums, and the percentile columns are read from
+    the sorted distribution built by ``build_income_distribution``.
+    """
+    return _income_tables(source_path)[0]
+
+
+def _rollups(long: pd.DataFrame, distribution: pd.DataFrame) -> pd.DataFrame:
+    sums = long.groupby(['level', 'region'], sort=True)[list(ZIP_COUNT_FIELDS.values())].sum()
+    sums['zip_count'] = long.groupby(['level', 'region'], sort=True)['zipcode'].count()
+    rollups = sums.reset_index()
+
+    returns = rollups['returns'].where(rollups['returns'] > 0)
+    rollups['mean_income'] = rollups['total_income'] * 1000 / returns
+    rollups['mean_agi'] = rollups['agi'] * 1000 / returns
+    rollups['mean_tax'] = rollups['income_tax'] * 1000 / returns
+    rollups['joint_share'] = rollups['joint_returns'] / returns
+    rollups['elderly_share'] = rollups['elderly_returns'] / returns
+
+    # Position of each region's slice in the sorted distribution
+    keys = distribution['level'] + ':' + distribution['region']
+    starts = keys.drop_duplicates()
+    bounds = pd.DataFrame({'key': starts.to_numpy(), 'dist_start': starts.index.to_numpy()})
+    bounds['dist_stop'] = np.append(bounds['dist_start'].to_numpy()[1:], len(distribution))
+    rollups['key'] = rollups['level'] + ':' + rollups['region']
+    rollups = rollups.merge(bounds, on='key', how='left')
+    rollups[['dist_start', 'dist_stop']] = rollups[['dist_start', 'dist_stop']].fillna(0).astype(np.int64)
+
+    # Weighted quantile = first ZIP in each region whose cumulative share reaches q
+    region_ids = np.repeat(np.arange(len(bounds)), bounds['dist_stop'] - bounds['dist_start'])
+    row_of_region = pd.Series(np.arange(len(bounds)), index=bounds['key']).reindex(rollups['key']).to_numpy()
+    cum_share = distribution['cum_share'].to_numpy()
+    values = distribution['mean_income'].to_numpy()
+    for q in QUANTILES:
+        reached = np.flatnonzero(cum_share >= q - 1e-9)
+        regions, first = np.unique(region_ids[reached], return_index=True)
+        quantile = np.full(len(bounds), np.nan)
+        quantile[regions] = values[reached[first]]
+        rollups[f'p{int(q * 100)}'] = np.where(np.isnan(row_of_region), np.nan,
+                                               quantile[np.nan_to_num(row_of_region).astype(int)])
+
+    return rollups.drop(columns='key')
+
+
+class IncomeRollups:
+    """Loaded rollup cube with region lookups and local income ranks"""
+
+    def __init__(self, rollups: Dict[str, np.ndarray], distribution: Dict[str, np.ndarray]):
+        self.rollups = rollups
+        self.values = distribution['mean_income']
+        self.cum_share = distribution['cum_share']
+        self.row_of: Dict[Tuple[str, str], int] = {
+            (str(level), str(region)): i
+            for i, (level, region) in enumerate(zip(rollups['level'], rollups['region']))
+        }
+
+    @staticmethod
+    def region_key(level: str, zip_code: int, state: str = '') -> str:
+        """Region name of a ZIP code at the given level"""
+        if level == 'zip3':
+            return f"{int(zip_code) // 100:03d}"
+        if level == 'state':
+            return state
+        return 'US'
+
+    def summary(self, level: str, region: str) -> Optional[Dict]:
+        """Rollup statistics for one region, or None if it is unknown"""
+        row = self.row_of.get((level, region))
+        if row is None:
+            return None
+        return {name: values[row].item() for name, values in self.rollups.items()}
+
+    def local_rank(self, income: float, level: str, region: str) -> Optional[float]:
+        """
+        Approximate percentile of an income within a region.
+
+        The percentile is the share of the region's returns filed in ZIP codes
+        whose mean income is below ``income``.
+
+        Returns:
+            Percentile between 0 and 100, or None if the region is unknown
+        """
+        row = self.row_of.get((level, region))
+        if row is None:
+            return None
+        start, stop = int(self.rollups['dist_start'][row]), int(self.rollups['dist_stop'][row])
+        if stop <= start:
+            return None
+        pos = np.searchsorted(self.values[start:stop], income, side='left')
+        return float(self.cum_share[start + pos - 1]) * 100 if pos > 0 else 0.0
+
+    def local_context(self, income: float, zip_code: int, state: str) -> Optional[Dict]:
+        """
+        Rank an income against the most local region that has data.
+
+        Args:
+            income: Annual income to rank
+            zip_code: ZIP code of the user
+            state: State of the ZIP code
+
+        Returns:
+            Dict with the level, region, percentile and region summary
+        """
+        for level in LEVELS:
+            region = self.region_key(level, zip_code, state)
+            percentile = self.local_rank(income, level, region)
+            if percentile is not None:
+                return {
+                    'level': level,
+                    'region': region,
+                    'percentile': percentile,
+                    'summary': self.summary(level, region)
+                }
+        return None
+
+
+@lru_cache(maxsize=4)
+def _load_income_rollups(source_path: str, size: int, mtime_ns: int) -> IncomeRollups:
+    # Size and mtime are part of the key so an edited CSV triggers a rebuild
+    rollups = read_arrays(ensure_build('irs_income_rollups', source_path, build_income_rollups))
+    distribution = read_arrays(ensure_build('irs_income_distribution', source_path, build_income_distribution),
+                               ['mean_income', 'cum_share'])
+    return IncomeRollups(rollups, distribution)
+
+
+def _column_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Columns as arrays, strings as fixed-width unicode like the columnar cache stores them"""
+    return {
+        name: df[name].to_numpy() if pd.api.types.is_numeric_dtype(df[name]) else df[name].to_numpy(dtype=str)
+        for name in df.columns
+    }
+
+
+@lru_cache(maxsize=4)
+def _load_prebuilt_rollups(directory: str, mtime_ns: int) -> IncomeRollups:
+    # Built in memory from the ingested ZIP arrays; mtime is part of the key so a new ingest is picked up
+    rollups, distribution = build_income_tables_from_index(get_zip_income_index())
+    return IncomeRollups(_column_arrays(rollups), _column_arrays(distribution[['mean_income', 'cum_share']]))
+
+
+def get_income_rollups(file_path: str = ZIP_INCOME_DATA_PATH) -> IncomeRollups:
+    """Get the income rollup cube, building its cache on first use"""
+    directory = prebuilt_index_dir(file_path)
+    if directory:
+        # Roll up the configured prebuilt index rather than the CSV it replaces
+        return _load_prebuilt_rollups(directory, os.stat(directory).st_mtime_ns)
+    stat = os.stat(file_path)
+    return _load_income_rollups(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def local_income_context(income: float, zip_code: str) -> Optional[Dict]:
+    """Rank an income against the user's ZIP-prefix area (see ``IncomeRollups.local_context``)"""
+    try:
+        record = get_zip_income_index().lookup(int(zip_code))
+        state = record['state'] if record else ''
+        return get_income_rollups().local_context(income, int(zip_code), state)
+    except Exception as e:
+        print(f"Error getting local income context: {str(e)}")
+        return None
@@ -0,0 +1,189 @@
+"""Streaming ingest of raw IRS SOI ZIP code files
+
+The raw SOI "zpallagi" files have one row per ZIP code per AGI stub. This
+pipeline reads them in fixed-size chunks with explicit dtypes and adds each
+chunk into dense per-ZIP accumulators (one slot per possible ZIP code), so
+memory stays constant no matter how large the input is. The result is written
+in the same dense columnar format that ``utils.zip_income`` memory-maps.
+
+Usage:
+    python -m utils.irs_ingest 21zpallagi.csv 22zpallagi.csv --output .cache/zip_income
+"""
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_cache import source_digest, write_columnar
+from utils.zip_income import ZIP_SLOTS, listed_zips
+
+DEFAULT_CHUNKSIZE = 250000
+
+# Raw SOI variable -> field name in the dense ZIP table. ELDERLY is only
+# published in recent years; older files leave that field at zero.
+SOI_FIELDS = {
+    'N1': 'returns',
+    'MARS2': 'joint_returns',
+    'MARS4': 'head_of_household_returns',
+    'N2': 'individuals',
+    'ELDERLY': 'elderly_returns',
+    'A00100': 'agi',
+    'N02650': 'returns_with_income',
+    'A02650': 'total_income',
+    'A10300': 'income_tax',
+}
+
+
+class ZipAccumulator:
+    """Dense per-ZIP running sums for one input file"""
+
+    def __init__(self):
+        self.sums: Dict[str, np.ndarray] = {
+            field: np.zeros(ZIP_SLOTS, dtype=np.float64) for field in SOI_FIELDS.values()
+        }
+        self.state = np.full(ZIP_SLOTS, '', dtype='U2')
+        self.seen = np.zeros(ZIP_SLOTS, dtype=bool)
+
+    def add_chunk(self, zipcodes: np.ndarray, states: np.ndarray,
+                  values: Dict[str, np.ndarray]) -> None:
+        """
+        Add one chunk of stub rows into the running sums.
+
+        Args:
+            zipcodes: ZIP code of each row
+            states: State abbreviation of each row
+            values: Field name -> values aligned with ``zipcodes``
+        """
+        # Same validity rule as the CSV build: no state totals or unlisted ZIPs
+        keep = listed_zips(zipcodes)
+        zipcodes = zipcodes[keep]
+        for field, column in values.items():
+            self.sums[field] += np.bincount(zipcodes, weights=column[keep], minlength=ZIP_SLOTS)
+        self.state[zipcodes] = states[keep]
+        self.seen[zipcodes] = True
+
+    def overlay(self, newer: "ZipAccumulator") -> None:
+        """Replace the ZIP codes present in ``newer`` with its values"""
+        present = newer.seen
+        for field in self.sums:
+            self.sums[field][present] = newer.sums[field][present]
+        self.state[present] = newer.state[present]
+        self.seen |= present
+
+    def to_table(self) -> pd.DataFrame:
+        """Dense ZIP table in the layout of ``utils.zip_income.dense_zip_table``"""
+        table = {
+            field: np.where(self.seen, np.round(values), 0).astype(np.int64)
+            for field, values in self.sums.items()
+        }
+        returns = table['returns'].astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Amounts are reported in thousands of dollars
+            mean_income = np.round(table['total_income'] * 1000 / returns, 2)
+        table['mean_income'] = np.where(self.seen & (returns > 0), mean_income, np.nan)
+        table['state'] = self.state
+        table['valid'] = self.seen.copy()
+        return pd.DataFrame(table)
+
+
+def _column_dtypes(file_path: str) -> Dict[str, object]:
+    """Map the file's own column names (case varies by year) to explicit dtypes"""
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtypes = {}
+    for column in header:
+        name = column.strip().upper()
+        if name == 'STATE':
+            dtypes[column] = str
+        elif name == 'ZIPCODE':
+            dtypes[column] = np.int64
+        elif name in SOI_FIELDS:
+            dtypes[column] = np.float64
+    return dtypes
+
+
+def ingest_file(file_path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> ZipAccumulator:
+    """
+    Aggregate the AGI stubs of one raw SOI file per ZIP code.
+
+    Args:
+        file_path: Raw SOI ZIP file (plain or compressed CSV)
+        chunksize: Rows read per chunk
+
+    Returns:
+        Accumulator holding the per-ZIP sums of the file
+    """
+    dtypes = _column_dtypes(file_path)
+    names = {column.strip().upper(): column for column in dtypes}
+    for required in ('STATE', 'ZIPCODE', 'N1', 'A02650'):
+        if required not in names:
+            raise ValueError(f"{file_path} is missing the {required} column")
+
+    accumulator = ZipAccumulator()
+    reader = pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize)
+    for chunk in reader:
+        values = {
+            field: chunk[names[variable]].fillna(0).to_numpy()
+            for variable, field in SOI_FIELDS.items() if variable in names
+        }
+        accumulator.add_chunk(chunk[names['ZIPCODE']].to_numpy(),
+                              chunk[names['STATE']].str.strip().to_numpy(dtype='U2'),
+                              values)
+    return accumulator
+
+
+def ingest(file_paths: Sequence[str], output_dir: str,
+           chunksize: int = DEFAULT_CHUNKSIZE) -> str:
+    """
+    Ingest raw SOI files into a dense ZIP income build.
+
+    Files are applied in order, so when several tax years are given each ZIP
+    code keeps the figures from the last file that reports it.
+
+    Args:
+        file_paths: Raw SOI files, oldest first
+        output_dir: Directory to write the build to
+        chunksize: Rows read per chunk
+
+    Returns:
+        Path of the written build
+    """
+    if os.path.exists(output_dir):
+        raise FileExistsError(f"Output directory {output_dir} already exists")
+
+    result: Optional[ZipAccumulator] = None
+    for file_path in file_paths:
+        accumulator = ingest_file(file_path, chunksize)
+        if result is None:
+            result = accumulator
+        else:
+            result.overlay(accumulator)
+
+    if result is None:
+        raise ValueError("No input files given")
+
+    write_columnar(result.to_table(), output_dir, meta={
+        "dataset": "irs_zip_income",
+        "sources": [
+            {"path": os.path.abspath(path), "sha256": source_digest(path)} for path in file_paths
+        ],
+    })
+    return output_dir
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate raw IRS SOI ZIP files into the dense ZIP income format")
+    parser.add_argument("files", nargs="+", help="Raw SOI ZIP files, oldest tax year first")
+    parser.add_argument("--output", required=True, help="Build directory to create")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    ingest(args.files, args.output, args.chunksize)
+    print(f"Wrote {args.output} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
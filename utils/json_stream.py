@@ -0,0 +1,139 @@
+"""Incremental JSON parser for streamed LLM replies
+
+``IncrementalJSONParser`` is fed text as it arrives and reports each value
+whose path is selected as soon as that value is complete, e.g. every timeline
+milestone of a career path while the rest of the reply is still streaming.
+Paths are tuples of object keys and array indexes; ``()`` is the whole document.
+"""
+import json
+from typing import Any, Callable, List, Sequence, Tuple, Union
+
+PathPart = Union[str, int]
+Path = Tuple[PathPart, ...]
+
+_SCALAR_START = set('-0123456789tfn')
+_DELIMITERS = set(',]} \t\r\n')
+
+
+def path_matches(path: Path, pattern: Sequence[PathPart]) -> bool:
+    """True if a path matches a pattern, where '*' in the pattern matches any key or index"""
+    return len(path) == len(pattern) and all(
+        part == '*' or part == key for part, key in zip(pattern, path)
+    )
+
+
+def select_paths(*patterns: Sequence[PathPart]) -> Callable[[Path], bool]:
+    """Selector accepting paths that match any of the patterns"""
+    return lambda path: any(path_matches(path, pattern) for pattern in patterns)
+
+
+class _Frame:
+    """An open object or array: where it started and the key of its current child"""
+    __slots__ = ('is_object', 'start', 'key', 'expect_key')
+
+    def __init__(self, is_object: bool, start: int):
+        self.is_object = is_object
+        self.start = start
+        self.key: PathPart = None if is_object else 0
+        self.expect_key = is_object
+
+
+class IncrementalJSONParser:
+    """
+    Push parser emitting selected values of one JSON document as they complete.
+
+    Text before the document (e.g. a Markdown code fence) and after it is
+    ignored. Each character is scanned once; a selected value is decoded from
+    its own span of the buffer when it closes.
+    """
+
+    def __init__(self, select: Callable[[Path], bool]):
+        """
+        Args:
+            select: Called with the path of each completed value; True emits it
+        """
+        self.select = select
+        self.text = ''
+        self.stack: List[_Frame] = []
+        self.started = False
+        self.done = False
+        self._string_start = None
+        self._escape = False
+        self._scalar_start = None
+
+    def _path(self) -> Path:
+        return tuple(frame.key for frame in self.stack)
+
+    def _complete(self, start: int, end: int, events: List[Tuple[Path, Any]]) -> None:
+        """A value spanning text[start:end] has closed inside the current top frame"""
+        path = self._path()
+        if self.select(path):
+            events.append((path, json.loads(self.text[start:end])))
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """
+        Add streamed text.
+
+        Returns:
+            (path, value) pairs for selected values completed by this chunk,
+            innermost first
+        """
+        events: List[Tuple[Path, Any]] = []
+        if self.done:
+            return events
+        position = len(self.text)
+        self.text += chunk
+
+        for i in range(position, len(self.text)):
+            char = self.text[i]
+
+            if self._string_start is not None:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    start, self._string_start = self._string_start, None
+                    frame = self.stack[-1]
+                    if frame.is_object and frame.expect_key:
+                        frame.key = json.loads(self.text[start:i + 1])
+                        frame.expect_key = False
+                    else:
+                        self._complete(start, i + 1, events)
+                continue
+
+            if self._scalar_start is not None:
+                if char not in _DELIMITERS:
+                    continue
+                start, self._scalar_start = self._scalar_start, None
+                self._complete(start, i, events)
+
+            if not self.started:
+                if char in '{[':
+                    self.started = True
+                else:
+                    continue
+
+            if char in '{[':
+                self.stack.append(_Frame(char == '{', i))
+            elif char in '}]':
+                frame = self.stack.pop()
+                if not self.stack:
+                    self.done = True
+                    path = ()
+                    if self.select(path):
+                        events.append((path, json.loads(self.text[frame.start:i + 1])))
+                    break
+                self._complete(frame.start, i + 1, events)
+            elif char == '"':
+                self._string_start = i
+            elif char == ',':
+                frame = self.stack[-1]
+                if frame.is_object:
+                    frame.expect_key = True
+                else:
+                    frame.key += 1
+            elif char in _SCALAR_START:
+                self._scalar_start = i
+
+        return events
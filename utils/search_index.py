@@ -0,0 +1,170 @@
+"""Prebuilt typo-tolerant search index for picker-style lookups"""
+import heapq
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Number of trigram candidates re-ranked with the (slower) sequence ratio
+RERANK_FACTOR = 10
+
+
+def normalize_key(text: str) -> str:
+    """Lowercase a label and collapse punctuation/whitespace into single spaces"""
+    return _NON_ALNUM.sub(' ', str(text).lower()).strip()
+
+
+def trigrams(key: str) -> set:
+    """
+    Split a normalized key into padded word trigrams.
+
+    Each word is padded with two leading and one trailing space so that short
+    queries and word prefixes still produce overlapping grams.
+    """
+    grams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class SearchIndex:
+    """
+    Trigram index over a fixed list of labels.
+
+    The index is built once per dataset and answers top-k queries without
+    touching every label: trigram postings select candidates, which are then
+    re-ranked by sequence similarity.
+    """
+
+    def __init__(self, labels: Iterable[str],
+                 aliases: Optional[Dict[int, Sequence[str]]] = None):
+        """
+        Args:
+            labels: Display labels, one per document
+            aliases: Optional extra search keys per document position
+        """
+        self.labels: List[str] = [str(label) for label in labels]
+        self.keys: List[List[str]] = [[normalize_key(label)] for label in self.labels]
+        for doc_id, extra in (aliases or {}).items():
+            for alias in extra:
+                key = normalize_key(alias)
+                if key and key not in self.keys[doc_id]:
+                    self.keys[doc_id].append(key)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        gram_counts = np.zeros(len(self.labels), dtype=np.int32)
+        for doc_id, keys in enumerate(self.keys):
+            grams = set()
+            for key in keys:
+                grams |= trigrams(key)
+            gram_counts[doc_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(doc_id)
+
+        self.postings: Dict[str, np.ndarray] = {
+            gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()
+        }
+        self.gram_counts = gram_counts
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _score(self, query: str, doc_id: int) -> float:
+        """Similarity of the best matching key of a document to the query"""
+        best = 0.0
+        for key in self.keys[doc_id]:
+            score = SequenceMatcher(None, query, key).ratio()
+            if key.startswith(query):
+                score += 0.5
+            elif query in key:
+                score += 0.25
+            best = max(best, score)
+        return best
+
+    def search_ids(self, query: str, limit: int = 3, cutoff: float = 0.1) -> List[int]:
+        """
+        Find the positions of the best matching documents.
+
+        Args:
+            query: Free-text query, typos allowed
+            limit: Maximum number of results to return
+            cutoff: Minimum trigram overlap (Dice coefficient) for a candidate
+
+        Returns:
+            Document positions ordered from best to worst match
+        """
+        query = normalize_key(query)
+        if not query or not self.labels:
+            return []
+
+        query_grams = trigrams(query)
+        hits = [self.postings[gram] for gram in query_grams if gram in self.postings]
+        if not hits:
+            return []
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.labels))
+        dice = 2.0 * shared / (len(query_grams) + self.gram_counts)
+        candidates = np.flatnonzero(dice >= cutoff)
+        if candidates.size == 0:
+            return []
+
+        pool = min(candidates.size, max(limit * RERANK_FACTOR, limit))
+        if candidates.size > pool:
+            top = np.argpartition(-dice[candidates], pool - 1)[:pool]
+            candidates = candidates[top]
+
+        scored = ((self._score(query, int(doc_id)) + dice[doc_id], -int(doc_id))
+                  for doc_id in candidates)
+        return [-neg_id for _, neg_id in heapq.nlargest(limit, scored)]
+
+    def search(self, query: str, limit: int = 3, cutoff: float = 0.1) -> List[str]:
+        """Find the best matching labels for a query (see ``search_ids``)"""
+        return [self.labels[doc_id] for doc_id in self.search_ids(query, limit, cutoff)]
+
+
+# Words skipped when deriving acronyms such as "MIT" or "UCLA"
+ACRONYM_STOPWORDS = {'of', 'the', 'at', 'and', 'in', 'for', 'main', 'campus'}
+
+# Common nicknames that cannot be derived from the official name
+COLLEGE_NICKNAMES = {
+    'california institute of technology': ['caltech'],
+    'georgia institute of technology main campus': ['georgia tech'],
+    'university of pennsylvania': ['upenn', 'penn'],
+    'university of michigan ann arbor': ['umich'],
+    'university of illinois urbana champaign': ['uiuc'],
+    'the university of texas at austin': ['ut austin'],
+    'virginia polytechnic institute and state university': ['virginia tech'],
+    'university of california berkeley': ['cal', 'berkeley'],
+    'university of mississippi': ['ole miss'],
+}
+
+
+def college_aliases(name: str) -> List[str]:
+    """
+    Derive alternative search keys for a college name.
+
+    Args:
+        name: Official institution name from the Scorecard data
+
+    Returns:
+        Acronym(s) plus any well-known nickname for the institution
+    """
+    key = normalize_key(name)
+    aliases = list(COLLEGE_NICKNAMES.get(key, []))
+    words = [word for word in key.split() if word not in ACRONYM_STOPWORDS]
+    if len(words) >= 2:
+        aliases.append(''.join(word[0] for word in words))
+    return aliases
+
+
+def build_college_name_index(names: Iterable[str]) -> SearchIndex:
+    """Build a SearchIndex over college names including acronyms and nicknames"""
+    names = [str(name) for name in names]
+    aliases = {doc_id: college_aliases(name) for doc_id, name in enumerate(names)}
+    return SearchIndex(names, aliases=aliases)
@@ -0,0 +1,89 @@
+"""Per-session memory report
+
+Estimates how much memory each ``st.session_state`` entry holds on its own.
+Objects reachable from several entries are counted once, and the shared
+datasets of ``utils.dataset_registry`` are reported separately because one
+copy serves every session in the process.
+"""
+import sys
+from typing import Any, Dict, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_registry import loaded_datasets
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memory of a DataFrame's columns and index, strings included"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def deep_size(obj: Any, seen: Optional[Set[int]] = None, shared: Optional[Set[int]] = None) -> int:
+    """
+    Approximate memory held by an object and everything it references.
+
+    Args:
+        obj: Object to measure
+        seen: Ids already counted (shared between calls to count each object once)
+        shared: Ids of objects owned elsewhere, counted as zero
+
+    Returns:
+        Size in bytes
+    """
+    seen = set() if seen is None else seen
+    shared = shared or set()
+    if id(obj) in seen or id(obj) in shared:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return frame_bytes(obj)
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+
+    # Arrays count their data only when they own it (not views or memory maps)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            size += sum(deep_size(item, seen, shared) for item in obj.ravel())
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen, shared) + deep_size(value, seen, shared) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen, shared) for item in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_size(vars(obj), seen, shared)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_size(getattr(obj, slot), seen, shared)
+                    for slot in obj.__slots__ if hasattr(obj, slot))
+    return size
+
+
+def session_memory_report(state: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Memory held by each session state entry, largest first.
+
+    Args:
+        state: Session state (e.g. ``st.session_state.to_dict()``)
+
+    Returns:
+        DataFrame with 'Key', 'Type' and 'Bytes' columns
+    """
+    shared = {id(df) for df in loaded_datasets().values()}
+    seen: Set[int] = set()
+    rows = [
+        {'Key': key, 'Type': type(value).__name__, 'Bytes': deep_size(value, seen, shared)}
+        for key, value in state.items()
+    ]
+    report = pd.DataFrame(rows, columns=['Key', 'Type', 'Bytes'])
+    return report.sort_values('Bytes', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def shared_memory_report() -> pd.DataFrame:
+    """Rows and memory of the shared datasets loaded in this process (held once for all sessions)"""
+    rows = [
+        {'Dataset': name, 'Rows': len(df), 'Bytes': frame_bytes(df)}
+        for name, df in loaded_datasets().items()
+    ]
+    return pd.DataFrame(rows, columns=['Dataset', 'Rows', 'Bytes'])
@@ -0,0 +1,173 @@
+"""Occupation x area x statistic wage cube built from the OEWS table
+
+The OEWS file is a long table with one row per (area, occupation). The cube
+scatters it once into a dense float array indexed by occupation, area and wage
+statistic, with label indexes for each axis and a mask of which cells the
+source actually had. Heatmaps, rankings and comparisons then take array
+slices instead of filtering and pivoting a DataFrame on every request.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.oews_salary import normalize_area, occupation_key
+
+# OEWS wage columns -> statistic names on the cube's last axis
+WAGE_STATS = {
+    'A_MEAN': 'mean',
+    'A_PCT10': 'p10',
+    'A_PCT25': 'p25',
+    'A_MEDIAN': 'median',
+    'A_PCT75': 'p75',
+    'A_PCT90': 'p90',
+}
+STAT_LABELS = {
+    'mean': 'Mean',
+    'p10': '10th Percentile',
+    'p25': '25th Percentile',
+    'median': 'Median',
+    'p75': '75th Percentile',
+    'p90': '90th Percentile',
+}
+CUBE_COLUMNS = ['AREA', 'AREA_TITLE', 'OCC_CODE', 'OCC_TITLE'] + list(WAGE_STATS)
+
+
+class WageCube:
+    """Dense (occupation, area, statistic) wage array with label indexes"""
+
+    def __init__(self, occupations: List[str], occupation_titles: List[str],
+                 areas: List[str], area_titles: List[str], stats: List[str],
+                 values: np.ndarray):
+        """
+        Args:
+            occupations: Occupation keys (SOC codes, or titles for mangled codes)
+            occupation_titles: Display title per occupation
+            areas: Normalized area codes
+            area_titles: Display title per area
+            stats: Statistic names for the last axis
+            values: (occupations x areas x stats) float array, NaN where missing
+        """
+        self.occupations = occupations
+        self.occupation_titles = occupation_titles
+        self.areas = areas
+        self.area_titles = area_titles
+        self.stats = stats
+        self.values = values
+        self.mask = ~np.isnan(values)
+        self.occupation_index: Dict[str, int] = {code: i for i, code in enumerate(occupations)}
+        self.area_index: Dict[str, int] = {area: i for i, area in enumerate(areas)}
+        self.stat_index: Dict[str, int] = {stat: i for i, stat in enumerate(stats)}
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.values.shape
+
+    def _occupation_positions(self, codes: Optional[Sequence[str]]) -> np.ndarray:
+        if codes is None:
+            return np.arange(len(self.occupations))
+        return np.array([self.occupation_index[str(code).strip()] for code in codes], dtype=np.intp)
+
+    def _area_positions(self, areas: Optional[Sequence[str]]) -> np.ndarray:
+        if areas is None:
+            return np.arange(len(self.areas))
+        return np.array([self.area_index[normalize_area(area)] for area in areas], dtype=np.intp)
+
+    def occupation(self, code: str) -> np.ndarray:
+        """(areas x stats) view for one occupation"""
+        return self.values[self.occupation_index[str(code).strip()]]
+
+    def area(self, area_code: str) -> np.ndarray:
+        """(occupations x stats) view for one area"""
+        return self.values[:, self.area_index[normalize_area(area_code)]]
+
+    def stat(self, stat: str) -> np.ndarray:
+        """(occupations x areas) view for one statistic"""
+        return self.values[:, :, self.stat_index[stat]]
+
+    def value(self, code: str, area_code: str, stat: str) -> Optional[float]:
+        """One cell, or None if the source had no value"""
+        value = self.values[self.occupation_index[str(code).strip()],
+                            self.area_index[normalize_area(area_code)],
+                            self.stat_index[stat]]
+        return None if np.isnan(value) else float(value)
+
+    def heatmap_frame(self, stat: str, codes: Optional[Sequence[str]] = None,
+                      areas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Occupations x areas grid of one statistic, labelled for ``plot_salary_heatmap``.
+
+        Only the requested rows and columns are gathered; the frame wraps that slice.
+        """
+        rows, cols = self._occupation_positions(codes), self._area_positions(areas)
+        grid = self.values[np.ix_(rows, cols, [self.stat_index[stat]])][:, :, 0]
+        return pd.DataFrame(grid,
+                            index=[self.occupation_titles[i] for i in rows],
+                            columns=[self.area_titles[j] for j in cols])
+
+    def stats_frame(self, area_code: str, codes: Optional[Sequence[str]] = None,
+                    stats: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Occupations x statistics grid for one area (e.g. a wage-distribution heatmap)"""
+        rows = self._occupation_positions(codes)
+        stat_positions = [self.stat_index[stat] for stat in (stats or self.stats)]
+        grid = self.values[np.ix_(rows, [self.area_index[normalize_area(area_code)]], stat_positions)][:, 0, :]
+        return pd.DataFrame(grid,
+                            index=[self.occupation_titles[i] for i in rows],
+                            columns=[STAT_LABELS.get(self.stats[k], self.stats[k]) for k in stat_positions])
+
+    def rank(self, stat: str, area_code: str, limit: Optional[int] = None,
+             ascending: bool = False) -> List[Tuple[str, str, float]]:
+        """
+        Occupations with a value in an area, ordered by one statistic.
+
+        Returns:
+            (occupation key, title, value) tuples, highest first unless ascending
+        """
+        column = self.values[:, self.area_index[normalize_area(area_code)], self.stat_index[stat]]
+        present = np.flatnonzero(~np.isnan(column))
+        order = np.argsort(column[present] if ascending else -column[present], kind='stable')
+        top = present[order[:limit] if limit is not None else order]
+        return [(self.occupations[i], self.occupation_titles[i], float(column[i])) for i in top]
+
+    def compare(self, codes: Sequence[str], area_code: str) -> np.ndarray:
+        """(len(codes) x stats) array of the given occupations in one area"""
+        return self.values[self._occupation_positions(codes), self.area_index[normalize_area(area_code)]]
+
+
+def build_wage_cube(df: pd.DataFrame) -> WageCube:
+    """
+    Scatter the OEWS long table into a dense cube.
+
+    Rows are assigned to cells with one vectorized write; where the source
+    repeats an (occupation, area) pair the first row wins, as in
+    ``OEWSSalaryService``.
+
+    Args:
+        df: OEWS table as returned by ``utils.datasets.load_oews_table``
+    """
+    titles = df['OCC_TITLE'].astype(str).to_numpy()
+    keys = np.array([occupation_key(code, title) for code, title in zip(df['OCC_CODE'], titles)], dtype=object)
+    area_keys = np.array([normalize_area(area) for area in df['AREA']], dtype=object)
+
+    occ_idx, occupations = pd.factorize(keys)
+    area_idx, areas = pd.factorize(area_keys)
+    stat_columns = [column for column in WAGE_STATS if column in df.columns]
+
+    # First row per (occupation, area) pair
+    cell = occ_idx * len(areas) + area_idx
+    _, first = np.unique(cell, return_index=True)
+
+    values = np.full((len(occupations), len(areas), len(stat_columns)), np.nan)
+    values[occ_idx[first], area_idx[first]] = df[stat_columns].to_numpy(dtype=float)[first]
+
+    # Labels from each occupation's and area's first row
+    occupation_first = np.unique(occ_idx, return_index=True)[1]
+    area_first = np.unique(area_idx, return_index=True)[1]
+    return WageCube(
+        occupations=list(occupations),
+        occupation_titles=titles[occupation_first].tolist(),
+        areas=list(areas),
+        area_titles=df['AREA_TITLE'].astype(str).to_numpy()[area_first].tolist(),
+        stats=[WAGE_STATS[column] for column in stat_columns],
+        values=values,
+    )
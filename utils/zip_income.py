@@ -1,8 +1,52 @@
-"""Module for handling zip code based income data"""
+"""Module for handling zip code based income data
+
+The IRS per-ZIP table is converted once into dense arrays with one slot per
+possible five-digit ZIP code (00000-99999) plus a validity mask. The arrays
+are memory-mapped from the dataset cache, so a lookup is a single index into
+the arrays instead of a CSV parse and a table scan.
+"""
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
 import pandas as pd
-from typing import Optional
 
-def load_zip_income_data(file_path: str = "aggregated_irs_data.csv") -> pd.DataFrame:
+from utils.dataset_cache import ensure_build, read_arrays
+
+ZIP_INCOME_DATA_PATH = "aggregated_irs_data.csv"
+# Optional prebuilt index (e.g. from ``python -m utils.irs_ingest``) used instead of the CSV
+ZIP_INCOME_INDEX_DIR = os.environ.get("ZIP_INCOME_INDEX_DIR")
+ZIP_SLOTS = 100000
+
+# Source column -> field name in the dense ZIP table
+ZIP_COUNT_FIELDS = {
+    'Number of returns': 'returns',
+    'Number of joint returns': 'joint_returns',
+    'Number of head of household returns': 'head_of_household_returns',
+    'Number of individuals': 'individuals',
+    'Number of elderly returns': 'elderly_returns',
+    'Adjusted gross income (AGI)': 'agi',
+    'Number of returns with total income': 'returns_with_income',
+    'Total income amount': 'total_income',
+    'Total Income Tax': 'income_tax',
+}
+ZIP_FIELDS = list(ZIP_COUNT_FIELDS.values()) + ['mean_income', 'state', 'valid']
+
+# ZIP 0 rows are the IRS state totals and 99999 collects returns from
+# unlisted ZIP codes; neither is a ZIP code a user can look up
+STATE_TOTAL_ZIP = 0
+OTHER_ZIPS = 99999
+
+
+def clean_currency(values: pd.Series) -> pd.Series:
+    """Convert formatted amounts such as ' $88,909.31 ' to floats"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    return values.astype(str).str.replace('$', '').str.replace(',', '').str.replace(' ', '').astype(float)
+
+
+def load_zip_income_data(file_path: str = ZIP_INCOME_DATA_PATH) -> pd.DataFrame:
     """Load income data by zip code from CSV file"""
     try:
         df = pd.read_csv(file_path)
@@ -14,36 +58,196 @@ def load_zip_income_data(file_path: str = "aggregated_irs_data.csv") -> pd.DataF
         if not all(col in df.columns for col in required_columns):
             raise ValueError("Income CSV file missing required columns")
 
-        # Clean up the 'Mean Income' column by removing formatting
-        df['Mean Income'] = df['Mean Income'].str.replace('$', '').str.replace(',', '').str.replace(' ', '').astype(float)
+        # Clean up the formatted amount columns
+        df['Mean Income'] = clean_currency(df['Mean Income'])
+        if 'Total income amount' in df.columns:
+            df['Total income amount'] = clean_currency(df['Total income amount'])
 
         return df
     except Exception as e:
         print(f"Error loading income data: {str(e)}")
         return None
 
+
+def listed_zips(zipcodes: np.ndarray) -> np.ndarray:
+    """
+    Mask of rows that belong to a real, listed ZIP code.
+
+    This is the validity rule of every dense ZIP build (the aggregated CSV and
+    the raw SOI ingest alike), so a ZIP code resolves the same way whichever
+    build is in use.
+    """
+    zipcodes = np.asarray(zipcodes, dtype=np.int64)
+    return (zipcodes > STATE_TOTAL_ZIP) & (zipcodes < OTHER_ZIPS)
+
+
+def dense_zip_table(zipcodes: np.ndarray, fields: Dict[str, np.ndarray],
+                    states: np.ndarray) -> pd.DataFrame:
+    """
+    Scatter per-ZIP rows into a table with one row per possible ZIP code.
+
+    Rows outside ``listed_zips`` (state totals and unlisted ZIPs) are left
+    out. When a ZIP code appears more than once the first occurrence wins,
+    matching the old row lookup.
+
+    Args:
+        zipcodes: ZIP code of each source row
+        fields: Field name -> values aligned with ``zipcodes``
+        states: State abbreviation of each source row
+
+    Returns:
+        DataFrame of ``ZIP_SLOTS`` rows indexed by position = ZIP code
+    """
+    zipcodes = np.asarray(zipcodes, dtype=np.int64)
+    rows = np.flatnonzero(listed_zips(zipcodes))
+    unique_zips, first = np.unique(zipcodes[rows], return_index=True)
+    rows = rows[first]
+
+    table = {}
+    for name, values in fields.items():
+        values = np.asarray(values)
+        if name == 'mean_income':
+            column = np.full(ZIP_SLOTS, np.nan)
+        else:
+            column = np.zeros(ZIP_SLOTS, dtype=np.int64)
+        column[unique_zips] = values[rows]
+        table[name] = column
+
+    state = np.full(ZIP_SLOTS, '', dtype='U2')
+    state[unique_zips] = np.asarray(states, dtype=str)[rows]
+    table['state'] = state
+
+    valid = np.zeros(ZIP_SLOTS, dtype=bool)
+    valid[unique_zips] = True
+    table['valid'] = valid
+    return pd.DataFrame(table)
+
+
+def build_zip_income_table(source_path: str) -> pd.DataFrame:
+    """Build the dense ZIP table from the aggregated IRS CSV"""
+    df = load_zip_income_data(source_path)
+    if df is None:
+        raise ValueError(f"Could not load income data from {source_path}")
+
+    fields = {
+        field: clean_currency(df[column]).round().astype(np.int64).to_numpy()
+        for column, field in ZIP_COUNT_FIELDS.items()
+    }
+    fields['mean_income'] = df['Mean Income'].to_numpy(dtype=float)
+    return dense_zip_table(df['zipcode'].to_numpy(), fields,
+                           df['The state associated with the return'].to_numpy())
+
+
+class ZipIncomeIndex:
+    """Memory-mapped dense ZIP arrays with O(1) and batch lookups"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Args:
+            arrays: Field name -> array of ``ZIP_SLOTS`` values
+        """
+        self.arrays = arrays
+        self.valid = arrays['valid']
+        self.mean_income = arrays['mean_income']
+        # Any slot without data holds the "no data" values of every field
+        empty = np.flatnonzero(~self.valid)
+        self.empty_slot = int(empty[0]) if len(empty) else 0
+
+    @staticmethod
+    def to_slots(zip_codes: Union[Iterable, np.ndarray]) -> np.ndarray:
+        """Convert ZIP codes (strings or ints) to slot numbers, -1 when invalid"""
+        codes = pd.to_numeric(pd.Series(np.asarray(zip_codes, dtype=object).ravel()),
+                              errors='coerce').to_numpy(dtype=float)
+        slots = np.full(len(codes), -1, dtype=np.int64)
+        ok = ~np.isnan(codes) & (codes >= 0) & (codes < ZIP_SLOTS) & (codes == np.floor(codes))
+        slots[ok] = codes[ok].astype(np.int64)
+        return slots
+
+    def lookup(self, zip_code: int) -> Optional[Dict]:
+        """Income statistics for a single ZIP code, or None if it has no data"""
+        if not 0 <= zip_code < ZIP_SLOTS or not self.valid[zip_code]:
+            return None
+        record = {name: self.arrays[name][zip_code].item() for name in ZIP_FIELDS if name != 'valid'}
+        record['zipcode'] = zip_code
+        return record
+
+    def lookup_many(self, zip_codes: Union[Iterable, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Income statistics for many ZIP codes at once.
+
+        Args:
+            zip_codes: ZIP codes as strings or integers
+
+        Returns:
+            Field name -> array aligned with ``zip_codes``. ``valid`` marks the
+            entries that have data; other entries hold 0 / NaN / ''.
+        """
+        slots = self.to_slots(zip_codes)
+        known = slots >= 0
+        safe = np.where(known, slots, 0)
+        result = {name: np.asarray(self.arrays[name][safe]) for name in ZIP_FIELDS}
+        valid = result['valid'] & known
+        for name, values in result.items():
+            if name != 'valid':
+                # Invalid entries read slot 0; reset them to the empty-slot values
+                result[name] = np.where(valid, values, self.arrays[name][self.empty_slot])
+        result['valid'] = valid
+        return result
+
+
+@lru_cache(maxsize=4)
+def _load_zip_income_index(source_path: str, size: int, mtime_ns: int) -> ZipIncomeIndex:
+    # Size and mtime are part of the key so an edited CSV triggers a rebuild
+    directory = ensure_build('irs_zip_income', source_path, build_zip_income_table)
+    return ZipIncomeIndex(read_arrays(directory))
+
+
+@lru_cache(maxsize=4)
+def _load_prebuilt_index(directory: str, mtime_ns: int) -> ZipIncomeIndex:
+    return ZipIncomeIndex(read_arrays(directory))
+
+
+def prebuilt_index_dir(file_path: str = ZIP_INCOME_DATA_PATH) -> Optional[str]:
+    """Prebuilt index directory that replaces ``file_path``, if one is configured"""
+    if ZIP_INCOME_INDEX_DIR and file_path == ZIP_INCOME_DATA_PATH:
+        return ZIP_INCOME_INDEX_DIR
+    return None
+
+
+def get_zip_income_index(file_path: str = ZIP_INCOME_DATA_PATH) -> ZipIncomeIndex:
+    """Get the dense ZIP income index, building its cache on first use"""
+    directory = prebuilt_index_dir(file_path)
+    if directory:
+        return _load_prebuilt_index(directory, os.stat(directory).st_mtime_ns)
+    stat = os.stat(file_path)
+    return _load_zip_income_index(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
 def get_income_estimate(zip_code: str) -> Optional[dict]:
     """Get income estimates for a given zip code"""
     try:
-        df = load_zip_income_data()
-        if df is None or df.empty:
-            return None
+        index = get_zip_income_index()
 
-        # Convert zip code to integer for comparison
+        # Convert zip code to integer for the slot lookup
         zip_code = int(zip_code)
 
-        # Find matching zip code
-        zip_data = df[df['zipcode'] == zip_code]
-        if zip_data.empty:
+        record = index.lookup(zip_code)
+        if record is None:
             print(f"No data found for ZIP code: {zip_code}")
             return None
 
-        # Get mean income 
-        mean_income = float(zip_data['Mean Income'].iloc[0])
-
         return {
-            'mean_income': int(mean_income)
+            'mean_income': int(record['mean_income'])
         }
     except Exception as e:
         print(f"Error getting income estimate: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+
+def get_income_estimates(zip_codes: Iterable) -> Optional[Dict[str, np.ndarray]]:
+    """Get income statistics for a batch of zip codes (see ``ZipIncomeIndex.lookup_many``)"""
+    try:
+        return get_zip_income_index().lookup_many(zip_codes)
+    except Exception as e:
+        print(f"Error getting income estimates: {str(e)}")
+        return None
@@ -0,0 +1,99 @@
+"""Per-session cache of built projection figures
+
+Streamlit reruns the whole script on every widget change, and building the
+Plotly figures and formatted tables of a projection costs far more than
+drawing them. ``FigureCache`` keeps the built views in ``st.session_state``,
+keyed by a hash of the projection arrays and plot options, so a rerun that
+leaves the projection unchanged skips figure construction altogether.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+import numpy as np
+import streamlit as st
+
+# Views kept per session; enough for each figure of a few recent projections
+DEFAULT_MAX_ENTRIES = 12
+
+
+def _update_hash(digest, value: Any) -> None:
+    """Feed a value into a hash, type-tagged so e.g. [1] and (1,) and '1' differ"""
+    if isinstance(value, np.ndarray):
+        digest.update(f"array:{value.dtype.str}:{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)}".encode())
+        for key, item in value.items():  # insertion order sets trace and column order
+            _update_hash(digest, key)
+            _update_hash(digest, item)
+    elif isinstance(value, (list, tuple)):
+        array = None
+        if value and isinstance(value[0], (int, float, np.number)):
+            try:
+                array = np.asarray(value, dtype=float)
+            except (TypeError, ValueError):
+                pass
+        if array is not None and array.ndim == 1:
+            digest.update(f"seq:{type(value).__name__}".encode())
+            _update_hash(digest, array)
+        else:
+            digest.update(f"{type(value).__name__}:{len(value)}".encode())
+            for item in value:
+                _update_hash(digest, item)
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def content_hash(*parts: Any) -> str:
+    """Hash of projection arrays, series dicts and plot options"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _update_hash(digest, part)
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """LRU of built figure views (figures plus their tables) keyed by content hash"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, kind: str, inputs: Any, build: Callable[[], Dict]) -> Dict:
+        """
+        Return the cached view for these inputs, building it on a miss.
+
+        Args:
+            kind: Figure name, part of the key
+            inputs: Everything the figure is built from (arrays and options)
+            build: Builds the view when it is not cached
+
+        Returns:
+            The view returned by ``build``; callers must not modify it
+        """
+        key = content_hash(kind, inputs)
+        view = self.entries.get(key)
+        if view is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return view
+
+        self.misses += 1
+        view = build()
+        self.entries[key] = view
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return view
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+def get_figure_cache() -> FigureCache:
+    """The current session's figure cache"""
+    if 'figure_cache' not in st.session_state:
+        st.session_state.figure_cache = FigureCache()
+    return st.session_state.figure_cache
@@ -0,0 +1,167 @@
+"""Array helpers shared by the FinancialPlotter figures and tables
+
+Projection series arrive as dicts of per-year lists. These helpers stack them
+into one categories x years matrix so per-year splits, totals and display
+strings are computed with whole-array NumPy operations instead of nested
+Python loops over categories and years. Large heatmap grids are reduced to
+block averages the same way.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Expenses below this share of a year's total are grouped into "Other"
+OTHER_THRESHOLD = 0.05
+# Yearly growth assumed for pre-marriage expenses when measuring the lifestyle change
+LIFESTYLE_INFLATION = 1.02
+
+
+def series_matrix(series: Optional[Dict[str, Sequence[float]]], length: int) -> Tuple[List[str], np.ndarray]:
+    """
+    Stack named yearly series into a matrix, zero-padding or truncating each to ``length``.
+
+    Returns:
+        Series names and a (series x years) float array
+    """
+    labels = list(series or {})
+    matrix = np.zeros((len(labels), length))
+    for row, label in enumerate(labels):
+        values = np.asarray(series[label], dtype=float)[:length]
+        matrix[row, :len(values)] = values
+    return labels, matrix
+
+
+def format_currency(values) -> np.ndarray:
+    """
+    Format numbers like ``'${:,.0f}'.format`` for a whole array at once.
+
+    Args:
+        values: Array-like of numbers (any shape)
+
+    Returns:
+        Array of strings of the same shape
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values)  # round half to even, as str.format does
+    finite = np.isfinite(rounded)
+    magnitude = np.where(finite, np.abs(rounded), 0).astype(np.int64)
+
+    # Build the digits three at a time from the right
+    text = (magnitude % 1000).astype(str)
+    text = np.where(magnitude >= 1000, np.char.zfill(text, 3), text)
+    rest = magnitude // 1000
+    while np.any(rest > 0):
+        group = (rest % 1000).astype(str)
+        group = np.where(rest >= 1000, np.char.zfill(group, 3), group)
+        text = np.where(rest > 0, np.char.add(np.char.add(group, ','), text), text)
+        rest //= 1000
+
+    sign = np.where(np.signbit(rounded), '-', '')
+    result = np.char.add(np.char.add('$', sign), text).astype(object)
+    if not finite.all():
+        result[~finite] = ['${:,.0f}'.format(value) for value in values[~finite]]
+    return result
+
+
+class ExpenseSplits:
+    """
+    Per-year expense pie data for every year of a projection, computed once.
+
+    For each year the positive expenses are ordered largest first; those of at
+    least ``threshold`` of the year's total get their own slice and the rest
+    are summed into "Other".
+    """
+
+    def __init__(self, labels: List[str], matrix: np.ndarray, threshold: float = OTHER_THRESHOLD):
+        """
+        Args:
+            labels: Expense category names, one per matrix row
+            matrix: (categories x years) expense amounts
+            threshold: Minimum share of a year's total for a category's own slice
+        """
+        self.labels = np.asarray(labels, dtype=object)
+        self.matrix = matrix
+        positive = matrix > 0
+        totals = np.where(positive, matrix, 0).sum(axis=0)
+        shares = np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0)
+        self.main = positive & (shares >= threshold)
+        self.other = positive & ~self.main
+        self.other_totals = np.where(self.other, matrix, 0).sum(axis=0)
+        # Largest first; the stable sort keeps category order for ties
+        self.order = np.argsort(-matrix, axis=0, kind='stable')
+
+    def for_year(self, year_idx: int) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Pie slices for one year (negative indexes count from the last year).
+
+        Returns:
+            Main slices (with "Other" last if any) and the breakdown of "Other"
+        """
+        order = self.order[:, year_idx]
+        values = self.matrix[order, year_idx]
+        labels = self.labels[order]
+        main_mask = self.main[order, year_idx]
+        other_mask = self.other[order, year_idx]
+
+        main = dict(zip(labels[main_mask], values[main_mask].tolist()))
+        other = dict(zip(labels[other_mask], values[other_mask].tolist()))
+        if other:
+            main["Other"] = float(self.other_totals[year_idx])
+        return main, other
+
+
+def lifestyle_impact(labels: List[str], matrix: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Yearly change in spending after marriage compared with inflated single spending.
+
+    Returns:
+        Per-year amounts (zero before the marriage year), or None without a
+        marriage expense or before the marriage happens
+    """
+    marriage_rows = [row for row, label in enumerate(labels) if "Marriage" in label]
+    if not marriage_rows:
+        return None
+    impact = np.zeros(matrix.shape[1])
+    started = np.flatnonzero(matrix[marriage_rows[0]] > 0)
+    if started.size == 0:
+        return impact
+    marriage_year = int(started[0])
+
+    base_rows = [not any(x in label for x in ["Marriage One-time", "Spouse", "Joint"]) for label in labels]
+    recurring_rows = ["Marriage One-time" not in label for label in labels]
+    base_expenses = np.zeros(matrix.shape[1])
+    base_expenses[:marriage_year] = matrix[base_rows, :marriage_year].sum(axis=0)
+
+    years_married = np.arange(1, matrix.shape[1] - marriage_year + 1)
+    base_with_inflation = base_expenses[marriage_year - 1] * LIFESTYLE_INFLATION ** years_married
+    impact[marriage_year:] = matrix[recurring_rows, marriage_year:].sum(axis=0) - base_with_inflation
+    return impact
+
+
+def block_means(values: np.ndarray, row_block: int, col_block: int) -> np.ndarray:
+    """
+    Average a 2-D array over row_block x col_block tiles, ignoring NaNs.
+
+    Edge tiles may be partial; tiles with no values are NaN.
+    """
+    rows, cols = values.shape
+    out_rows, out_cols = -(-rows // row_block), -(-cols // col_block)
+    padded = np.full((out_rows * row_block, out_cols * col_block), np.nan)
+    padded[:rows, :cols] = values
+    tiles = padded.reshape(out_rows, row_block, out_cols, col_block)
+    present = ~np.isnan(tiles)
+    sums = np.where(present, tiles, 0).sum(axis=(1, 3))
+    counts = present.sum(axis=(1, 3))
+    return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+
+def block_labels(labels: Sequence[str], block: int) -> List[str]:
+    """Axis labels for groups of ``block`` consecutive labels ("first – last")"""
+    labels = list(labels)
+    if block == 1:
+        return labels
+    return [
+        labels[start] if start == min(start + block, len(labels)) - 1
+        else f"{labels[start]} – {labels[min(start + block, len(labels)) - 1]}"
+        for start in range(0, len(labels), block)
+    ]
@@ -4,27 +4,48 @@ import streamlit as st
 from typing import List, Dict
 import pandas as pd
 import numpy as np
+from services.scenario_comparison import METRIC_LABELS, ScenarioComparison
+from visualizations.figure_cache import get_figure_cache
+from visualizations.figure_data import (ExpenseSplits, block_labels, block_means, format_currency,
+                                        lifestyle_impact, series_matrix)
+
+# Heatmaps label each cell up to this many cells and average blocks of cells above the maximum
+HEATMAP_LABEL_CELLS = 1500
+HEATMAP_MAX_CELLS = 100000
+# Scenario comparisons with more lines than this are drawn with WebGL
+SCENARIO_WEBGL_TRACES = 20
 
 class FinancialPlotter:
     @staticmethod
     def plot_net_worth(years: List[int], net_worth: List[float], 
                       assets: List[float], liabilities: List[float],
                       savings: List[float] = None) -> None:
+        view = get_figure_cache().get_or_build(
+            'net_worth', (years, net_worth, assets, liabilities),
+            lambda: FinancialPlotter.build_net_worth(years, net_worth, assets, liabilities)
+        )
+        st.plotly_chart(view['figure'])
+        st.dataframe(view['table'], use_container_width=True)
+
+    @staticmethod
+    def build_net_worth(years: List[int], net_worth: List[float],
+                        assets: List[float], liabilities: List[float]) -> Dict:
+        """Build the net worth figure and its table (no Streamlit calls)."""
         # Create the plot
         fig = go.Figure()
 
         # Add assets as positive bars
-        fig.add_trace(go.Bar(x=years, y=assets,
+        fig.add_trace(go.Bar(x=years, y=np.asarray(assets, dtype=float),
                             name='Assets',
                             marker_color='#27AE60'))
 
         # Add liabilities as negative bars
-        fig.add_trace(go.Bar(x=years, y=[-x for x in liabilities],
+        fig.add_trace(go.Bar(x=years, y=-np.asarray(liabilities, dtype=float),
                             name='Liabilities',
                             marker_color='#E74C3C'))
 
         # Add net worth line on top
-        fig.add_trace(go.Scatter(x=years, y=net_worth,
+        fig.add_trace(go.Scatter(x=years, y=np.asarray(net_worth, dtype=float),
                                 mode='lines+markers',
                                 name='Net Worth',
                                 line=dict(color='#2E86C1', width=2)))
@@ -43,22 +64,37 @@ class FinancialPlotter:
                 x=1.05
             )
         )
-        st.plotly_chart(fig)
 
-        # Create and display the data table
+        # Create the data table
         df = pd.DataFrame({
             'Year': years,
-            'Total Assets': ['${:,.0f}'.format(x) for x in assets],
-            'Total Liabilities': ['${:,.0f}'.format(x) for x in liabilities],
-            'Net Worth': ['${:,.0f}'.format(x) for x in net_worth],
+            'Total Assets': format_currency(assets),
+            'Total Liabilities': format_currency(liabilities),
+            'Net Worth': format_currency(net_worth),
         })
-        st.dataframe(df, use_container_width=True)
+        return {'figure': fig, 'table': df}
 
     @staticmethod
-    def plot_cash_flow(years: List[int], income: List[float], 
-                      expenses: Dict[str, List[float]], total_expenses: List[float],
-                      cash_flow: List[float], income_streams: Dict[str, List[float]] = None) -> None:
-        """Plot cash flow with stacked income streams and separate expenses."""
+    def build_cash_flow(years: List[int], income: List[float],
+                        expenses: Dict[str, List[float]], total_expenses: List[float],
+                        cash_flow: List[float], income_streams: Dict[str, List[float]] = None) -> Dict:
+        """
+        Build the cash flow figure, expense pie splits and detail tables.
+
+        Income streams and expense categories are each stacked into one
+        (series x years) matrix, so the stacked bar bases, every year's pie
+        split and the formatted tables come from whole-array operations.
+
+        Returns:
+            Dict with 'figure', 'splits' (ExpenseSplits), 'income_table' and 'expense_table'
+        """
+        max_len = len(years)  # Use years as the reference length
+        stream_labels, stream_matrix = series_matrix(income_streams, max_len)
+        expense_labels, expense_matrix = series_matrix(expenses, max_len)
+        splits = ExpenseSplits(expense_labels, expense_matrix)
+        total_expenses = np.asarray(total_expenses[:max_len], dtype=float)
+        cash_flow = np.asarray(cash_flow[:max_len], dtype=float)
+
         # Create figure with subplots - cash flow on top, pie chart below
         fig = make_subplots(
             rows=2, cols=1,
@@ -67,77 +103,33 @@ class FinancialPlotter:
             subplot_titles=('Income, Expenses, and Cash Flow Projection', 'Expense Breakdown'),
             vertical_spacing=0.15
         )
-
-        # Create cumulative sums for income stacking
-        max_len = len(years)  # Use years as the reference length
-        cumsum = np.zeros(max_len)
         colors = {'Primary Income': '#27AE60', 'Spouse Income': '#2ECC71', 'Part-Time Work': '#82E0AA'}
 
-        # Selected year for pie chart (default to latest year)
-        selected_year_idx = -1  # Start with the latest year
-
-        # Add income streams as stacked bars
-        if income_streams:
-            for income_type, values in income_streams.items():
-                # Pad array with zeros if needed
-                padded_values = values + [0] * (max_len - len(values)) if len(values) < max_len else values[:max_len]
-
-                fig.add_trace(
-                    go.Bar(
-                        x=years,
-                        y=padded_values,
-                        name=income_type,
-                        marker_color=colors.get(income_type, '#27AE60'),
-                        base=cumsum,  # Start from previous cumulative sum
-                        offsetgroup=0  # Same offsetgroup for stacking
-                    ),
-                    row=1, col=1,
-                    secondary_y=False
-                )
-                cumsum += np.array(padded_values)  # Update cumulative sum with padded values
-
-        def get_expense_pie_data(year_idx):
-            """Helper function to get pie chart data for a specific year"""
-            year_expenses = {}
-            for category, values in expenses.items():
-                # Ensure the values array is long enough
-                if year_idx < len(values) and values[year_idx] > 0:
-                    year_expenses[category] = values[year_idx]
-            
-            # Sort expenses by value in descending order
-            sorted_expenses = dict(sorted(year_expenses.items(), key=lambda x: x[1], reverse=True))
-            
-            # Calculate total expenses
-            total_expenses = sum(sorted_expenses.values())
-            
-            # Group expenses less than 5% into "Other"
-            main_expenses = {}
-            other_expenses = {}
-            
-            for category, amount in sorted_expenses.items():
-                percentage = (amount / total_expenses) * 100
-                if percentage >= 5:
-                    main_expenses[category] = amount
-                else:
-                    other_expenses[category] = amount
-            
-            # Add "Other" category if there are small expenses
-            if other_expenses:
-                main_expenses["Other"] = sum(other_expenses.values())
-                # Store the detailed breakdown for later use
-                main_expenses["_other_breakdown"] = other_expenses
-            
-            return main_expenses
+        # Add income streams as stacked bars, each starting on the sum of the ones before it
+        bases = np.cumsum(stream_matrix, axis=0) - stream_matrix
+        for row, income_type in enumerate(stream_labels):
+            fig.add_trace(
+                go.Bar(
+                    x=years,
+                    y=stream_matrix[row],
+                    name=income_type,
+                    marker_color=colors.get(income_type, '#27AE60'),
+                    base=bases[row],
+                    offsetgroup=0  # Same offsetgroup for stacking
+                ),
+                row=1, col=1,
+                secondary_y=False
+            )
 
         # Add expenses as separate bar
         fig.add_trace(
             go.Bar(
                 x=years,
-                y=total_expenses[:max_len],  # Ensure length matches
+                y=total_expenses,
                 name="Total Expenses",
                 marker_color='#E74C3C',
                 offsetgroup=1,  # Different offsetgroup to prevent stacking with income
-                customdata=[[year, idx] for idx, year in enumerate(years)]  # Add custom data for click handling
+                customdata=np.column_stack([years, np.arange(max_len)])  # Year and index for click handling
             ),
             row=1, col=1,
             secondary_y=False
@@ -147,7 +139,7 @@ class FinancialPlotter:
         fig.add_trace(
             go.Scatter(
                 x=years,
-                y=cash_flow[:max_len],  # Ensure length matches
+                y=cash_flow,
                 name="Net Cash Flow",
                 line=dict(color='#2E86C1', width=2)
             ),
@@ -156,18 +148,11 @@ class FinancialPlotter:
         )
 
         # Initialize pie chart with latest year data
-        sorted_expenses = get_expense_pie_data(selected_year_idx)
-        other_breakdown = sorted_expenses.pop("_other_breakdown", {})  # Remove and store breakdown
-
-        # Store the other_breakdown in session state for access in callbacks
-        if 'other_breakdown' not in st.session_state:
-            st.session_state.other_breakdown = other_breakdown
-
-        # Add initial pie chart
+        main_expenses, _ = splits.for_year(-1)
         fig.add_trace(
             go.Pie(
-                labels=list(sorted_expenses.keys()),
-                values=list(sorted_expenses.values()),
+                labels=list(main_expenses.keys()),
+                values=list(main_expenses.values()),
                 textinfo='percent+label',
                 hole=0.3,
                 marker=dict(colors=['#E74C3C', '#C0392B', '#CD6155', '#EC7063', '#F1948A', '#F5B7B1']),
@@ -175,7 +160,7 @@ class FinancialPlotter:
                 hovertemplate="<b>%{label}</b><br>" +
                             "Amount: $%{value:,.0f}<br>" +
                             "Percentage: %{percent}<extra></extra>",
-                customdata=[1 if label == "Other" else 0 for label in sorted_expenses.keys()]  # Flag for "Other" slice
+                customdata=[1 if label == "Other" else 0 for label in main_expenses]  # Flag for "Other" slice
             ),
             row=2, col=1
         )
@@ -200,6 +185,53 @@ class FinancialPlotter:
         fig.update_yaxes(title_text="Net Cash Flow ($)", secondary_y=True, row=1, col=1)
         fig.update_xaxes(title_text="Year", row=1, col=1)
 
+        # Tables for income and expenses, formatted a whole matrix at a time
+        df_income = pd.DataFrame({
+            'Year': years,
+            'Total Income': format_currency(income[:max_len]),
+            'Total Expenses': format_currency(total_expenses),
+            'Net Cash Flow': format_currency(cash_flow),
+        })
+        for stream_name, column in zip(stream_labels, format_currency(stream_matrix)):
+            df_income[stream_name] = column
+
+        expense_data = {'Year': years}
+        lifestyle = lifestyle_impact(expense_labels, expense_matrix)
+        if lifestyle is not None:
+            expense_data['Joint Lifestyle Impact'] = format_currency(lifestyle)
+        expense_data.update(zip(expense_labels, format_currency(expense_matrix)))
+        df_expenses = pd.DataFrame(expense_data)
+
+        return {
+            'figure': fig,
+            'splits': splits,
+            'income_table': df_income,
+            'expense_table': df_expenses,
+        }
+
+    @staticmethod
+    def plot_cash_flow(years: List[int], income: List[float], 
+                      expenses: Dict[str, List[float]], total_expenses: List[float],
+                      cash_flow: List[float], income_streams: Dict[str, List[float]] = None) -> None:
+        """Plot cash flow with stacked income streams and separate expenses."""
+        view = get_figure_cache().get_or_build(
+            'cash_flow', (years, income, expenses, total_expenses, cash_flow, income_streams),
+            lambda: FinancialPlotter.build_cash_flow(years, income, expenses, total_expenses,
+                                                     cash_flow, income_streams)
+        )
+        FinancialPlotter.render_cash_flow(years, view)
+
+    @staticmethod
+    def render_cash_flow(years: List[int], view: Dict) -> None:
+        """Display a view from ``build_cash_flow`` with its click interactions and tables."""
+        fig = view['figure']
+        splits = view['splits']
+        selected_year_idx = -1  # Start with the latest year
+
+        # Store the other_breakdown in session state for access in callbacks
+        if 'other_breakdown' not in st.session_state:
+            st.session_state.other_breakdown = splits.for_year(selected_year_idx)[1]
+
         st.write("Click on any expense bar to see the detailed breakdown for that year")
 
         # Initialize or get the selected year from session state
@@ -212,29 +244,30 @@ class FinancialPlotter:
         breakdown_container = st.container()
 
         # Display the interactive plot
-        clicked = st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True)
 
         # Get click event data from Streamlit
         clicked_data = st.session_state.get('plotly_click')
         if clicked_data and len(clicked_data['points']) > 0:
             point = clicked_data['points'][0]
-            
-            # Check if the clicked bar is an expense bar (curve number 1)
-            if point['curveNumber'] == 1:  # Expense bar is the second trace
+
+            # Check if the clicked bar is an expense bar (the trace after the income streams)
+            expense_trace = len(fig.data) - 3
+            if point['curveNumber'] == expense_trace:
                 year_idx = years.index(point['x'])
                 if year_idx != st.session_state.selected_year_idx:
                     st.session_state.selected_year_idx = year_idx
-                    new_expenses = get_expense_pie_data(year_idx)
-                    st.session_state.other_breakdown = new_expenses.pop("_other_breakdown", {})
-                    fig.update_traces(
+                    new_expenses, st.session_state.other_breakdown = splits.for_year(year_idx)
+                    year_fig = go.Figure(fig)
+                    year_fig.update_traces(
                         labels=list(new_expenses.keys()),
                         values=list(new_expenses.values()),
                         selector=dict(type='pie')
                     )
-                    fig.layout.annotations[1].text = f'Expense Breakdown - Year {years[year_idx]}'
-                    st.plotly_chart(fig, use_container_width=True)
+                    year_fig.layout.annotations[1].text = f'Expense Breakdown - Year {years[year_idx]}'
+                    st.plotly_chart(year_fig, use_container_width=True)
             # Check if the clicked slice is the "Other" slice in the pie chart
-            elif point['curveNumber'] == 2 and point.get('customdata', 0) == 1:  # Pie chart is the third trace
+            elif point['curveNumber'] == expense_trace + 2 and point.get('customdata', 0) == 1:
                 st.session_state.show_other_breakdown = True
                 st.rerun()
 
@@ -259,86 +292,50 @@ class FinancialPlotter:
                     template='plotly_white'
                 )
                 st.plotly_chart(breakdown_fig, use_container_width=True)
-                
+
                 # Add a close button
                 if st.button("Close Breakdown"):
                     st.session_state.show_other_breakdown = False
                     st.rerun()
 
-        # Create and display tables for income and expenses
-        df_income = pd.DataFrame({
-            'Year': years,
-            'Total Income': ['${:,.0f}'.format(x) for x in income[:max_len]],
-            'Total Expenses': ['${:,.0f}'.format(x) for x in total_expenses[:max_len]],
-            'Net Cash Flow': ['${:,.0f}'.format(x) for x in cash_flow[:max_len]],
-        })
-
-        # Add individual income streams with proper padding
-        if income_streams:
-            for stream_name, values in income_streams.items():
-                # Pad array with zeros if needed
-                padded_values = values + [0] * (max_len - len(values)) if len(values) < max_len else values[:max_len]
-                df_income[stream_name] = ['${:,.0f}'.format(x) for x in padded_values]
-
         st.subheader("Income and Cash Flow Details")
-        st.dataframe(df_income, use_container_width=True)
+        st.dataframe(view['income_table'], use_container_width=True)
 
-        # Create and display expenses breakdown
-        expense_data = {'Year': years}
-        
-        # Calculate lifestyle adjustment impact if marriage milestone exists
-        if any("Marriage" in category for category in expenses.keys()):
-            lifestyle_adjustments = [0] * max_len
-            base_expenses = [0] * max_len
-            marriage_year = None
-            
-            # Find marriage year and base expenses
-            for category, values in expenses.items():
-                if "Marriage" in category:
-                    marriage_year = next((i for i, v in enumerate(values) if v > 0), None)
-                    break
-            
-            if marriage_year is not None:
-                # Calculate base expenses before marriage (excluding one-time marriage costs)
-                for category, values in expenses.items():
-                    if not any(x in category for x in ["Marriage One-time", "Spouse", "Joint"]):
-                        for i in range(marriage_year):
-                            base_expenses[i] += values[i]
-                
-                # Calculate lifestyle adjustment after marriage
-                for i in range(marriage_year, max_len):
-                    # Sum all expenses after marriage except one-time marriage costs
-                    total_exp = sum(values[i] for category, values in expenses.items() 
-                                  if not "Marriage One-time" in category)
-                    
-                    # Calculate what base expenses would have been with inflation
-                    base_with_inflation = base_expenses[marriage_year - 1] * (1.02) ** (i - marriage_year + 1)
-                    
-                    # Lifestyle adjustment is the difference
-                    lifestyle_adjustments[i] = total_exp - base_with_inflation
-            
-            expense_data['Joint Lifestyle Impact'] = ['${:,.0f}'.format(x) for x in lifestyle_adjustments]
-
-        # Add all expense categories
-        for category, values in expenses.items():
-            # Pad expense values if needed
-            padded_values = values + [0] * (max_len - len(values)) if len(values) < max_len else values[:max_len]
-            expense_data[category] = ['${:,.0f}'.format(x) for x in padded_values]
-
-        df_expenses = pd.DataFrame(expense_data)
         st.subheader("Expense Breakdown")
-        st.dataframe(df_expenses, use_container_width=True)
+        st.dataframe(view['expense_table'], use_container_width=True)
 
     @staticmethod
     def plot_assets_liabilities(years: List[int], assets: List[float], 
                               liabilities: List[float], asset_breakdown: Dict[str, List[float]] = None,
                               liability_breakdown: Dict[str, List[float]] = None) -> None:
+        view = get_figure_cache().get_or_build(
+            'assets_liabilities', (years, assets, liabilities, asset_breakdown, liability_breakdown),
+            lambda: FinancialPlotter.build_assets_liabilities(years, assets, liabilities,
+                                                              asset_breakdown, liability_breakdown)
+        )
+        st.plotly_chart(view['figure'])
+
+        # Display assets breakdown table
+        if view['asset_table'] is not None:
+            st.subheader("Assets Breakdown")
+            st.dataframe(view['asset_table'], use_container_width=True)
+
+        # Display liabilities breakdown table
+        if view['liability_table'] is not None:
+            st.subheader("Liabilities Breakdown")
+            st.dataframe(view['liability_table'], use_container_width=True)
+
+    @staticmethod
+    def build_assets_liabilities(years: List[int], assets: List[float],
+                                 liabilities: List[float], asset_breakdown: Dict[str, List[float]] = None,
+                                 liability_breakdown: Dict[str, List[float]] = None) -> Dict:
+        """Build the assets and liabilities figure and breakdown tables (no Streamlit calls)."""
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=years, y=assets,
+        fig.add_trace(go.Scatter(x=years, y=np.asarray(assets, dtype=float),
                                 mode='lines+markers',
                                 name='Assets',
                                 line=dict(color='#27AE60', width=2)))
-        fig.add_trace(go.Scatter(x=years, y=liabilities,
+        fig.add_trace(go.Scatter(x=years, y=np.asarray(liabilities, dtype=float),
                                 mode='lines+markers',
                                 name='Liabilities',
                                 line=dict(color='#E74C3C', width=2)))
@@ -356,25 +353,18 @@ class FinancialPlotter:
                 x=1.05
             )
         )
-        st.plotly_chart(fig)
 
-        # Create and display assets breakdown table
-        if asset_breakdown:
-            asset_data = {'Year': years}
-            for category, values in asset_breakdown.items():
-                asset_data[category] = ['${:,.0f}'.format(x) for x in values]
-            df_assets = pd.DataFrame(asset_data)
-            st.subheader("Assets Breakdown")
-            st.dataframe(df_assets, use_container_width=True)
-
-        # Create and display liabilities breakdown table
-        if liability_breakdown:
-            liability_data = {'Year': years}
-            for category, values in liability_breakdown.items():
-                liability_data[category] = ['${:,.0f}'.format(x) for x in values]
-            df_liabilities = pd.DataFrame(liability_data)
-            st.subheader("Liabilities Breakdown")
-            st.dataframe(df_liabilities, use_container_width=True)
+        def breakdown_table(breakdown):
+            if not breakdown:
+                return None
+            labels, matrix = series_matrix(breakdown, len(years))
+            return pd.DataFrame({'Year': years, **dict(zip(labels, format_currency(matrix)))})
+
+        return {
+            'figure': fig,
+            'asset_table': breakdown_table(asset_breakdown),
+            'liability_table': breakdown_table(liability_breakdown),
+        }
 
     @staticmethod
     def plot_home_value_breakdown(years: List[int], home_value: List[float], 
@@ -445,7 +435,8 @@ class FinancialPlotter:
         salary_data: pd.DataFrame,
         locations: List[str],
         occupations: List[str],
-        title: str = "Salary Distribution by Location and Occupation"
+        title: str = "Salary Distribution by Location and Occupation",
+        x_title: str = "Location"
     ) -> None:
         """
         Create an interactive heatmap showing salary distribution across locations and occupations.
@@ -455,16 +446,66 @@ class FinancialPlotter:
             locations: List of location names
             occupations: List of occupation titles
             title: Title for the plot
+            x_title: Label of the column axis (e.g. "Statistic" for a percentile grid)
         """
-        # Create the heatmap
-        fig = go.Figure(data=go.Heatmap(
-            z=salary_data.values,
-            x=locations,
-            y=occupations,
+        view = get_figure_cache().get_or_build(
+            'salary_heatmap', (salary_data.to_numpy(dtype=float), locations, occupations, title, x_title),
+            lambda: FinancialPlotter.build_salary_heatmap(salary_data, locations, occupations, title,
+                                                          x_title=x_title)
+        )
+        if view['aggregated']:
+            st.caption(f"Showing averages over blocks of up to {view['row_block']} occupations "
+                       f"x {view['col_block']} columns; the table below has every value.")
+
+        # Display in Streamlit
+        st.plotly_chart(view['figure'], use_container_width=True)
+
+        # Display salary data table
+        st.dataframe(view['table'], use_container_width=True)
+
+    @staticmethod
+    def build_salary_heatmap(
+        salary_data: pd.DataFrame,
+        locations: List[str],
+        occupations: List[str],
+        title: str = "Salary Distribution by Location and Occupation",
+        x_title: str = "Location",
+        label_cell_limit: int = HEATMAP_LABEL_CELLS,
+        max_cells: int = HEATMAP_MAX_CELLS
+    ) -> Dict:
+        """
+        Build the salary heatmap and its formatted table (no Streamlit calls).
+
+        Cell labels are drawn from a single ``text`` array through
+        ``texttemplate`` and only for grids of up to ``label_cell_limit``
+        cells. Grids larger than ``max_cells`` are shown as block averages.
+
+        Returns:
+            Dict with 'figure', 'table', 'aggregated', 'row_block' and 'col_block'
+        """
+        values = salary_data.to_numpy(dtype=float)
+        rows, cols = values.shape
+
+        # Average over square-ish blocks when the grid is too large to ship and draw
+        row_block = col_block = 1
+        if rows * cols > max_cells:
+            scale = np.sqrt(rows * cols / max_cells)
+            row_block = max(1, int(np.ceil(min(scale, rows))))
+            col_block = max(1, int(np.ceil(rows * cols / max_cells / row_block)))
+        aggregated = row_block > 1 or col_block > 1
+        z = block_means(values, row_block, col_block) if aggregated else values
+        x = block_labels(locations, col_block)
+        y = block_labels(occupations, row_block)
+
+        heatmap = dict(
+            z=z,
+            x=x,
+            y=y,
             hoverongaps=False,
-            hovertemplate="Location: %{x}<br>" +
+            hovertemplate=f"{x_title}: %{{x}}<br>" +
                           "Occupation: %{y}<br>" +
-                          "Salary: $%{z:,.0f}<extra></extra>",
+                          ("Average salary" if aggregated else "Salary") +
+                          ": $%{z:,.0f}<extra></extra>",
             colorscale='Viridis',
             colorbar=dict(
                 title=dict(
@@ -474,7 +515,17 @@ class FinancialPlotter:
                 thickness=20,
                 tickformat='$,.0f'
             )
-        ))
+        )
+        if z.size <= label_cell_limit:
+            # One label array; Plotly picks a contrasting font color per cell
+            heatmap.update(
+                text=np.where(np.isnan(z), '', format_currency(z)),
+                texttemplate="%{text}",
+                textfont=dict(size=10)
+            )
+
+        # Create the heatmap
+        fig = go.Figure(data=go.Heatmap(**heatmap))
 
         # Update layout
         fig.update_layout(
@@ -484,7 +535,7 @@ class FinancialPlotter:
                 xanchor='center'
             ),
             xaxis=dict(
-                title='Location',
+                title=x_title,
                 tickangle=45,
                 side='bottom'
             ),
@@ -497,30 +548,77 @@ class FinancialPlotter:
             template='plotly_white'
         )
 
-        # Add annotations for salary values
-        annotations = []
-        for i, occupation in enumerate(occupations):
-            for j, location in enumerate(locations):
-                annotations.append(
-                    dict(
-                        text=f"${salary_data.iloc[i, j]:,.0f}",
-                        x=location,
-                        y=occupation,
-                        showarrow=False,
-                        font=dict(
-                            color='white' if salary_data.iloc[i, j] > salary_data.values.mean() else 'black',
-                            size=10
-                        )
-                    )
-                )
-        fig.update_layout(annotations=annotations)
+        table = pd.DataFrame(format_currency(values), index=salary_data.index, columns=salary_data.columns)
+        return {
+            'figure': fig,
+            'table': table,
+            'aggregated': aggregated,
+            'row_block': row_block,
+            'col_block': col_block,
+        }
 
-        # Display in Streamlit
-        st.plotly_chart(fig, use_container_width=True)
+    @staticmethod
+    def plot_scenario_comparison(comparison: ScenarioComparison, metric: str = 'net_worth',
+                                 baseline: int = 0) -> None:
+        """
+        Overlay chart and comparison table of several saved scenarios.
+
+        Args:
+            comparison: Aligned scenarios
+            metric: Metric to chart and rank by
+            baseline: Position of the scenario the table measures the others against
+        """
+        view = get_figure_cache().get_or_build(
+            'scenario_comparison', (comparison.metric(metric), comparison.names, metric, baseline),
+            lambda: FinancialPlotter.build_scenario_comparison(comparison, metric, baseline)
+        )
+        st.plotly_chart(view['figure'], use_container_width=True)
+        st.dataframe(view['table'], use_container_width=True, hide_index=True)
+
+    @staticmethod
+    def build_scenario_comparison(comparison: ScenarioComparison, metric: str = 'net_worth',
+                                  baseline: int = 0) -> Dict:
+        """
+        Build the scenario overlay figure and the ranked comparison table (no Streamlit calls).
+
+        Many scenarios are drawn with WebGL traces so the chart stays responsive.
+
+        Returns:
+            Dict with 'figure' and 'table'
+        """
+        label = METRIC_LABELS.get(metric, metric)
+        values = comparison.metric(metric)
+        trace = go.Scattergl if len(comparison.names) > SCENARIO_WEBGL_TRACES else go.Scatter
+
+        fig = go.Figure()
+        for i, name in enumerate(comparison.names):
+            length = comparison.lengths[i]
+            fig.add_trace(trace(
+                x=comparison.years[:length],
+                y=values[i, :length],
+                mode='lines',
+                name=f"{name} (baseline)" if i == baseline else name,
+                line=dict(width=3 if i == baseline else 1.5, dash='dash' if i == baseline else 'solid'),
+                hovertemplate=f"{name}<br>Year %{{x}}: $%{{y:,.0f}}<extra></extra>"
+            ))
+        fig.update_layout(
+            title=f'{label} by Scenario',
+            xaxis_title='Year',
+            yaxis_title='Amount ($)',
+            template='plotly_white',
+            hovermode='closest',
+            showlegend=True
+        )
+
+        summary = comparison.summary_table(metric, baseline).sort_values('Rank', kind='stable')
+        final_column = f'Final {label}'
+        summary[final_column] = format_currency(summary[final_column])
+        summary['vs Baseline'] = format_currency(summary['vs Baseline'])
+        for column in ('Overtakes Baseline', 'Overtaken by Baseline'):
+            years = summary[column].to_numpy()
+            summary[column] = np.where(years >= 0, np.char.add('Year ', years.astype(str)), '—')
+        return {'figure': fig, 'table': summary}
 
-        # Create and display salary data table
-        st.dataframe(salary_data.style.format("${:,.0f}"), use_container_width=True)
-    
     def plot_career_roadmap(self, career_data: Dict) -> None:
         """
         Create an interactive visualization of the career roadmap.